@@ -3,25 +3,93 @@
 __version__ = "1.3.0"
 
 import subprocess  # nosec: B404
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from logging import Logger
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, List, Optional, Tuple
 
 import click
 from nisystemlink_feeds_manager.clients.core import ApiException
+from nisystemlink_feeds_manager.main import PublishPackagesToSystemLink
 
-from ni_measurement_plugin_packager._constants import CommandLinePrompts, StatusMessages
+from ni_measurement_plugin_packager._constants import (
+    PACKAGES,
+    RAM_STAGING_LIMIT_IN_BYTES,
+    CommandLinePrompts,
+    StatusMessages,
+)
+from ni_measurement_plugin_packager._support._adaptive_concurrency import WorkerLimits
+from ni_measurement_plugin_packager._support._artifact_index import ArtifactIndex
+from ni_measurement_plugin_packager._support._batch_upload import UploadBatchOptions
+from ni_measurement_plugin_packager._support._build_service import (
+    serve as serve_build_service,
+)
+from ni_measurement_plugin_packager._support._feed_index import (
+    FEED_INDEX_FILE_NAME,
+    FeedIndex,
+)
 from ni_measurement_plugin_packager._support._helpers import (
-    build_package,
+    build_and_upload_package,
     initialize_systemlink_client,
+    is_already_published,
     process_and_upload_packages,
-    upload_to_systemlink_feed,
 )
+from ni_measurement_plugin_packager._support._local_feed import LocalFeed
 from ni_measurement_plugin_packager._support._logger import (
     initialize_logger,
     remove_handlers,
     setup_logger_with_file_handler,
 )
+from ni_measurement_plugin_packager._support._metrics import (
+    record_failure,
+    write_metrics_file,
+)
+from ni_measurement_plugin_packager._support._package_info import (
+    BuildOptions,
+    StagedUploadOptions,
+)
+from ni_measurement_plugin_packager._support._payload_profiles import (
+    FULL_PROFILE,
+    PAYLOAD_PROFILES,
+)
+from ni_measurement_plugin_packager._support._profiler import RunProfiler
+from ni_measurement_plugin_packager._support._remote_cache import (
+    REMOTE_CACHE_FILE_NAME,
+    RemoteIdCache,
+)
+from ni_measurement_plugin_packager._support._run_journal import (
+    RUN_JOURNALS_DIRECTORY,
+    RunJournal,
+    get_run_journal_path,
+)
+from ni_measurement_plugin_packager._support._run_report import (
+    BUILT,
+    FAILED,
+    SKIPPED,
+    UPLOADED,
+    RunReport,
+)
+from ni_measurement_plugin_packager._support._runtime_package import (
+    DEFAULT_MIN_PLUGINS,
+    DEFAULT_RUNTIME_PACKAGE_NAME,
+    DEFAULT_RUNTIME_VERSION,
+    RuntimeOptions,
+)
+from ni_measurement_plugin_packager._support._session import (
+    BuildResult,
+    PackagingSession,
+    UploadResult,
+)
+from ni_measurement_plugin_packager._support._sharding import parse_shard
+from ni_measurement_plugin_packager._support._validation import validate_plugins
 
+__all__ = [
+    "BuildResult",
+    "PackagingSession",
+    "UploadResult",
+    "create_and_upload_package",
+]
 
 CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
 
@@ -79,60 +147,396 @@ def _validate_systemlink_inputs(
             )
 
 
-@click.command(context_settings=CONTEXT_SETTINGS)
-@click.option(
-    "-p",
-    "--input-path",
-    type=click.Path(exists=True, file_okay=False, resolve_path=True),
-    callback=_validate_path,
-    help="Measurement plug-in directory to be packaged.",
+def _validate_shard(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[Tuple[int, int]]:
+    if not value:
+        return None
+    try:
+        return parse_shard(value)
+    except ValueError:
+        raise click.BadParameter(CommandLinePrompts.INVALID_SHARD.format(value=value))
+
+
+def _validate_selection_inputs(
+    base_input_dir: Optional[Path],
+    shard: Optional[Tuple[int, int]],
+    shard_costs: Optional[Path],
+    changed_since: Optional[str],
+    shared_path: Tuple[Path, ...],
+) -> None:
+    if (shard or shard_costs or changed_since) and not base_input_dir:
+        raise click.UsageError(CommandLinePrompts.SELECTION_INPUTS_REQUIRED)
+    if shard_costs and not shard:
+        raise click.UsageError(CommandLinePrompts.SHARD_REQUIRED)
+    if shared_path and not changed_since:
+        raise click.UsageError(CommandLinePrompts.CHANGED_SINCE_REQUIRED)
+
+
+def _log_run_report(logger: Logger, run_report: RunReport, report_count: int) -> None:
+    status_counts = run_report.get_status_counts()
+    for plugin in run_report.plugins:
+        if plugin.status == FAILED:
+            logger.info(
+                StatusMessages.REPORTED_FAILURE.format(name=plugin.plugin_name, error=plugin.error)
+            )
+    logger.info(
+        StatusMessages.REPORTS_MERGED.format(
+            reports=report_count,
+            built=status_counts.get(BUILT, 0),
+            uploaded=status_counts.get(UPLOADED, 0),
+            skipped=status_counts.get(SKIPPED, 0),
+            failed=status_counts.get(FAILED, 0),
+        )
+    )
+
+
+def _open_remote_cache(log_directory_path: Path, refresh: bool) -> RemoteIdCache:
+    remote_cache = RemoteIdCache(Path(log_directory_path).parent / REMOTE_CACHE_FILE_NAME)
+    if refresh:
+        remote_cache.clear()
+    return remote_cache
+
+
+@contextmanager
+def _sync_feed_index(
+    logger: Logger,
+    log_directory_path: Path,
+    api_url: str,
+    api_key: str,
+    workspace: str,
+    feed_name: str,
+    remote_cache: RemoteIdCache,
+) -> Iterator[FeedIndex]:
+    # The index is closed when the block exits, and also when the sync fails.
+    with FeedIndex(
+        Path(log_directory_path).parent / FEED_INDEX_FILE_NAME, remote_cache
+    ) as feed_index:
+        changed_entries = feed_index.sync(
+            api_url=api_url,
+            api_key=api_key,
+            workspace=workspace,
+            feed_name=feed_name,
+        )
+        logger.info(
+            StatusMessages.FEED_INDEX_SYNCED.format(feed_name=feed_name, count=changed_entries)
+        )
+        yield feed_index
+
+
+def _start_file_logging(logger: Logger, log_root_path: Path) -> Tuple[Logger, Path]:
+    remove_handlers(logger)
+    logger = initialize_logger(name="debug_logger")
+    logger, log_directory_path = setup_logger_with_file_handler(log_root_path, logger=logger)
+    logger.debug(StatusMessages.PACKAGE_VERSION.format(version=__version__))
+    logger.info(StatusMessages.LOG_FILE_PATH.format(log_dir=log_directory_path))
+    return logger, log_directory_path
+
+
+def _log_error(
+    logger: Logger, ex: Exception, plugin_path: Optional[Path], feed_name: Optional[str]
+) -> None:
+    record_failure(ex)
+    logger.debug(ex, exc_info=True)
+    if isinstance(ex, ApiException):
+        logger.error(
+            StatusMessages.UPLOAD_FAILED.format(
+                package=Path(str(plugin_path)).name,
+                name=feed_name,
+            )
+        )
+        logger.error(ex.error.message)
+        logger.error(StatusMessages.CHECK_LOG_FILE)
+    elif isinstance(ex, PermissionError):
+        logger.error(StatusMessages.ACCESS_DENIED)
+    elif isinstance(ex, subprocess.CalledProcessError):
+        logger.error(StatusMessages.SUBPROCESS_ERROR.format(cmd=ex.cmd, returncode=ex.returncode))
+        logger.error(StatusMessages.CHECK_LOG_FILE)
+    else:
+        logger.error(str(ex))
+        logger.error(StatusMessages.CHECK_LOG_FILE)
+
+
+def _write_metrics_file(logger: Logger, metrics_file: Optional[Path]) -> None:
+    if not metrics_file:
+        return
+    try:
+        write_metrics_file(metrics_file)
+    except OSError as ex:
+        logger.debug(ex, exc_info=True)
+        logger.error(StatusMessages.METRICS_FILE_FAILED.format(path=metrics_file, error=ex))
+
+
+def _add_options(
+    *options: Callable[[Callable[..., None]], Callable[..., None]]
+) -> Callable[[Callable[..., None]], Callable[..., None]]:
+    def decorator(function: Callable[..., None]) -> Callable[..., None]:
+        for option in reversed(options):
+            function = option(function)
+        return function
+
+    return decorator
+
+
+_plugin_directory_options = _add_options(
+    click.option(
+        "-p",
+        "--input-path",
+        type=click.Path(exists=True, file_okay=False, resolve_path=True),
+        callback=_validate_path,
+        help="Measurement plug-in directory to be packaged.",
+    ),
+    click.option(
+        "-b",
+        "--base-input-dir",
+        type=click.Path(exists=True, file_okay=False, resolve_path=True),
+        callback=_validate_path,
+        help="Base directory with measurement plug-ins, each in its own separate directory.",
+    ),
+    click.option(
+        "-n",
+        "--plugin-dir-name",
+        default="",
+        help="Plug-in directory name to be packaged. Used with `--base-input-dir`. Provide '.' to package all plug-ins in the base input directory.",
+    ),
 )
-@click.option(
-    "-b",
-    "--base-input-dir",
-    type=click.Path(exists=True, file_okay=False, resolve_path=True),
-    callback=_validate_path,
-    help="Base directory with measurement plug-ins, each in its own separate directory.",
+
+_plugin_selection_options = _add_options(
+    click.option(
+        "--shard",
+        callback=_validate_shard,
+        help="Process only one slice of the plug-ins in the base input directory, as INDEX/COUNT (e.g., 2/4). Every node given the same COUNT gets a disjoint, stable slice.",
+    ),
+    click.option(
+        "--shard-costs",
+        type=click.Path(exists=True, dir_okay=False, path_type=Path),
+        help="Run report of an earlier run. Balances the shards by the recorded build durations instead of by plug-in name. Used with `--shard`.",
+    ),
+    click.option(
+        "--changed-since",
+        metavar="REF",
+        help="Only process the plug-ins with files or Poetry path dependencies changed on HEAD since this git ref, e.g. 'origin/main'. Used with `--base-input-dir`.",
+    ),
+    click.option(
+        "--shared-path",
+        type=click.Path(exists=True, resolve_path=True, path_type=Path),
+        multiple=True,
+        help="File or directory every plug-in depends on. A change to it selects all plug-ins. Used with `--changed-since`. Can be repeated.",
+    ),
 )
-@click.option(
-    "-n",
-    "--plugin-dir-name",
-    default="",
-    help="Plug-in directory name to be packaged. Used with `--base-input-dir`. Provide '.' to package all plug-ins in the base input directory.",
+
+
+def _systemlink_options(required: bool) -> Callable[[Callable[..., None]], Callable[..., None]]:
+    return _add_options(
+        click.option(
+            "-a",
+            "--api-url",
+            required=required,
+            help="SystemLink server API endpoint URL.",
+        ),
+        click.option(
+            "-k",
+            "--api-key",
+            required=required,
+            help="API key for the SystemLink server.",
+        ),
+        click.option(
+            "-w",
+            "--workspace",
+            required=required,
+            help="Workspace name of the SystemLink feed.",
+        ),
+        click.option(
+            "-f",
+            "--feed-name",
+            required=required,
+            help="Name of the SystemLink feed.",
+        ),
+    )
+
+
+_refresh_remote_cache_option = click.option(
+    "--refresh-remote-cache",
+    is_flag=True,
+    help="Forget the cached SystemLink workspace and feed IDs and look them up again. The cache is used by the feed index. Uploads go through the SystemLink client library, which takes the workspace and feed names and looks the IDs up on every run.",
 )
+
+
+class _DefaultCommandGroup(click.Group):
+    """Command group that runs its default command when no command is named.
+
+    This keeps `ni-measurement-plugin-packager --input-path <dir>` building packages.
+    """
+
+    default_command = "build"
+
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        if not args or (args[0] not in self.commands and args[0] not in ctx.help_option_names):
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=_DefaultCommandGroup, context_settings=CONTEXT_SETTINGS)
+def create_and_upload_package() -> None:
+    """Create Python Measurement plug-in package files and upload to SystemLink Feeds.
+
+    Runs `build` when no command is given.
+    """
+
+
+@create_and_upload_package.command(context_settings=CONTEXT_SETTINGS)
+@_plugin_directory_options
 @click.option(
     "-u",
     "--upload-packages",
     is_flag=True,
     help="Enable uploading packages to the SystemLink Feed.",
 )
+@_systemlink_options(required=False)
 @click.option(
-    "-a",
-    "--api-url",
-    help="SystemLink server API endpoint URL.",
+    "-o",
+    "--overwrite",
+    is_flag=True,
+    help="Overwrite the existing packages in the SystemLink feed.",
 )
 @click.option(
-    "-k",
-    "--api-key",
-    help="API key for the SystemLink server.",
+    "--skip-published",
+    is_flag=True,
+    help="Skip plug-ins whose package version is already in the SystemLink feed. Checked against a local index of the feed.",
 )
 @click.option(
-    "-w",
-    "--workspace",
-    help="Workspace name to upload the packaged plug-ins.",
+    "--profile",
+    is_flag=True,
+    help="Profile the CPU time and memory of each plug-in. Results are written next to the log file.",
 )
 @click.option(
-    "-f",
-    "--feed-name",
-    help="Feed name to upload the packaged plug-in(s).",
+    "--keep-versions",
+    type=click.IntRange(min=1),
+    help="Number of versions of each package to keep in the packages directory. Older versions are deleted after the run.",
 )
 @click.option(
-    "-o",
-    "--overwrite",
+    "--max-packages-size-mb",
+    type=click.IntRange(min=1),
+    help="Total size in MB that the packages directory may take. The oldest versions are deleted after the run until it fits.",
+)
+@click.option(
+    "--staging-dir",
+    type=click.Path(file_okay=False, resolve_path=True, path_type=Path),
+    help="Directory to stage the package files in. Defaults to the packager directory next to the log files.",
+)
+@click.option(
+    "--ram-staging-dir",
+    type=click.Path(exists=True, file_okay=False, resolve_path=True, path_type=Path),
+    help="Directory on a RAM disk to stage small plug-ins in, e.g. 'R:/'. Without it, all plug-ins are staged in `--staging-dir`.",
+)
+@click.option(
+    "--ram-staging-limit-mb",
+    type=click.IntRange(min=0),
+    default=RAM_STAGING_LIMIT_IN_BYTES // (1024 * 1024),
+    show_default=True,
+    help="Largest size in MB that one build stages in `--ram-staging-dir`: the plug-in files, and with `--upload-from-staging` also the package packed next to them. Use 0 to disable.",
+)
+@click.option(
+    "--arch",
+    multiple=True,
+    help="Target architecture of the package, e.g. windows_x64. Repeat to build one package per architecture from a single staged and packed payload. Defaults to the architecture of this system.",
+)
+@_plugin_selection_options
+@click.option(
+    "--report",
+    type=click.Path(dir_okay=False, resolve_path=True, path_type=Path),
+    help="Write a JSON report of the outcome of each plug-in to this file.",
+)
+@click.option(
+    "--local-feed",
+    type=click.Path(file_okay=False, resolve_path=True, path_type=Path),
+    help="Directory feed to copy the built packages to. Its 'Packages' index is updated for each package, so NI Package Manager can install from it.",
+)
+@click.option(
+    "--upload-batch-size",
+    type=click.IntRange(min=1),
+    help="Build all plug-ins first, then upload the packages in batches of up to this many packages. The uploads of a batch run concurrently over one client.",
+)
+@click.option(
+    "--upload-batch-mb",
+    type=click.IntRange(min=1),
+    default=512,
+    show_default=True,
+    help="Largest total size in MB of an upload batch. Used with `--upload-batch-size`.",
+)
+@click.option(
+    "--build-workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of plug-ins built at the same time, largest first. Used with `--base-input-dir`.",
+)
+@click.option(
+    "--min-workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Tune the number of concurrent builds and uploads from this up to `--build-workers` and `--upload-workers`, based on throughput, CPU load and server throttling.",
+)
+@click.option(
+    "--upload-workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of packages of a batch uploaded at the same time. Used with `--upload-batch-size`.",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False, resolve_path=True, path_type=Path),
+    help="Write build, upload, cache and failure metrics to this file in the Prometheus text format when the run ends, e.g. for the node exporter textfile collector.",
+)
+@_refresh_remote_cache_option
+@click.option(
+    "--upload-from-staging",
     is_flag=True,
-    help="Overwrite the existing packages in the SystemLink feed.",
+    help="Upload each package from the staging directory as soon as it is packed, and keep no copy of it in the packages directory. Used with `--upload-packages`.",
+)
+@click.option(
+    "--keep-packages",
+    is_flag=True,
+    help="Also move each package uploaded from the staging directory into the packages directory. Used with `--upload-from-staging`.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted run with the same inputs: skip the plug-ins it completed, reuse its verified packages and upload only the packages it did not upload. Used with `--base-input-dir`.",
 )
-def create_and_upload_package(
+@click.option(
+    "--payload-profile",
+    type=click.Choice(list(PAYLOAD_PROFILES)),
+    default=FULL_PROFILE,
+    show_default=True,
+    help="Payload profile. 'runtime' leaves tests, docs, notebooks, type stubs, sample data, design files and repository files out of the packages.",
+)
+@click.option(
+    "--runtime-wheel-dir",
+    type=click.Path(exists=True, file_okay=False, resolve_path=True, path_type=Path),
+    help="Directory of wheels to build a shared runtime package from. Dependencies that several selected plug-ins declare with compatible versions are packed into it once, and those plug-ins depend on it. Used with `--base-input-dir`.",
+)
+@click.option(
+    "--runtime-package-name",
+    default=DEFAULT_RUNTIME_PACKAGE_NAME,
+    show_default=True,
+    help="Package name of the shared runtime package. Used with `--runtime-wheel-dir`.",
+)
+@click.option(
+    "--runtime-version",
+    default=DEFAULT_RUNTIME_VERSION,
+    show_default=True,
+    help="Base version of the shared runtime package. A hash of the pinned requirements is appended to it, so runtime packages with different wheels never share a version. Used with `--runtime-wheel-dir`.",
+)
+@click.option(
+    "--runtime-min-plugins",
+    type=click.IntRange(min=2),
+    default=DEFAULT_MIN_PLUGINS,
+    show_default=True,
+    help="Number of plug-ins that must declare a dependency for it to move into the shared runtime package. Used with `--runtime-wheel-dir`.",
+)
+def build(
     input_path: Optional[Path],
     base_input_dir: Optional[Path],
     plugin_dir_name: Optional[str],
@@ -142,8 +546,37 @@ def create_and_upload_package(
     workspace: Optional[str],
     feed_name: Optional[str],
     overwrite: Optional[bool],
+    skip_published: bool,
+    profile: bool,
+    keep_versions: Optional[int],
+    max_packages_size_mb: Optional[int],
+    staging_dir: Optional[Path],
+    ram_staging_dir: Optional[Path],
+    ram_staging_limit_mb: int,
+    arch: Tuple[str, ...],
+    shard: Optional[Tuple[int, int]],
+    shard_costs: Optional[Path],
+    changed_since: Optional[str],
+    shared_path: Tuple[Path, ...],
+    report: Optional[Path],
+    local_feed: Optional[Path],
+    upload_batch_size: Optional[int],
+    upload_batch_mb: int,
+    build_workers: int,
+    min_workers: Optional[int],
+    upload_workers: int,
+    metrics_file: Optional[Path],
+    refresh_remote_cache: bool,
+    upload_from_staging: bool,
+    keep_packages: bool,
+    resume: bool,
+    payload_profile: str,
+    runtime_wheel_dir: Optional[Path],
+    runtime_package_name: str,
+    runtime_version: str,
+    runtime_min_plugins: int,
 ) -> None:
-    """Create Python Measurement plug-in package files and upload to SystemLink Feeds."""
+    """Build measurement plug-in packages and upload them to SystemLink Feeds."""
     try:
         logger = initialize_logger(name="console_logger")
         logger.info(StatusMessages.STARTED_EXECUTION)
@@ -154,20 +587,30 @@ def create_and_upload_package(
         _validate_systemlink_inputs(
             click.get_current_context(), upload_packages, api_url, api_key, workspace, feed_name
         )
+        _validate_selection_inputs(base_input_dir, shard, shard_costs, changed_since, shared_path)
+        if (report or resume or build_workers > 1) and not base_input_dir:
+            raise click.UsageError(CommandLinePrompts.BATCH_INPUTS_REQUIRED)
+        if runtime_wheel_dir and not base_input_dir:
+            raise click.UsageError(CommandLinePrompts.RUNTIME_INPUTS_REQUIRED)
+        if profile and build_workers > 1:
+            raise click.UsageError(CommandLinePrompts.PROFILE_BUILD_WORKERS)
+        if upload_batch_size and not (upload_packages and base_input_dir):
+            raise click.UsageError(CommandLinePrompts.UPLOAD_REQUIRED)
+        if upload_from_staging and (not upload_packages or upload_batch_size):
+            raise click.UsageError(CommandLinePrompts.UPLOAD_FROM_STAGING_REQUIRED)
+        if keep_packages and not upload_from_staging:
+            raise click.UsageError(CommandLinePrompts.KEEP_PACKAGES_REQUIRED)
 
-        remove_handlers(logger)
-        logger = initialize_logger(name="debug_logger")
         fallback_path = base_input_dir or input_path
         if not fallback_path:
             raise FileNotFoundError(CommandLinePrompts.PLUGIN_DIRECTORY_REQUIRED)
-        logger, log_directory_path = setup_logger_with_file_handler(
-            fallback_path,
-            logger=logger,
-        )
-        logger.debug(StatusMessages.PACKAGE_VERSION.format(version=__version__))
-        logger.info(StatusMessages.LOG_FILE_PATH.format(log_dir=log_directory_path))
+        logger, log_directory_path = _start_file_logging(logger, fallback_path)
 
+        remote_cache = _open_remote_cache(log_directory_path, refresh_remote_cache)
         systemlink_client = None
+        staged_upload = (
+            StagedUploadOptions(keep_packages=keep_packages) if upload_from_staging else None
+        )
         if upload_packages:
             systemlink_client = initialize_systemlink_client(
                 logger=logger,
@@ -176,60 +619,344 @@ def create_and_upload_package(
                 workspace=workspace,
             )
 
-        if base_input_dir and plugin_dir_name:
-            process_and_upload_packages(
-                logger=logger,
-                plugin_root_directory=base_input_dir,
-                selected_plugins=plugin_dir_name,
-                systemlink_client=systemlink_client,
-                feed_name=feed_name,
-                overwrite_packages=overwrite,
+        profiler = RunProfiler(log_directory_path) if profile else None
+        directory_feed = LocalFeed(local_feed) if local_feed else None
+        upload_batch = None
+        if upload_batch_size:
+            upload_batch = UploadBatchOptions(
+                max_packages=upload_batch_size,
+                max_bytes=upload_batch_mb * 1024 * 1024,
+                max_workers=upload_workers,
+                min_workers=min_workers,
+                create_client=partial(
+                    PublishPackagesToSystemLink,
+                    server_api_key=api_key,
+                    server_url=api_url,
+                    workspace_name=workspace,
+                ),
             )
+        build_options = BuildOptions(
+            staging_directory=staging_dir,
+            ram_staging_directory=ram_staging_dir,
+            ram_staging_limit=ram_staging_limit_mb * 1024 * 1024,
+            architectures=tuple(dict.fromkeys(arch)),
+            payload_profile=payload_profile,
+        )
 
-        if input_path:
-            package_path = build_package(
-                logger=logger,
-                plugin_path=input_path,
+        published_packages = None
+        if skip_published and not overwrite and api_url and api_key and workspace and feed_name:
+            with _sync_feed_index(
+                logger,
+                log_directory_path,
+                api_url,
+                api_key,
+                workspace,
+                feed_name,
+                remote_cache,
+            ) as feed_index:
+                published_packages = feed_index.get_published_versions(
+                    api_url, workspace, feed_name
+                )
+
+        if base_input_dir and plugin_dir_name:
+            run_report = RunReport(shard=f"{shard[0]}/{shard[1]}" if shard else None)
+            shard_durations = RunReport.load(shard_costs).get_durations() if shard_costs else None
+            run_journal = RunJournal(
+                get_run_journal_path(
+                    log_directory_path.parent / RUN_JOURNALS_DIRECTORY,
+                    {
+                        "base_input_dir": base_input_dir,
+                        "plugin_dir_name": plugin_dir_name,
+                        "upload_packages": upload_packages,
+                        "api_url": api_url,
+                        "workspace": workspace,
+                        "feed_name": feed_name,
+                        "shard": shard,
+                        "architectures": build_options.architectures,
+                        "payload_profile": payload_profile,
+                        "local_feed": local_feed,
+                        "changed_since": changed_since,
+                        "runtime_wheel_dir": runtime_wheel_dir,
+                        "runtime_package_name": runtime_package_name,
+                        "runtime_version": runtime_version,
+                        "runtime_min_plugins": runtime_min_plugins,
+                    },
+                ),
+                resume=resume,
             )
-            if systemlink_client and package_path:
-                upload_response = upload_to_systemlink_feed(
-                    package_path=package_path,
+            logger.debug(StatusMessages.RUN_JOURNAL_PATH.format(path=run_journal.journal_path))
+            if resume:
+                logger.info(StatusMessages.RUN_RESUMED.format(count=run_journal.completed_count))
+            with run_journal:
+                process_and_upload_packages(
+                    logger=logger,
+                    plugin_root_directory=base_input_dir,
+                    selected_plugins=plugin_dir_name,
                     systemlink_client=systemlink_client,
                     feed_name=feed_name,
                     overwrite_packages=overwrite,
+                    published_packages=published_packages,
+                    profiler=profiler,
+                    build_options=build_options,
+                    shard=shard,
+                    shard_costs=shard_durations,
+                    run_report=run_report,
+                    local_feed=directory_feed,
+                    upload_batch=upload_batch,
+                    staged_upload=staged_upload,
+                    run_journal=run_journal,
+                    changed_since=changed_since,
+                    shared_paths=shared_path,
+                    build_workers=WorkerLimits(build_workers, min_workers),
+                    runtime_options=(
+                        RuntimeOptions(
+                            wheel_directory=runtime_wheel_dir,
+                            package_name=runtime_package_name,
+                            version=runtime_version,
+                            min_plugins=runtime_min_plugins,
+                        )
+                        if runtime_wheel_dir
+                        else None
+                    ),
                 )
-                logger.info(
-                    StatusMessages.PACKAGE_UPLOADED.format(
-                        package_name=upload_response.file_name,
-                        feed_name=feed_name,
-                    )
+            if report:
+                run_report.save(report)
+                logger.info(StatusMessages.REPORT_WRITTEN.format(path=report))
+
+        if input_path and not is_already_published(
+            logger=logger,
+            plugin_path=input_path,
+            published_packages=published_packages,
+            feed_name=feed_name,
+            architectures=build_options.architectures,
+        ):
+            with profiler.profile(input_path.name) if profiler else nullcontext():
+                build_and_upload_package(
+                    logger=logger,
+                    plugin_path=input_path,
+                    systemlink_client=systemlink_client,
+                    feed_name=feed_name,
+                    overwrite_packages=overwrite,
+                    build_options=build_options,
+                    local_feed=directory_feed,
+                    staged_upload=staged_upload,
                 )
 
-    except ApiException as ex:
-        measurement_plugin = Path(str(input_path)).name
-        logger.debug(ex, exc_info=True)
-        logger.error(
-            StatusMessages.UPLOAD_FAILED.format(
-                package=measurement_plugin,
-                name=feed_name,
+        if profiler:
+            summary_path = profiler.write_summary()
+            if summary_path:
+                logger.info(StatusMessages.PROFILE_WRITTEN.format(path=summary_path))
+
+        if keep_versions or max_packages_size_mb:
+            removed_packages = ArtifactIndex(log_directory_path.parent / PACKAGES).apply_retention(
+                keep_versions=keep_versions,
+                max_total_size=max_packages_size_mb * 1024 * 1024 if max_packages_size_mb else None,
             )
+            for package_path in removed_packages:
+                logger.debug(StatusMessages.PACKAGE_REMOVED.format(path=package_path))
+            logger.info(StatusMessages.PACKAGES_REMOVED.format(count=len(removed_packages)))
+
+    except Exception as ex:
+        _log_error(logger, ex, input_path, feed_name)
+
+    finally:
+        _write_metrics_file(logger, metrics_file)
+        logger.info(StatusMessages.COMPLETION)
+
+
+@create_and_upload_package.command(context_settings=CONTEXT_SETTINGS)
+@_plugin_directory_options
+@_plugin_selection_options
+def validate(
+    input_path: Optional[Path],
+    base_input_dir: Optional[Path],
+    plugin_dir_name: Optional[str],
+    shard: Optional[Tuple[int, int]],
+    shard_costs: Optional[Path],
+    changed_since: Optional[str],
+    shared_path: Tuple[Path, ...],
+) -> None:
+    """Validate the selected plug-ins and report all problems without building anything."""
+    try:
+        logger = initialize_logger(name="console_logger")
+        logger.info(StatusMessages.STARTED_EXECUTION)
+
+        _validate_plugin_inputs(
+            click.get_current_context(), input_path, base_input_dir, plugin_dir_name
         )
-        logger.error(ex.error.message)
-        logger.error(StatusMessages.CHECK_LOG_FILE)
+        _validate_selection_inputs(base_input_dir, shard, shard_costs, changed_since, shared_path)
+        fallback_path = base_input_dir or input_path
+        if not fallback_path:
+            raise FileNotFoundError(CommandLinePrompts.PLUGIN_DIRECTORY_REQUIRED)
+        logger, _ = _start_file_logging(logger, fallback_path)
 
-    except PermissionError as error:
-        logger.debug(error, exc_info=True)
-        logger.error(StatusMessages.ACCESS_DENIED)
+        if base_input_dir and plugin_dir_name:
+            process_and_upload_packages(
+                logger=logger,
+                plugin_root_directory=base_input_dir,
+                selected_plugins=plugin_dir_name,
+                systemlink_client=None,
+                feed_name=None,
+                overwrite_packages=False,
+                shard=shard,
+                shard_costs=RunReport.load(shard_costs).get_durations() if shard_costs else None,
+                changed_since=changed_since,
+                shared_paths=shared_path,
+                validate_only=True,
+            )
+        if input_path:
+            validate_plugins(logger=logger, plugin_paths=[input_path])
+
+    except Exception as ex:
+        _log_error(logger, ex, input_path, None)
+
+    finally:
+        logger.info(StatusMessages.COMPLETION)
 
-    except subprocess.CalledProcessError as ex:
-        logger.debug(ex, exc_info=True)
-        logger.error(StatusMessages.SUBPROCESS_ERROR.format(cmd=ex.cmd, returncode=ex.returncode))
-        logger.error(StatusMessages.CHECK_LOG_FILE)
+
+@create_and_upload_package.command("merge-reports", context_settings=CONTEXT_SETTINGS)
+@click.argument(
+    "reports",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--report",
+    type=click.Path(dir_okay=False, resolve_path=True, path_type=Path),
+    help="Write the merged report to this file.",
+)
+def merge_reports(reports: Tuple[Path, ...], report: Optional[Path]) -> None:
+    """Merge the run reports of several shards into one summary."""
+    try:
+        logger = initialize_logger(name="console_logger")
+        logger.info(StatusMessages.STARTED_EXECUTION)
+
+        merged_report = RunReport.merge([RunReport.load(report_path) for report_path in reports])
+        _log_run_report(logger, merged_report, len(reports))
+        if report:
+            merged_report.save(report)
+            logger.info(StatusMessages.REPORT_WRITTEN.format(path=report))
 
     except Exception as ex:
-        logger.debug(ex, exc_info=True)
-        logger.error(str(ex))
-        logger.error(StatusMessages.CHECK_LOG_FILE)
+        _log_error(logger, ex, None, None)
+
+    finally:
+        logger.info(StatusMessages.COMPLETION)
+
+
+@create_and_upload_package.command("list-feed", context_settings=CONTEXT_SETTINGS)
+@_systemlink_options(required=True)
+@_refresh_remote_cache_option
+@click.option(
+    "--latest",
+    is_flag=True,
+    help="List only the latest version of each package.",
+)
+def list_feed(
+    api_url: str,
+    api_key: str,
+    workspace: str,
+    feed_name: str,
+    refresh_remote_cache: bool,
+    latest: bool,
+) -> None:
+    """Sync the local index of a SystemLink feed and list its packages."""
+    try:
+        logger = initialize_logger(name="console_logger")
+        logger.info(StatusMessages.STARTED_EXECUTION)
+        logger, log_directory_path = _start_file_logging(logger, Path.cwd())
+
+        remote_cache = _open_remote_cache(log_directory_path, refresh_remote_cache)
+        with _sync_feed_index(
+            logger,
+            log_directory_path,
+            api_url,
+            api_key,
+            workspace,
+            feed_name,
+            remote_cache,
+        ) as feed_index:
+            if latest:
+                latest_versions = feed_index.get_latest_versions(api_url, workspace, feed_name)
+                for package_name, version in latest_versions.items():
+                    logger.info(
+                        StatusMessages.FEED_LATEST_VERSION.format(
+                            name=package_name, version=version
+                        )
+                    )
+                return
+            for package in feed_index.list_packages(api_url, workspace, feed_name):
+                logger.info(
+                    StatusMessages.FEED_PACKAGE.format(
+                        name=package.package_name,
+                        version=package.version,
+                        architecture=package.architecture or "",
+                    )
+                )
+
+    except Exception as ex:
+        _log_error(logger, ex, None, feed_name)
+
+    finally:
+        logger.info(StatusMessages.COMPLETION)
+
+
+@create_and_upload_package.command(context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--host",
+    default="127.0.0.1",
+    show_default=True,
+    help="Interface the build service listens on.",
+)
+@click.option(
+    "--port",
+    type=click.IntRange(0, 65535),
+    default=8585,
+    show_default=True,
+    help="Port the build service listens on.",
+)
+@click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of jobs the build service runs at the same time.",
+)
+@click.option(
+    "--service-token",
+    envvar="NI_MEASUREMENT_PLUGIN_PACKAGER_SERVICE_TOKEN",
+    help="Token that build service requests must send as 'Authorization: Bearer <token>'. Required when `--host` is not a loopback address. Can also be set in the NI_MEASUREMENT_PLUGIN_PACKAGER_SERVICE_TOKEN environment variable.",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False, resolve_path=True, path_type=Path),
+    help="Write build, upload, cache and failure metrics to this file in the Prometheus text format when the service stops. The service also serves them at /metrics.",
+)
+def serve(
+    host: str,
+    port: int,
+    max_workers: int,
+    service_token: Optional[str],
+    metrics_file: Optional[Path],
+) -> None:
+    """Run as a build service that accepts build and publish jobs over a local HTTP API."""
+    try:
+        logger = initialize_logger(name="console_logger")
+        logger.info(StatusMessages.STARTED_EXECUTION)
+        logger, _ = _start_file_logging(logger, Path.cwd())
+
+        serve_build_service(
+            logger=logger,
+            host=host,
+            port=port,
+            max_workers=max_workers,
+            token=service_token,
+        )
+
+    except Exception as ex:
+        _log_error(logger, ex, None, None)
 
     finally:
+        _write_metrics_file(logger, metrics_file)
         logger.info(StatusMessages.COMPLETION)
@@ -12,7 +12,9 @@ from ni_measurement_plugin_packager._constants._messages import (
     StatusMessages,
 )
 from ni_measurement_plugin_packager._constants._template_files import (
+    PACKAGER_DIRECTORY,
     PACKAGES,
+    RAM_STAGING_LIMIT_IN_BYTES,
     ControlFile,
     FileNames,
     InstructionFile,
@@ -27,7 +29,9 @@ __all__ = [
     "LOG_FILE_SIZE_LIMIT_IN_BYTES",
     "CommandLinePrompts",
     "StatusMessages",
+    "PACKAGER_DIRECTORY",
     "PACKAGES",
+    "RAM_STAGING_LIMIT_IN_BYTES",
     "ControlFile",
     "FileNames",
     "InstructionFile",
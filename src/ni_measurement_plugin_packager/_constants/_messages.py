@@ -17,6 +17,7 @@ class StatusMessages:
     MISSING_MEASUREMENT_FILE = "Missing 'measurement.py' in directory: '{dir}'."
     MISSING_BATCH_FILE = "Missing 'start.bat' in directory: '{dir}'."
     SUBPROCESS_ERROR = "Command '{cmd}' execution failed with exit status {returncode}."
+    STAGING_DIRECTORY = "Staging package files in '{dir}'."
     TEMPLATE_FILES_GENERATED = "Generated required template files for NI package creation."
     PUBLIC_DIRECTORY_INACCESSIBLE = (
         "Could not access Public Documents directory. Defaulting to User Documents for logging."
@@ -38,6 +39,83 @@ class StatusMessages:
     UPLOAD_FAILED = "Package upload failed: '{package}' to SystemLink feed '{name}'."
     API_URL_KEY_MISSING = "{key} key is missing in SystemLink client configuration files."
     CLIENT_CREATION_FAILED = "Unable to initialize client for publishing packages to SystemLink."
+    SERVICE_STARTED = "Build service listening on http://{host}:{port}/ with {workers} worker(s)."
+    SERVICE_STOPPED = "Build service stopped."
+    SERVICE_TOKEN_REQUIRED = "The build service accepts SystemLink API keys, so listening on '{host}' needs '--service-token'. Use a loopback host such as 127.0.0.1 to run without one."
+    JOB_QUEUED = "Queued job '{job_id}' for measurement '{name}'."
+    JOB_COALESCED = "Measurement '{name}' already has queued job '{job_id}'. Reusing it."
+    JOB_FAILED = "Job '{job_id}' for measurement '{name}' failed: {error}"
+    PROFILE_WRITTEN = "Profile summary written to '{path}'."
+    PACKAGE_REMOVED = "Removed old package '{path}'."
+    PACKAGES_REMOVED = "Removed {count} old package(s) by the retention policy."
+    WORKSPACE_NOT_FOUND = "Workspace '{workspace}' not found on the SystemLink server."
+    FEED_NOT_FOUND = "Feed '{feed_name}' not found in workspace '{workspace}'."
+    FEED_INDEX_SYNCED = (
+        "Synced local index of SystemLink Feed '{feed_name}': {count} package entries changed."
+    )
+    FEED_PACKAGE = "{name} {version} {architecture}"
+    FEED_LATEST_VERSION = "{name} {version}"
+    PACKAGE_ADDED_TO_LOCAL_FEED = (
+        "Added measurement package '{package_name}' to local feed '{feed_directory}'."
+    )
+    INVALID_PACKAGE_ARCHIVE = (
+        "'{path}' is not a valid NI package: expected an ar archive with a control member."
+    )
+    ARCHITECTURE_PACKAGE_BUILT = "Created NI Package for measurement '{name}' for architecture '{architecture}' from the '{source}' package."
+    BATCH_UPLOADED = (
+        "Uploaded batch {index}/{count}: {uploaded} of {total} package(s) in {duration:.1f}s."
+    )
+    SHARD_SELECTED = (
+        "Shard {index}/{count}: processing {selected} of {total} measurement plug-in(s)."
+    )
+    REPORT_WRITTEN = "Run report written to '{path}'."
+    REPORTS_MERGED = "Merged {reports} report(s): {built} built, {uploaded} uploaded, {skipped} skipped, {failed} failed."
+    REPORTED_FAILURE = "Measurement '{name}' failed: {error}"
+    METRICS_FILE_FAILED = "Unable to write the metrics file '{path}': {error}"
+    RUN_JOURNAL_PATH = "Run journal: '{path}'."
+    RUN_RESUMED = "Resuming the interrupted run: {count} measurement plug-in(s) already completed."
+    PLUGIN_ALREADY_COMPLETED = "Skipping measurement '{name}': completed by the interrupted run."
+    PACKAGES_RESUMED = (
+        "Reusing the verified packages of measurement '{name}' built by the interrupted run."
+    )
+    PACKAGE_ALREADY_UPLOADED = (
+        "Skipping upload of package '{package_name}': uploaded by the interrupted run."
+    )
+    GIT_NOT_FOUND = "Git executable not found. Install git to use '--changed-since'."
+    CHANGED_PLUGINS_SELECTED = (
+        "Changed since '{ref}': processing {selected} of {total} measurement plug-in(s)."
+    )
+    PAYLOAD_TRIMMED = (
+        "Payload profile '{profile}' left {size} bytes out of measurement '{name}' ({rules})."
+    )
+    VALIDATION_MISSING_FILE = "Missing '{file}'."
+    VALIDATION_INVALID_TOML = "Could not parse '{file}': {error}"
+    VALIDATION_MISSING_POETRY_SECTION = "Missing '[tool.poetry]' section in 'pyproject.toml'."
+    VALIDATION_MISSING_KEY = "Missing key 'tool.poetry.{key}' in 'pyproject.toml'."
+    VALIDATION_INVALID_NAME = "'tool.poetry.name' in 'pyproject.toml' must be a string."
+    VALIDATION_INVALID_VERSION = "Invalid package version '{version}' in 'pyproject.toml'. Use a version that starts with a digit and contains only letters, digits and '.+~-'."
+    VALIDATION_INVALID_AUTHORS = (
+        "'tool.poetry.authors' in 'pyproject.toml' must be a list of names."
+    )
+    VALIDATION_DUPLICATE_PACKAGE = "Package name '{package_name}' is also built by {plugins}."
+    VALIDATION_PROBLEM = "Measurement '{name}': {problem}"
+    VALIDATION_FAILED = "Validation found {count} problem(s) in {plugins} measurement plug-in(s). Nothing was built or uploaded."
+    VALIDATION_PASSED = "Validated {count} measurement plug-in(s)."
+    CONCURRENCY_CHANGED = "Changed {stage} concurrency from {old} to {new}: {reason}."
+    CONCURRENCY_REASON_THROTTLED = "the server throttled a request or was unavailable"
+    CONCURRENCY_REASON_NO_GAIN = "the last increase did not raise throughput"
+    CONCURRENCY_REASON_PROBING = "probing for more throughput"
+    PACKAGE_ALREADY_PUBLISHED = "Skipping measurement '{name}': version '{version}' of package '{package_name}' is already in SystemLink Feed '{feed_name}'. Use '--overwrite' to replace it."
+    RUNTIME_SHARED_DEPENDENCIES = "Runtime package '{package_name}' shares {count} dependency(ies) between {plugins} measurement plug-in(s): {dependencies}."
+    RUNTIME_NOTHING_SHARED = "No dependency is declared by at least {min_plugins} measurement plug-ins with a compatible wheel in '{dir}'. No runtime package is built."
+    RUNTIME_WHEELS_MISSING = "No compatible wheel in the runtime wheel directory for: {requirements}. Install them with the plug-ins."
+    RUNTIME_PACKAGE_FAILED = (
+        "Could not build runtime package '{package_name}'. No measurement plug-in is built."
+    )
+    RUNTIME_PACKAGE_BUILT = "Successfully created runtime package '{package_name}' at '{dir}'."
+    RUNTIME_ALREADY_PUBLISHED = "Version '{version}' of runtime package '{package_name}' is already in SystemLink Feed '{feed_name}'."
+    RUNTIME_NOT_PUBLISHED = "Runtime package '{package_name}' was not published. The measurement plug-ins keep their own copy of the shared dependencies."
+    RUNTIME_DEPENDS = "Measurement '{name}' depends on '{depends}' for {dependencies}."
 
 
 class CommandLinePrompts:
@@ -50,3 +128,24 @@ class CommandLinePrompts:
     SELECTED_PLUGINS_INVALID = "Invalid measurement plug-in name '{input}' provided. Use comma-separated plugin names (e.g., sample_measurement,test_measurement) or '.' to build all available measurements."
     UNWANTED_SYSTEMLINK_CREDENTIALS = "Use '-u' or '--upload-packages' flag to upload package(s)."
     NO_FEED_NAME = "Missing feed name. Provide a valid feed name for uploading the package(s)."
+    INVALID_SHARD = (
+        "Invalid shard '{value}'. Use INDEX/COUNT with INDEX from 1 to COUNT (e.g., 2/4)."
+    )
+    SELECTION_INPUTS_REQUIRED = "'--shard', '--shard-costs' and '--changed-since' are used with '--base-input-dir' and '--plugin-dir-name'."
+    BATCH_INPUTS_REQUIRED = "'--report', '--resume' and '--build-workers' are used with '--base-input-dir' and '--plugin-dir-name'."
+    RUNTIME_INPUTS_REQUIRED = (
+        "'--runtime-wheel-dir' is used with '--base-input-dir' and '--plugin-dir-name'."
+    )
+    PROFILE_BUILD_WORKERS = (
+        "'--profile' profiles one plug-in at a time. Use it with '--build-workers 1'."
+    )
+    UPLOAD_REQUIRED = (
+        "'--upload-batch-size' is used with '--upload-packages' and '--base-input-dir'."
+    )
+    SHARD_REQUIRED = "'--shard-costs' is used with '--shard'."
+    UPLOAD_FROM_STAGING_REQUIRED = (
+        "'--upload-from-staging' is used with '--upload-packages' and without "
+        "'--upload-batch-size'."
+    )
+    KEEP_PACKAGES_REQUIRED = "'--keep-packages' is used with '--upload-from-staging'."
+    CHANGED_SINCE_REQUIRED = "'--shared-path' is used with '--changed-since'."
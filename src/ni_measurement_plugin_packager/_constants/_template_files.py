@@ -1,6 +1,8 @@
 """Constants utilized for creating Control and Instruction files."""
 
 PACKAGES = "packages"
+PACKAGER_DIRECTORY = "NI-Measurement-Plugin-Packager"
+RAM_STAGING_LIMIT_IN_BYTES = 256 * 1024 * 1024  # 256MB
 
 
 class FileNames:
@@ -11,6 +13,10 @@ class FileNames:
     DEBIAN_BIN = "debian-binary"
     MEASUREMENT_FILE = "measurement.py"
     BATCH_FILE = "start.bat"
+    WHEELS = "wheels"
+    REQUIREMENTS = "requirements.txt"
+    LINK_RUNTIME = "link_runtime.py"
+    RUNTIME_ENVIRONMENTS = "environments"
 
 
 class ControlFile:
@@ -30,6 +36,7 @@ class ControlFile:
     XB_DISPLAY_NAME = "XB-DisplayName"
     MAINTAINER = "Maintainer"
     PACKAGE = "Package"
+    DEPENDS = "Depends"
     YES = "yes"
     NO = "no"
     FILE = "file"
@@ -60,3 +67,5 @@ class PyProjectToml:
     AUTHOR = "authors"
     FILE_NAME = "pyproject.toml"
     META = "metadata"
+    DEPENDENCIES = "dependencies"
+    PATH = "path"
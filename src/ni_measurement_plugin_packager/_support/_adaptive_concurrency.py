@@ -0,0 +1,201 @@
+"""Concurrency limits that adapt to observed throughput, CPU load and server throttling."""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from logging import Logger
+from typing import Iterator, Optional
+
+from ni_measurement_plugin_packager._constants import StatusMessages
+from ni_measurement_plugin_packager._support._metrics import CONCURRENCY_LIMIT
+
+THROTTLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# Throughput a window must gain over the previous one to keep a raised limit.
+_MIN_THROUGHPUT_GAIN = 1.05
+# Most windows the limit is held for after raises that did not increase the throughput.
+_MAX_PROBE_BACKOFF_WINDOWS = 64
+# Load average per CPU above which the limit is not raised.
+_MAX_LOAD_PER_CPU = 1.0
+# Share of the CPUs used by the packager above which the limit is not raised, where the system
+# reports no load average.
+_MAX_CPU_UTILIZATION = 0.9
+
+
+@dataclass(frozen=True)
+class WorkerLimits:
+    """Bounds of the number of concurrent workers of a stage."""
+
+    max_workers: int = 1
+    min_workers: Optional[int] = None
+
+    @property
+    def adaptive(self) -> bool:
+        """Whether the number of workers is tuned between `min_workers` and `max_workers`."""
+        return self.min_workers is not None and self.min_workers < self.max_workers
+
+    def create_limiter(self, stage: str, logger: Logger) -> Optional["AdaptiveLimiter"]:
+        """Limiter for the stage, or None if the number of workers is fixed."""
+        if not self.adaptive or self.min_workers is None:
+            return None
+        return AdaptiveLimiter(stage, self.min_workers, self.max_workers, logger)
+
+
+def get_http_status_code(exception: BaseException) -> Optional[int]:
+    """HTTP status code of a failed SystemLink request, looking through chained exceptions.
+
+    Args:
+        exception: Exception raised by an upload or a build.
+
+    Returns:
+        Status code, or None if the exception does not come from an HTTP response.
+    """
+    current: Optional[BaseException] = exception
+    while current is not None:
+        # SystemLink client errors have `http_status_code`, urllib errors have `code`.
+        for attribute in ("http_status_code", "code"):
+            status_code = getattr(current, attribute, None)
+            if isinstance(status_code, int):
+                return status_code
+        current = current.__cause__
+    return None
+
+
+def _get_cpu_time() -> float:
+    # CPU time of the packager and of its finished child processes, such as nipkg. Windows
+    # does not report the CPU time of child processes.
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _is_cpu_saturated(window_duration: float, window_cpu_time: float) -> bool:
+    cpu_count = os.cpu_count() or 1
+    if hasattr(os, "getloadavg"):
+        return os.getloadavg()[0] / cpu_count > _MAX_LOAD_PER_CPU
+    # Windows has no load average, so the CPU time the packager used in the window is used.
+    return window_cpu_time / max(window_duration, 1e-9) / cpu_count > _MAX_CPU_UTILIZATION
+
+
+class AdaptiveLimiter:
+    """Concurrent task limit, tuned by additive increase and multiplicative decrease.
+
+    Tasks are observed in windows of as many tasks as the limit. After each window the limit is
+    raised by one, unless the CPUs are saturated or the previous raise did not increase the
+    bytes processed per second, as when more packs only thrash the disk, in which case it is
+    lowered by one again and held for a number of windows before the next raise. The number of
+    held windows doubles with each raise in a row that brings no gain, so the limit does not
+    keep swinging around the best one. A throttled or unavailable server halves the limit at
+    once.
+    """
+
+    def __init__(self, stage: str, min_limit: int, max_limit: int, logger: Logger) -> None:
+        """Create a limiter that starts at its lower bound.
+
+        Args:
+            stage: Name of the limited stage, for logs and metrics.
+            min_limit: Lowest limit.
+            max_limit: Highest limit.
+            logger: Logger object.
+        """
+        self.stage = stage
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.logger = logger
+        self._condition = threading.Condition()
+        self._limit = self.min_limit
+        self._active_count = 0
+        self._window_start = time.perf_counter()
+        self._window_cpu_time = _get_cpu_time()
+        self._window_count = 0
+        self._window_bytes = 0
+        self._previous_throughput: Optional[float] = None
+        self._previous_limit = self._limit
+        self._probe_backoff_windows = 1
+        self._held_windows = 0
+        CONCURRENCY_LIMIT.set(self._limit, stage=stage)
+
+    @property
+    def limit(self) -> int:
+        """Current number of tasks allowed to run at the same time."""
+        return self._limit
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Wait until the limit allows another task, and hold a slot for the enclosed block."""
+        with self._condition:
+            while self._active_count >= self._limit:
+                self._condition.wait()
+            self._active_count += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active_count -= 1
+                self._condition.notify_all()
+
+    def record(self, size: int, throttled: bool = False) -> None:
+        """Record a finished task and adjust the limit.
+
+        Args:
+            size: Bytes the task processed.
+            throttled: Whether the server throttled the task or was unavailable.
+        """
+        with self._condition:
+            if throttled:
+                self._set_limit(self._limit // 2, StatusMessages.CONCURRENCY_REASON_THROTTLED)
+                return
+
+            self._window_count += 1
+            self._window_bytes += max(size, 1)
+            if self._window_count < self._limit:
+                return
+
+            window_duration = time.perf_counter() - self._window_start
+            window_cpu_time = _get_cpu_time() - self._window_cpu_time
+            throughput = self._window_bytes / max(window_duration, 1e-9)
+            raised = self._limit > self._previous_limit
+            previous_throughput = self._previous_throughput
+            self._previous_throughput = throughput
+            self._previous_limit = self._limit
+            if raised and previous_throughput is not None:
+                if throughput < previous_throughput * _MIN_THROUGHPUT_GAIN:
+                    self._set_limit(self._limit - 1, StatusMessages.CONCURRENCY_REASON_NO_GAIN)
+                    self._held_windows = self._probe_backoff_windows
+                    self._probe_backoff_windows = min(
+                        self._probe_backoff_windows * 2, _MAX_PROBE_BACKOFF_WINDOWS
+                    )
+                    return
+                self._probe_backoff_windows = 1
+
+            if self._held_windows > 0 or _is_cpu_saturated(window_duration, window_cpu_time):
+                self._held_windows = max(0, self._held_windows - 1)
+                self._start_window()
+            else:
+                self._set_limit(self._limit + 1, StatusMessages.CONCURRENCY_REASON_PROBING)
+
+    def _start_window(self) -> None:
+        self._window_start = time.perf_counter()
+        self._window_cpu_time = _get_cpu_time()
+        self._window_count = 0
+        self._window_bytes = 0
+
+    def _set_limit(self, limit: int, reason: str) -> None:
+        limit = min(self.max_limit, max(self.min_limit, limit))
+        self._start_window()
+        if limit == self._limit:
+            return
+
+        self.logger.debug(
+            StatusMessages.CONCURRENCY_CHANGED.format(
+                stage=self.stage, old=self._limit, new=limit, reason=reason
+            )
+        )
+        if limit < self._limit:
+            # A lowered limit is the new baseline, so the next raise is measured against it.
+            self._previous_throughput = None
+        self._limit = limit
+        self._previous_limit = min(self._previous_limit, limit)
+        CONCURRENCY_LIMIT.set(limit, stage=self.stage)
+        self._condition.notify_all()
@@ -0,0 +1,235 @@
+"""Index of the packages built into the packages directory, with a retention policy."""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ni_measurement_plugin_packager._support._file_lock import LOCKS_DIRECTORY, file_lock
+
+ARTIFACT_INDEX_FILE_NAME = "index.json"
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+_index_locks: Dict[Path, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
+
+
+@dataclass
+class ArtifactEntry:
+    """Built package recorded in the artifact index."""
+
+    plugin_name: str
+    file_name: str
+    size: int
+    sha256: str
+    built_at: float
+
+
+# Package name, version and architecture of an entry.
+_EntryKey = Tuple[str, str, str]
+_Entries = Dict[str, Dict[str, Dict[str, ArtifactEntry]]]
+
+
+def get_file_sha256(file_path: Path) -> str:
+    """SHA-256 of a file, read in chunks.
+
+    Args:
+        file_path: File path.
+
+    Returns:
+        Hex digest of the file content.
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(_HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class ArtifactIndex:
+    """Manifest mapping package name, version and architecture to the built package file.
+
+    The manifest lives in the packages directory and is rewritten atomically, so readers
+    never see a partially written index. Updates hold a file lock, so packager processes
+    sharing the directory do not lose each other's entries.
+    """
+
+    def __init__(self, package_directory: Path) -> None:
+        """Open the artifact index of a packages directory.
+
+        Args:
+            package_directory: Directory the packages are built into.
+        """
+        self.package_directory = Path(package_directory)
+        self.index_path = self.package_directory / ARTIFACT_INDEX_FILE_NAME
+        self.lock_path = self.package_directory / LOCKS_DIRECTORY / "index.lock"
+        with _index_locks_guard:
+            self._lock = _index_locks.setdefault(self.index_path.resolve(), threading.Lock())
+
+    def get_entry(
+        self, package_name: str, version: str, architecture: str
+    ) -> Optional[ArtifactEntry]:
+        """Index entry of a package version built for an architecture."""
+        return self._load().get(package_name, {}).get(version, {}).get(architecture)
+
+    def find_entry(self, file_name: str) -> Optional[ArtifactEntry]:
+        """Index entry of a package file, if the file was built into this directory."""
+        for versions in self._load().values():
+            for architectures in versions.values():
+                for entry in architectures.values():
+                    if entry.file_name == file_name:
+                        return entry
+        return None
+
+    def record(
+        self,
+        package_name: str,
+        version: str,
+        architecture: str,
+        plugin_name: str,
+        package_path: Path,
+        sha256: Optional[str] = None,
+    ) -> ArtifactEntry:
+        """Add or replace the entry of a freshly built package.
+
+        Args:
+            package_name: Package name.
+            version: Package version.
+            architecture: Target architecture of the package.
+            plugin_name: Measurement plug-in name.
+            package_path: Built package file path.
+            sha256: SHA-256 of the package, if it was already computed while writing it.
+
+        Returns:
+            Recorded index entry.
+        """
+        entry = ArtifactEntry(
+            plugin_name=plugin_name,
+            file_name=Path(package_path).name,
+            size=Path(package_path).stat().st_size,
+            sha256=sha256 or get_file_sha256(package_path),
+            built_at=time.time(),
+        )
+        with self._lock, file_lock(self.lock_path):
+            entries = self._load()
+            entries.setdefault(package_name, {}).setdefault(version, {})[architecture] = entry
+            self._save(entries)
+        return entry
+
+    def apply_retention(
+        self, keep_versions: Optional[int] = None, max_total_size: Optional[int] = None
+    ) -> List[Path]:
+        """Delete the oldest packages that exceed the retention limits.
+
+        Versions are counted per package and architecture. The latest build of every package
+        and architecture is always kept.
+
+        Args:
+            keep_versions: Number of versions to keep per package and architecture.
+            max_total_size: Total size in bytes that the indexed packages may take.
+
+        Returns:
+            Deleted package file paths.
+        """
+        with self._lock, file_lock(self.lock_path):
+            entries = self._load()
+            flat_entries = {
+                (package_name, version, architecture): entry
+                for package_name, versions in entries.items()
+                for version, architectures in versions.items()
+                for architecture, entry in architectures.items()
+            }
+            builds: Dict[Tuple[str, str], List[_EntryKey]] = {}
+            for key in sorted(flat_entries, key=lambda key: flat_entries[key].built_at):
+                builds.setdefault((key[0], key[2]), []).append(key)
+
+            expired: List[_EntryKey] = []
+            candidates: List[_EntryKey] = []
+            for by_age in builds.values():
+                older_builds = by_age[:-1]
+                if keep_versions is not None:
+                    excess = max(len(by_age) - max(keep_versions, 1), 0)
+                    expired.extend(by_age[:excess])
+                    older_builds = by_age[excess:-1]
+                candidates.extend(older_builds)
+
+            if max_total_size is not None:
+                total_size = sum(
+                    entry.size for key, entry in flat_entries.items() if key not in expired
+                )
+                for key in sorted(candidates, key=lambda key: flat_entries[key].built_at):
+                    if total_size <= max_total_size:
+                        break
+                    expired.append(key)
+                    total_size -= flat_entries[key].size
+
+            removed_paths = []
+            for package_name, version, architecture in expired:
+                entry = entries[package_name][version].pop(architecture)
+                package_path = self.package_directory / entry.file_name
+                package_path.unlink(missing_ok=True)
+                removed_paths.append(package_path)
+                if not entries[package_name][version]:
+                    del entries[package_name][version]
+                if not entries[package_name]:
+                    del entries[package_name]
+
+            if removed_paths:
+                self._save(entries)
+            return removed_paths
+
+    def _load(self) -> _Entries:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+        entries: _Entries = {}
+        for package_name, versions in data.get("packages", {}).items():
+            for version, architectures in versions.items():
+                if "file_name" in architectures:
+                    # Indexes written before entries were keyed by architecture.
+                    _add_unkeyed_entry(entries, ArtifactEntry(**architectures))
+                    continue
+                for architecture, entry in architectures.items():
+                    entries.setdefault(package_name, {}).setdefault(version, {})[architecture] = (
+                        ArtifactEntry(**entry)
+                    )
+        return entries
+
+    def _save(self, entries: _Entries) -> None:
+        data = {
+            "packages": {
+                package_name: {
+                    version: {
+                        architecture: asdict(entry) for architecture, entry in architectures.items()
+                    }
+                    for version, architectures in versions.items()
+                }
+                for package_name, versions in entries.items()
+            }
+        }
+        self.package_directory.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=self.package_directory, prefix=f".{ARTIFACT_INDEX_FILE_NAME}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as fp:
+                json.dump(data, fp, indent=2)
+            os.replace(temp_path, self.index_path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+
+def _add_unkeyed_entry(entries: _Entries, entry: ArtifactEntry) -> None:
+    # nipkg names packages '<package>_<version>_<architecture>.nipkg'. Package names and
+    # versions never contain '_', while architectures such as 'windows_x64' do.
+    package_name, version, architecture = Path(entry.file_name).stem.split("_", 2)
+    entries.setdefault(package_name, {}).setdefault(version, {})[architecture] = entry
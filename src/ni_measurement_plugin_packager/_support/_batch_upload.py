@@ -0,0 +1,173 @@
+"""Publishing many packages to a SystemLink feed in batches."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from logging import Logger
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from nisystemlink_feeds_manager.clients.core import ApiException
+from nisystemlink_feeds_manager.clients.feeds.models import UploadPackageResponse
+from nisystemlink_feeds_manager.main import PublishPackagesToSystemLink
+
+from ni_measurement_plugin_packager._constants import StatusMessages
+from ni_measurement_plugin_packager._support._adaptive_concurrency import (
+    THROTTLE_STATUS_CODES,
+    AdaptiveLimiter,
+    WorkerLimits,
+    get_http_status_code,
+)
+from ni_measurement_plugin_packager._support._metrics import record_failure
+
+
+@dataclass(frozen=True)
+class UploadBatchOptions:
+    """Limits of the batches packages are uploaded in."""
+
+    max_packages: int
+    max_bytes: int
+    max_workers: int = 4
+    min_workers: Optional[int] = None
+    # Creates the SystemLink client of each upload worker. Without it, the packages are
+    # uploaded one at a time over the client of the run.
+    create_client: Optional[Callable[[], PublishPackagesToSystemLink]] = None
+
+
+@dataclass
+class PackageUploadResult:
+    """Outcome of uploading one package of a batch."""
+
+    package_path: Path
+    file_name: Optional[str] = None
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+def group_into_batches(
+    package_paths: List[Path], max_packages: int, max_bytes: int
+) -> List[List[Path]]:
+    """Split packages into batches, keeping their order.
+
+    Args:
+        package_paths: Package file paths.
+        max_packages: Largest number of packages in a batch.
+        max_bytes: Largest total size in bytes of a batch. A larger package gets a batch
+            of its own.
+
+    Returns:
+        Batches of package file paths.
+    """
+    batches: List[List[Path]] = []
+    batch_size = 0
+    for package_path in package_paths:
+        package_size = Path(package_path).stat().st_size
+        batch_full = len(batches[-1]) >= max_packages if batches else True
+        if batch_full or batch_size + package_size > max_bytes:
+            batches.append([])
+            batch_size = 0
+        batches[-1].append(package_path)
+        batch_size += package_size
+
+    return batches
+
+
+def _upload(
+    upload_package: Callable[[Path], UploadPackageResponse],
+    package_path: Path,
+    limiter: Optional[AdaptiveLimiter] = None,
+) -> PackageUploadResult:
+    status_code: Optional[int] = None
+    try:
+        with limiter.slot() if limiter else nullcontext():
+            start_time = time.perf_counter()
+            upload_response = upload_package(package_path)
+        result = PackageUploadResult(
+            package_path=package_path,
+            file_name=upload_response.file_name,
+            duration=time.perf_counter() - start_time,
+        )
+    except ApiException as ex:
+        record_failure(ex)
+        status_code = get_http_status_code(ex)
+        result = PackageUploadResult(
+            package_path=package_path,
+            duration=time.perf_counter() - start_time,
+            error=ex.error.message,
+        )
+    except Exception as ex:
+        record_failure(ex)
+        status_code = get_http_status_code(ex)
+        result = PackageUploadResult(
+            package_path=package_path,
+            duration=time.perf_counter() - start_time,
+            error=str(ex),
+        )
+
+    if limiter:
+        limiter.record(
+            Path(package_path).stat().st_size, throttled=status_code in THROTTLE_STATUS_CODES
+        )
+    return result
+
+
+def upload_in_batches(
+    logger: Logger,
+    create_upload_package: Callable[[], Callable[[Path], UploadPackageResponse]],
+    package_paths: List[Path],
+    options: UploadBatchOptions,
+) -> List[PackageUploadResult]:
+    """Upload packages batch by batch, running the uploads of a batch concurrently.
+
+    A failed upload does not stop the other uploads of its batch or the following batches.
+
+    Args:
+        logger: Logger object.
+        create_upload_package: Creates a function that uploads one package. Each upload worker
+            thread creates its own, so that workers do not share a SystemLink client.
+        package_paths: Package file paths.
+        options: Batch limits and number of concurrent uploads. With `min_workers`, the
+            number of concurrent uploads is tuned between `min_workers` and `max_workers`.
+
+    Returns:
+        Result of each upload, in the order of `package_paths`.
+    """
+    batches = group_into_batches(package_paths, options.max_packages, options.max_bytes)
+    results: List[PackageUploadResult] = []
+    if not batches:
+        return results
+
+    limiter = WorkerLimits(options.max_workers, options.min_workers).create_limiter(
+        "upload", logger
+    )
+    worker_state = threading.local()
+
+    def upload_package(package_path: Path) -> UploadPackageResponse:
+        if not hasattr(worker_state, "upload_package"):
+            worker_state.upload_package = create_upload_package()
+        return worker_state.upload_package(package_path)
+
+    with ThreadPoolExecutor(
+        max_workers=options.max_workers, thread_name_prefix="packager-upload"
+    ) as executor:
+        for batch_index, batch in enumerate(batches, start=1):
+            start_time = time.perf_counter()
+            batch_results = list(
+                executor.map(
+                    lambda package_path: _upload(upload_package, package_path, limiter), batch
+                )
+            )
+            logger.info(
+                StatusMessages.BATCH_UPLOADED.format(
+                    index=batch_index,
+                    count=len(batches),
+                    uploaded=sum(1 for result in batch_results if not result.error),
+                    total=len(batch),
+                    duration=time.perf_counter() - start_time,
+                )
+            )
+            results.extend(batch_results)
+
+    return results
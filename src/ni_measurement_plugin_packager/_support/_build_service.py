@@ -0,0 +1,467 @@
+"""Long-running build service that packages and publishes measurement plug-ins on request."""
+
+import hmac
+import ipaddress
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ni_measurement_plugin_packager._constants import PACKAGES, StatusMessages
+from ni_measurement_plugin_packager._support._helpers import _get_packager_root_directory
+from ni_measurement_plugin_packager._support._metrics import (
+    METRICS_CONTENT_TYPE,
+    record_failure,
+    render_metrics,
+)
+from ni_measurement_plugin_packager._support._session import PackagingSession
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Finished jobs are kept for status queries up to this count and age.
+MAX_FINISHED_JOBS = 1000
+FINISHED_JOB_RETENTION_SECONDS = 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class UploadTarget:
+    """SystemLink feed that a job publishes its package to."""
+
+    api_url: str
+    api_key: str
+    workspace: str
+    feed_name: str
+    overwrite: bool = False
+
+
+@dataclass
+class BuildJob:
+    """Build and publish request for a single measurement plug-in."""
+
+    job_id: str
+    plugin_path: Path
+    upload_target: Optional[UploadTarget]
+    status: str = QUEUED
+    messages: List[str] = field(default_factory=list)
+    package_path: Optional[Path] = None
+    package_sha256: Optional[str] = None
+    uploaded_file_name: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def key(self) -> Tuple[Path, Optional[UploadTarget]]:
+        """Jobs sharing this key produce the same result and can be coalesced."""
+        return self.plugin_path, self.upload_target
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has finished running."""
+        return self.status in (SUCCEEDED, FAILED)
+
+    def add_message(self, message: str) -> None:
+        """Record a progress message and wake up any listeners."""
+        with self.changed:
+            self.messages.append(message)
+            self.changed.notify_all()
+
+    def set_status(self, status: str) -> None:
+        """Update the job status and wake up any listeners."""
+        with self.changed:
+            self.status = status
+            if status == RUNNING:
+                self.started_at = time.time()
+            elif self.done:
+                self.finished_at = time.time()
+            self.changed.notify_all()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable view of the job, without credentials."""
+        return {
+            "id": self.job_id,
+            "plugin_path": str(self.plugin_path),
+            "feed_name": self.upload_target.feed_name if self.upload_target else None,
+            "status": self.status,
+            "package_path": str(self.package_path) if self.package_path else None,
+            "package_sha256": self.package_sha256,
+            "uploaded_file_name": self.uploaded_file_name,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class _JobLogHandler(logging.Handler):
+    """Route log records emitted by a worker thread to the job it is running."""
+
+    def __init__(self) -> None:
+        super().__init__(level=logging.INFO)
+        self._jobs: Dict[int, BuildJob] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, job: BuildJob) -> None:
+        with self._lock:
+            self._jobs[threading.get_ident()] = job
+
+    def detach(self) -> None:
+        with self._lock:
+            self._jobs.pop(threading.get_ident(), None)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        with self._lock:
+            job = self._jobs.get(record.thread) if record.thread else None
+        if job:
+            job.add_message(record.getMessage())
+
+
+class BuildService:
+    """Schedule build and publish jobs on a bounded worker pool with warm caches."""
+
+    def __init__(
+        self,
+        session: PackagingSession,
+        max_workers: int,
+        max_finished_jobs: int = MAX_FINISHED_JOBS,
+        finished_job_retention: float = FINISHED_JOB_RETENTION_SECONDS,
+    ) -> None:
+        """Create a build service.
+
+        Args:
+            session: Packaging session that keeps the caches and SystemLink clients warm.
+            max_workers: Maximum number of jobs that run at the same time.
+            max_finished_jobs: Number of finished jobs kept for status queries. Older ones
+                are forgotten.
+            finished_job_retention: Seconds a finished job is kept for status queries.
+        """
+        self.session = session
+        self.logger = session.logger
+        self.max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+        self.finished_job_retention = finished_job_retention
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="packager-worker"
+        )
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, BuildJob] = {}
+        self._queued: Dict[Tuple[Path, Optional[UploadTarget]], BuildJob] = {}
+        self._log_handler = _JobLogHandler()
+        self.logger.addHandler(self._log_handler)
+
+    def submit(
+        self,
+        plugin_paths: List[Path],
+        upload_target: Optional[UploadTarget],
+    ) -> List[BuildJob]:
+        """Queue a job per plug-in, reusing jobs that are still waiting for the same work.
+
+        Args:
+            plugin_paths: Measurement plug-in paths.
+            upload_target: Feed to publish the packages to, if any.
+
+        Returns:
+            Jobs that will produce the requested packages.
+        """
+        self._evict_finished_jobs()
+        jobs = []
+        for plugin_path in plugin_paths:
+            key = (Path(plugin_path).resolve(), upload_target)
+            with self._lock:
+                job = self._queued.get(key)
+                if job:
+                    self.logger.info(
+                        StatusMessages.JOB_COALESCED.format(name=key[0].name, job_id=job.job_id)
+                    )
+                else:
+                    job = BuildJob(
+                        job_id=uuid.uuid4().hex,
+                        plugin_path=key[0],
+                        upload_target=upload_target,
+                    )
+                    self._jobs[job.job_id] = job
+                    self._queued[key] = job
+                    self._executor.submit(self._run_job, job)
+                    self.logger.info(
+                        StatusMessages.JOB_QUEUED.format(job_id=job.job_id, name=key[0].name)
+                    )
+            jobs.append(job)
+
+        return jobs
+
+    def get_job(self, job_id: str) -> Optional[BuildJob]:
+        """Look up a job by its ID."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[BuildJob]:
+        """All jobs known to the service, oldest first."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+
+    def shutdown(self) -> None:
+        """Wait for running jobs and release the worker pool."""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+        self.logger.removeHandler(self._log_handler)
+
+    def _evict_finished_jobs(self) -> None:
+        # Queued and running jobs are never evicted.
+        now = time.time()
+        with self._lock:
+            finished_jobs = sorted(
+                (job for job in self._jobs.values() if job.done),
+                key=lambda job: job.finished_at or job.created_at,
+            )
+            excess_count = len(finished_jobs) - self.max_finished_jobs
+            for index, job in enumerate(finished_jobs):
+                expired = now - (job.finished_at or job.created_at) > self.finished_job_retention
+                if index < excess_count or expired:
+                    del self._jobs[job.job_id]
+
+    def _run_job(self, job: BuildJob) -> None:
+        with self._lock:
+            self._queued.pop(job.key, None)
+        job.set_status(RUNNING)
+        self._log_handler.attach(job)
+        try:
+            build_result = self.session.build(job.plugin_path)
+            job.package_path = build_result.package_path
+            job.package_sha256 = build_result.sha256
+
+            if job.upload_target and build_result.package_path:
+                upload_result = self.session.upload(
+                    package_path=build_result.package_path,
+                    api_url=job.upload_target.api_url,
+                    api_key=job.upload_target.api_key,
+                    workspace=job.upload_target.workspace,
+                    feed_name=job.upload_target.feed_name,
+                    overwrite=job.upload_target.overwrite,
+                )
+                job.uploaded_file_name = upload_result.file_name
+            job.set_status(SUCCEEDED)
+
+        except Exception as ex:
+            record_failure(ex)
+            self.logger.debug(ex, exc_info=True)
+            job.error = getattr(getattr(ex, "error", None), "message", None) or str(ex)
+            self.logger.info(
+                StatusMessages.JOB_FAILED.format(
+                    job_id=job.job_id, name=job.plugin_path.name, error=job.error
+                )
+            )
+            job.set_status(FAILED)
+
+        finally:
+            self._log_handler.detach()
+            self._evict_finished_jobs()
+
+
+def _parse_upload_target(payload: Dict[str, Any]) -> Optional[UploadTarget]:
+    upload = payload.get("upload")
+    if not upload:
+        return None
+    if not isinstance(upload, dict):
+        raise ValueError("'upload' must be a JSON object.")
+
+    required_keys = ("api_url", "api_key", "workspace", "feed_name")
+    missing = [key for key in required_keys if not upload.get(key)]
+    if missing:
+        raise ValueError(f"Missing upload settings: {', '.join(missing)}")
+
+    return UploadTarget(
+        api_url=upload["api_url"],
+        api_key=upload["api_key"],
+        workspace=upload["workspace"],
+        feed_name=upload["feed_name"],
+        overwrite=bool(upload.get("overwrite", False)),
+    )
+
+
+class _BuildServiceRequestHandler(BaseHTTPRequestHandler):
+    """HTTP API of the build service.
+
+    POST /jobs              Submit {"input_path": ...} or {"base_input_dir": ...,
+                            "plugin_dir_name": ...} with an optional "upload" object holding
+                            the SystemLink feed settings.
+    GET  /jobs              List all jobs.
+    GET  /jobs/<id>         Get the status of a job.
+    GET  /jobs/<id>/events  Stream the progress messages of a job as JSON lines until it finishes.
+    GET  /metrics           Packaging metrics in the Prometheus text format.
+
+    With a token, every request must send it as 'Authorization: Bearer <token>'.
+    """
+
+    server: "_BuildServiceHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        self.server.service.logger.debug(format, *args)
+
+    def _send_json(self, status: HTTPStatus, body: Any) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _is_authorized(self) -> bool:
+        token = self.server.token
+        if not token:
+            return True
+        authorization = self.headers.get("Authorization", "")
+        if hmac.compare_digest(authorization.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            return True
+        self._send_json(HTTPStatus.UNAUTHORIZED, {"error": "Unauthorized."})
+        return False
+
+    def do_POST(self) -> None:
+        service = self.server.service
+        if not self._is_authorized():
+            return
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("The request body must be a JSON object.")
+            upload_target = _parse_upload_target(payload)
+            if payload.get("input_path"):
+                plugin_paths = [Path(payload["input_path"])]
+            elif payload.get("base_input_dir") and payload.get("plugin_dir_name"):
+                plugin_paths = service.session.discover(
+                    Path(payload["base_input_dir"]), payload["plugin_dir_name"]
+                )
+            else:
+                raise ValueError("Provide 'input_path' or 'base_input_dir' and 'plugin_dir_name'.")
+        except (ValueError, OSError) as ex:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(ex)})
+            return
+
+        jobs = service.submit(plugin_paths, upload_target)
+        self._send_json(HTTPStatus.ACCEPTED, {"jobs": [job.to_dict() for job in jobs]})
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        if not self._is_authorized():
+            return
+        parts = [part for part in self.path.split("/") if part]
+
+        if parts == ["metrics"]:
+            body = render_metrics().encode("utf-8")
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", METRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if parts == ["jobs"]:
+            self._send_json(HTTPStatus.OK, {"jobs": [job.to_dict() for job in service.list_jobs()]})
+            return
+
+        job = service.get_job(parts[1]) if len(parts) in (2, 3) and parts[0] == "jobs" else None
+        if not job or (len(parts) == 3 and parts[2] != "events"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found."})
+            return
+
+        if len(parts) == 2:
+            self._send_json(HTTPStatus.OK, job.to_dict())
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        sent = 0
+        while True:
+            with job.changed:
+                while sent == len(job.messages) and not job.done:
+                    job.changed.wait()
+                messages = job.messages[sent:]
+                done = job.done
+            for message in messages:
+                self.wfile.write(json.dumps({"message": message}).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            sent += len(messages)
+            if done:
+                self.wfile.write(json.dumps(job.to_dict()).encode("utf-8") + b"\n")
+                break
+
+
+class _BuildServiceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self, address: Tuple[str, int], service: BuildService, token: Optional[str] = None
+    ) -> None:
+        super().__init__(address, _BuildServiceRequestHandler)
+        self.service = service
+        self.token = token
+
+
+def is_loopback_host(host: str) -> bool:
+    """Check whether a host name or address only accepts connections from this computer."""
+    if host.lower() == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(
+    logger: Logger, host: str, port: int, max_workers: int, token: Optional[str] = None
+) -> None:
+    """Run the build service until interrupted.
+
+    Args:
+        logger: Logger object with a file handler.
+        host: Interface to listen on.
+        port: Port to listen on.
+        max_workers: Maximum number of jobs that run at the same time.
+        token: Token that requests must send as a bearer token. Required unless the host
+            is a loopback interface, since jobs carry SystemLink API keys.
+
+    Raises:
+        ValueError: If the host is not a loopback interface and no token is given.
+    """
+    if not token and not is_loopback_host(host):
+        raise ValueError(StatusMessages.SERVICE_TOKEN_REQUIRED.format(host=host))
+
+    packager_root_directory = _get_packager_root_directory(logger=logger)
+    if not packager_root_directory:
+        raise FileNotFoundError(StatusMessages.INVALID_PACKAGER_PATH)
+
+    session = PackagingSession(
+        output_directory=packager_root_directory / PACKAGES,
+        staging_directory=packager_root_directory,
+        logger=logger,
+    )
+    service = BuildService(session=session, max_workers=max_workers)
+    server = _BuildServiceHTTPServer((host, port), service, token)
+    logger.info(StatusMessages.SERVICE_STARTED.format(host=host, port=port, workers=max_workers))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        logger.info(StatusMessages.SERVICE_STOPPED)
@@ -0,0 +1,100 @@
+"""Selecting the measurement plug-ins touched by the git changes since a ref."""
+
+import shutil
+import subprocess  # nosec: B404
+from pathlib import Path
+from typing import List, Sequence
+
+import tomli
+
+from ni_measurement_plugin_packager._constants import StatusMessages
+from ni_measurement_plugin_packager._support._pyproject_toml_info import get_path_dependencies
+
+
+def _run_git(arguments: List[str], working_directory: Path) -> str:
+    git_executable = shutil.which("git")
+    if not git_executable:
+        raise FileNotFoundError(StatusMessages.GIT_NOT_FOUND)
+
+    completed_process = subprocess.run(  # nosec: B603
+        [git_executable, *arguments],
+        cwd=working_directory,
+        shell=False,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return completed_process.stdout
+
+
+def get_changed_files(directory_path: Path, ref: str) -> List[Path]:
+    """Files changed on HEAD since it diverged from a ref.
+
+    The comparison starts at the merge base of the ref and HEAD, like the changes of a pull
+    request. A renamed file is reported at its old and its new path.
+
+    Args:
+        directory_path: Directory inside the git working tree.
+        ref: Branch, tag or commit to compare HEAD with.
+
+    Returns:
+        Resolved paths of the changed files, including deleted files.
+
+    Raises:
+        FileNotFoundError: If git is not installed.
+        subprocess.CalledProcessError: If the directory is not in a git working tree or the
+            ref does not exist.
+    """
+    repository_path = Path(_run_git(["rev-parse", "--show-toplevel"], directory_path).strip())
+    changed_file_names = _run_git(
+        ["diff", "--name-only", "--no-renames", "-z", f"{ref}...HEAD", "--"],
+        repository_path,
+    )
+    return [
+        (repository_path / file_name).resolve()
+        for file_name in changed_file_names.split("\0")
+        if file_name
+    ]
+
+
+def _contains_changes(directory_path: Path, changed_files: Sequence[Path]) -> bool:
+    return any(
+        changed_file == directory_path or directory_path in changed_file.parents
+        for changed_file in changed_files
+    )
+
+
+def select_changed_plugins(
+    plugin_root_directory: Path,
+    measurement_plugins: List[str],
+    changed_files: Sequence[Path],
+    shared_paths: Sequence[Path] = (),
+) -> List[str]:
+    """Select the plug-ins whose files or local dependencies changed.
+
+    Args:
+        plugin_root_directory: Measurement plug-ins root directory path.
+        measurement_plugins: Measurement plug-in directory names or paths.
+        changed_files: Resolved paths of the changed files.
+        shared_paths: Files and directories that every plug-in depends on.
+
+    Returns:
+        Changed plug-ins, in the order of `measurement_plugins`. All of them if a shared
+        path changed. Plug-ins whose pyproject.toml cannot be read count as changed.
+    """
+    if any(_contains_changes(Path(path).resolve(), changed_files) for path in shared_paths):
+        return list(measurement_plugins)
+
+    changed_plugins = []
+    for measurement_plugin in measurement_plugins:
+        plugin_path = (Path(plugin_root_directory) / measurement_plugin).resolve()
+        try:
+            dependency_paths = [plugin_path, *get_path_dependencies(plugin_path)]
+        except (OSError, tomli.TOMLDecodeError):
+            # Selected as changed, so that validation reports the unreadable pyproject.toml.
+            changed_plugins.append(measurement_plugin)
+            continue
+        if any(_contains_changes(path, changed_files) for path in dependency_paths):
+            changed_plugins.append(measurement_plugin)
+
+    return changed_plugins
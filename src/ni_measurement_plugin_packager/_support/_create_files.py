@@ -2,15 +2,22 @@
 
 import platform
 import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 
 from ni_measurement_plugin_packager._constants import (
+    PACKAGER_DIRECTORY,
     ControlFile,
     FileNames,
     InstructionFile,
 )
 from ni_measurement_plugin_packager._support import _get_nipath
+from ni_measurement_plugin_packager._support._large_files import copy_file
 from ni_measurement_plugin_packager._support._package_info import PackageInfo
+from ni_measurement_plugin_packager._support._payload_profiles import get_excluding_rule
 
 ignore_dirs = [
     ".venv",
@@ -26,11 +33,81 @@ ignore_dirs = [
     "coverage.xml",
 ]
 
+# Script of the runtime package that installs its wheels once for all plug-ins of a station and
+# links them into the environment of the plug-in that runs it.
+_LINK_RUNTIME_SCRIPT = f'''\
+"""Install the shared dependencies once and add them to the environment running this script."""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import sysconfig
+from pathlib import Path
+
+runtime_path = Path(__file__).resolve().parent
+requirements_path = runtime_path / "{FileNames.REQUIREMENTS}"
+# One directory per set of pinned requirements and Python version.
+environment_path = (
+    runtime_path
+    / "{FileNames.RUNTIME_ENVIRONMENTS}"
+    / "-".join(
+        [
+            sys.implementation.cache_tag,
+            hashlib.sha256(requirements_path.read_bytes()).hexdigest()[:12],
+        ]
+    )
+)
+if not environment_path.is_dir():
+    staging_path = environment_path.with_name(environment_path.name + "." + str(os.getpid()))
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--no-index",
+            "--find-links",
+            str(runtime_path / "{FileNames.WHEELS}"),
+            "--target",
+            str(staging_path),
+            "-r",
+            str(requirements_path),
+        ],
+        check=True,
+    )
+    try:
+        # Of plug-ins that start at the same time, the first to finish installs its copy.
+        staging_path.rename(environment_path)
+    except OSError:
+        shutil.rmtree(staging_path, ignore_errors=True)
+
+link_path = Path(sysconfig.get_paths()["purelib"]) / (runtime_path.name + ".pth")
+link_path.write_text(str(environment_path) + "\\n", encoding="utf-8")
+'''
+
+# Bytes of the RAM-backed file system reserved by the builds of this process that stage there.
+_ram_reserved_bytes = 0
+_ram_reserved_bytes_lock = threading.Lock()
+
 
 def _get_measurement_services_path(plugin_name: str) -> Path:
     return _get_nipath("NIPUBAPPDATADIR") / "Plug-Ins" / "Measurements" / plugin_name
 
 
+def get_runtime_path(package_name: str) -> Path:
+    """Directory a shared runtime package installs its wheels in.
+
+    Args:
+        package_name: Runtime package name.
+
+    Returns:
+        Install directory path.
+    """
+    return _get_nipath("NIPUBAPPDATADIR") / "Plug-Ins" / "Runtimes" / package_name
+
+
 def _get_system_type() -> str:
     system = platform.system().lower()
     architecture = platform.machine().lower()
@@ -47,41 +124,164 @@ def _get_system_type() -> str:
     return f"{system}_{architecture}"
 
 
-def _copy_directory_with_filters(source_directory: Path, destination_directory: Path) -> None:
+def _copy_directory_with_filters(
+    source_directory: Path,
+    destination_directory: Path,
+    payload_profile: Optional[str] = None,
+    saved_bytes: Optional[Dict[str, int]] = None,
+    plugin_root: Optional[Path] = None,
+) -> None:
+    plugin_root = plugin_root or source_directory
     for item in source_directory.iterdir():
         if item.name in ignore_dirs:
             continue
+        excluding_rule = get_excluding_rule(item, payload_profile, plugin_root)
+        if excluding_rule:
+            if saved_bytes is not None:
+                item_size = get_payload_size(item) if item.is_dir() else item.stat().st_size
+                saved_bytes[excluding_rule.name] = (
+                    saved_bytes.get(excluding_rule.name, 0) + item_size
+                )
+            continue
         dest_item = destination_directory / item.name
         if item.is_dir():
             dest_item.mkdir(parents=True, exist_ok=True)
-            _copy_directory_with_filters(item, dest_item)
+            _copy_directory_with_filters(item, dest_item, payload_profile, saved_bytes, plugin_root)
         else:
-            shutil.copy2(item, dest_item)
+            copy_file(item, dest_item)
 
 
-def _generate_control_file(control_directory_path: Path, package_info: PackageInfo) -> None:
-    control_file_path = control_directory_path / FileNames.CONTROL
+def iter_payload_files(
+    source_directory: Path, payload_profile: Optional[str] = None
+) -> Iterator[Path]:
+    """Plug-in files that are copied into the package.
+
+    Args:
+        source_directory: Path of the Measurement plug-in.
+        payload_profile: Payload profile whose rules leave files out of the package.
+
+    Returns:
+        Payload file paths.
+    """
+    plugin_root = Path(source_directory)
+    directories = [plugin_root]
+    while directories:
+        for item in directories.pop().iterdir():
+            if item.name in ignore_dirs or get_excluding_rule(item, payload_profile, plugin_root):
+                continue
+            if item.is_dir():
+                directories.append(item)
+            else:
+                yield item
+
+
+def get_payload_size(source_directory: Path, payload_profile: Optional[str] = None) -> int:
+    """Total size of the plug-in files that are copied into the package.
+
+    Args:
+        source_directory: Path of the Measurement plug-in.
+        payload_profile: Payload profile whose rules leave files out of the package.
+
+    Returns:
+        Payload size in bytes.
+    """
+    return sum(
+        file_path.stat().st_size
+        for file_path in iter_payload_files(source_directory, payload_profile)
+    )
+
+
+@contextmanager
+def reserve_staging_directory(
+    default_staging_directory: Path,
+    ram_staging_directory: Optional[Path],
+    payload_size: int,
+    ram_staging_limit: int,
+) -> Iterator[Path]:
+    """Select the directory to stage the template files in for the duration of a build.
+
+    Payloads up to `ram_staging_limit` bytes are staged on the RAM disk when one is configured
+    and has enough free space. The space is reserved until the block exits, so concurrent
+    builds of this process do not count the same free space twice.
+
+    Args:
+        default_staging_directory: Staging directory used when the payload is not staged in RAM.
+        ram_staging_directory: Directory on a RAM disk. None disables RAM staging.
+        payload_size: Payload size in bytes.
+        ram_staging_limit: Largest payload size in bytes to stage in RAM. 0 disables RAM staging.
+
+    Yields:
+        Staging directory path.
+    """
+    global _ram_reserved_bytes
+
+    # Leave room for the template files next to the payload.
+    reserved_bytes = 2 * payload_size
+    with _ram_reserved_bytes_lock:
+        stage_in_ram = bool(
+            ram_staging_directory
+            and 0 < payload_size <= ram_staging_limit
+            and ram_staging_directory.is_dir()
+            and shutil.disk_usage(ram_staging_directory).free - _ram_reserved_bytes > reserved_bytes
+        )
+        if stage_in_ram:
+            _ram_reserved_bytes += reserved_bytes
+
+    if not stage_in_ram or not ram_staging_directory:
+        yield Path(default_staging_directory)
+        return
+
+    try:
+        yield ram_staging_directory / PACKAGER_DIRECTORY
+    finally:
+        with _ram_reserved_bytes_lock:
+            _ram_reserved_bytes -= reserved_bytes
+
+
+def get_control_file_content(package_info: PackageInfo, architecture: Optional[str] = None) -> str:
+    """Content of the control file of a measurement package.
 
-    control_file_data = f"""\
+    Args:
+        package_info: Measurement package information.
+        architecture: Target architecture. Defaults to the architecture of this system.
+
+    Returns:
+        Control file fields, one per line.
+    """
+    control_content = f"""\
 {ControlFile.BUILT_USING}: {ControlFile.NIPKG}
 {ControlFile.SECTION}: {ControlFile.ADD_ONS}
 {ControlFile.XB_PLUGIN}: {ControlFile.FILE}
 {ControlFile.XB_STOREPRODUCT}: {ControlFile.NO}
 {ControlFile.XB_USER_VISIBLE}: {ControlFile.YES}
 {ControlFile.XB_VISIBLE_RUNTIME}: {ControlFile.NO}
-{ControlFile.ARCHITECTURE}: {_get_system_type()}
+{ControlFile.ARCHITECTURE}: {architecture or _get_system_type()}
 {ControlFile.DESCRIPTION}: {package_info.description}
 {ControlFile.VERSION}: {package_info.version}
 {ControlFile.XB_DISPLAY_NAME}: {package_info.plugin_name}
 {ControlFile.MAINTAINER}: {package_info.author}
 {ControlFile.PACKAGE}: {package_info.package_name.lower()}"""
+    if package_info.depends:
+        control_content += f"\n{ControlFile.DEPENDS}: {package_info.depends}"
+
+    return control_content
+
+
+def _generate_control_file(
+    control_directory_path: Path, package_info: PackageInfo, architecture: Optional[str]
+) -> None:
+    control_file_path = control_directory_path / FileNames.CONTROL
 
     with open(control_file_path, "w", encoding="utf-8") as fp:
-        fp.write(control_file_data)
+        fp.write(get_control_file_content(package_info, architecture))
 
 
-def _generate_instruction_file(data_path: Path, plugin_name: str, package_name: str) -> None:
-    measurement_service_path = _get_measurement_services_path(plugin_name=plugin_name)
+def _generate_instruction_file(
+    data_path: Path, plugin_name: str, package_name: str, install_path: Optional[Path] = None
+) -> None:
+    measurement_service_path = install_path or _get_measurement_services_path(
+        plugin_name=plugin_name
+    )
     instruction_path = data_path / InstructionFile.INSTRUCTION
 
     instruction_data = f"""\
@@ -95,25 +295,52 @@ def _generate_instruction_file(data_path: Path, plugin_name: str, package_name:
         fp.write(instruction_data)
 
 
+def _add_runtime_install_step(start_file_path: Path, runtime_package_info: PackageInfo) -> None:
+    runtime_path = get_runtime_path(runtime_package_info.package_name)
+    install_step = f"""\
+@echo off
+REM Link the dependencies shared through '{runtime_package_info.package_name}' into the plug-in environment.
+if not exist "%~dp0.venv\\Scripts\\python.exe" python -m venv "%~dp0.venv" || exit /b 1
+"%~dp0.venv\\Scripts\\python.exe" "{runtime_path / FileNames.LINK_RUNTIME}" || exit /b 1
+"""
+    start_file_content = start_file_path.read_bytes()
+    with open(start_file_path, "wb") as fp:
+        fp.write(install_step.replace("\n", "\r\n").encode("utf-8"))
+        fp.write(start_file_content)
+
+
 def generate_template_directories(
     packager_root_directory: Path,
     measurement_plugin_path: Path,
     measurement_package_info: PackageInfo,
+    architecture: Optional[str] = None,
+    payload_profile: Optional[str] = None,
+    saved_bytes: Optional[Dict[str, int]] = None,
+    runtime_package_info: Optional[PackageInfo] = None,
 ) -> Path:
     """Create template directories for building NI Packages.
 
     Args:
-        packager_root_directory: Measurement Plug-in Packager path.
+        packager_root_directory: Directory to create the template directory in.
         measurement_plugin_path: Path of the Measurement plug-in.
         measurement_package_info: Measurement package information.
+        architecture: Target architecture. Defaults to the architecture of this system.
+        payload_profile: Payload profile whose rules leave files out of the package.
+        saved_bytes: Filled with the bytes each rule of the profile left out.
+        runtime_package_info: Runtime package the plug-in depends on. Its start script then
+            links the shared dependencies of the runtime into the plug-in environment first.
 
     Returns:
         Template directory path.
     """
-    template_directory = Path(packager_root_directory) / measurement_package_info.plugin_name
-
-    if template_directory.is_dir():
-        shutil.rmtree(template_directory)
+    # Every build gets its own template directory, so concurrent builds never share one.
+    Path(packager_root_directory).mkdir(parents=True, exist_ok=True)
+    template_directory = Path(
+        tempfile.mkdtemp(
+            prefix=f"{measurement_package_info.plugin_name}-",
+            dir=packager_root_directory,
+        )
+    )
 
     data_directory = template_directory / FileNames.DATA
     template_measurement_directory_path = data_directory / measurement_package_info.package_name
@@ -126,10 +353,18 @@ def generate_template_directories(
     _copy_directory_with_filters(
         source_directory=Path(measurement_plugin_path),
         destination_directory=Path(template_measurement_directory_path),
+        payload_profile=payload_profile,
+        saved_bytes=saved_bytes,
     )
+    if runtime_package_info:
+        _add_runtime_install_step(
+            start_file_path=template_measurement_directory_path / FileNames.BATCH_FILE,
+            runtime_package_info=runtime_package_info,
+        )
     _generate_control_file(
         control_directory_path=control_directory_path,
         package_info=measurement_package_info,
+        architecture=architecture,
     )
     _generate_instruction_file(
         data_path=data_directory,
@@ -142,3 +377,67 @@ def generate_template_directories(
         fp.write("2.0")
 
     return template_directory
+
+
+def generate_runtime_template_directory(
+    packager_root_directory: Path,
+    runtime_package_info: PackageInfo,
+    wheel_paths: List[Path],
+    requirements: List[str],
+    architecture: Optional[str] = None,
+) -> Path:
+    """Create the template directory of a shared runtime package.
+
+    The package installs the wheels, a `requirements.txt` that pins them and a script in the
+    runtime directory. The first plug-in that runs the script installs the wheels without an
+    index, once per Python version, and every plug-in that runs it adds them to its environment.
+
+    Args:
+        packager_root_directory: Directory to create the template directory in.
+        runtime_package_info: Runtime package information.
+        wheel_paths: Wheels to include.
+        requirements: Pinned requirements of the runtime, one per line of `requirements.txt`.
+        architecture: Target architecture. Defaults to the architecture of this system.
+
+    Returns:
+        Template directory path.
+    """
+    Path(packager_root_directory).mkdir(parents=True, exist_ok=True)
+    template_directory = Path(
+        tempfile.mkdtemp(
+            prefix=f"{runtime_package_info.plugin_name}-",
+            dir=packager_root_directory,
+        )
+    )
+
+    data_directory = template_directory / FileNames.DATA
+    wheels_directory = data_directory / runtime_package_info.package_name / FileNames.WHEELS
+    control_directory_path = template_directory / FileNames.CONTROL
+
+    control_directory_path.mkdir(parents=True, exist_ok=True)
+    wheels_directory.mkdir(parents=True, exist_ok=True)
+
+    for wheel_path in wheel_paths:
+        copy_file(wheel_path, wheels_directory / wheel_path.name)
+    with open(wheels_directory.parent / FileNames.REQUIREMENTS, "w", encoding="utf-8") as fp:
+        fp.write("".join(f"{requirement}\n" for requirement in requirements))
+    with open(wheels_directory.parent / FileNames.LINK_RUNTIME, "w", encoding="utf-8") as fp:
+        fp.write(_LINK_RUNTIME_SCRIPT)
+
+    _generate_control_file(
+        control_directory_path=control_directory_path,
+        package_info=runtime_package_info,
+        architecture=architecture,
+    )
+    _generate_instruction_file(
+        data_path=data_directory,
+        plugin_name=runtime_package_info.plugin_name,
+        package_name=runtime_package_info.package_name,
+        install_path=get_runtime_path(runtime_package_info.package_name),
+    )
+
+    debian_binary_file = template_directory / FileNames.DEBIAN_BIN
+    with open(debian_binary_file, "w", encoding="utf-8") as fp:
+        fp.write("2.0")
+
+    return template_directory
@@ -0,0 +1,365 @@
+"""Local SQLite index of the packages published in SystemLink feeds."""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from email.message import Message
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+from ni_measurement_plugin_packager._constants import StatusMessages
+from ni_measurement_plugin_packager._support._metrics import record_cache_lookup
+from ni_measurement_plugin_packager._support._remote_cache import (
+    FEED,
+    WORKSPACE,
+    RemoteIdCache,
+)
+
+FEED_INDEX_FILE_NAME = "feed-index.sqlite3"
+
+_API_KEY_HEADER = "x-ni-api-key"
+_REQUEST_TIMEOUT_IN_SECONDS = 60
+
+# Feed IDs are kept only in the remote ID cache; the index refers to feeds by name.
+_SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    feed_key INTEGER PRIMARY KEY,
+    server TEXT NOT NULL,
+    workspace TEXT NOT NULL,
+    feed_name TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    synced_at REAL NOT NULL,
+    UNIQUE (server, workspace, feed_name)
+);
+CREATE TABLE IF NOT EXISTS packages (
+    feed_key INTEGER NOT NULL,
+    package_id TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    package_name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    architecture TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (feed_key, package_id)
+);
+CREATE INDEX IF NOT EXISTS packages_by_name ON packages (feed_key, package_name, version);
+"""
+
+
+@dataclass(frozen=True)
+class FeedPackage:
+    """Package entry of a SystemLink feed."""
+
+    package_name: str
+    version: str
+    architecture: Optional[str]
+    file_name: str
+
+
+def _version_key(version: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+
+class FeedIndex:
+    """SQLite mirror of SystemLink feed package listings, refreshed incrementally."""
+
+    def __init__(self, database_path: Path, remote_cache: Optional[RemoteIdCache] = None) -> None:
+        """Open or create a feed index.
+
+        Args:
+            database_path: Path of the SQLite database file.
+            remote_cache: Cache of workspace and feed IDs used to resolve feeds seen for the
+                first time.
+        """
+        self.remote_cache = remote_cache
+        Path(database_path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(database_path), check_same_thread=False)
+        (schema_version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if schema_version != _SCHEMA_VERSION:
+            # The index only mirrors the server, so an index of another layout is rebuilt.
+            self._connection.executescript(
+                "DROP TABLE IF EXISTS packages; DROP TABLE IF EXISTS feeds;"
+            )
+        self._connection.executescript(_SCHEMA)
+        self._connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "FeedIndex":
+        """Return the index, which is closed when the block exits."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the database connection."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+    def sync(self, api_url: str, api_key: str, workspace: str, feed_name: str) -> int:
+        """Refresh the packages of a feed from the server.
+
+        The listing is requested with the validators of the previous sync, so an unchanged
+        feed costs a single request and no database writes.
+
+        Args:
+            api_url: SystemLink API URL.
+            api_key: SystemLink API key.
+            workspace: SystemLink workspace name.
+            feed_name: Feed name.
+
+        Returns:
+            Number of package entries added, updated or removed.
+
+        Raises:
+            ValueError: If the workspace or feed does not exist on the server.
+        """
+        server = api_url.rstrip("/")
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified FROM feeds "
+                "WHERE server = ? AND workspace = ? AND feed_name = ?",
+                (server, workspace, feed_name),
+            ).fetchone()
+
+        etag, last_modified = row if row else (None, None)
+        feed_id, resolved_from_cache = _resolve_feed_id(
+            server, api_key, workspace, feed_name, self.remote_cache
+        )
+
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        try:
+            body, response_headers = _request_json(
+                f"{server}/nifeed/v1/feeds/{feed_id}/packages", api_key, headers
+            )
+        except urllib.error.HTTPError as ex:
+            if ex.code == 304:
+                record_cache_lookup("feed_index", hit=True)
+                with self._lock, self._connection:
+                    self._save_feed(server, workspace, feed_name, etag, last_modified)
+                return 0
+            if ex.code == 404 and resolved_from_cache:
+                # The feed was recreated under a new ID; forget the stale one and start over.
+                self._forget_feed(server, workspace, feed_name)
+                _invalidate_feed_id(server, workspace, feed_name, self.remote_cache)
+                return self.sync(api_url, api_key, workspace, feed_name)
+            raise
+
+        record_cache_lookup("feed_index", hit=False)
+        remote_packages = {
+            package["id"]: (
+                package.get("fileName", ""),
+                package.get("metadata", {}).get("packageName", ""),
+                package.get("metadata", {}).get("version", ""),
+                package.get("metadata", {}).get("architecture"),
+                package.get("updatedAt"),
+            )
+            for package in body.get("packages", [])
+        }
+        with self._lock, self._connection:
+            feed_key = self._save_feed(
+                server,
+                workspace,
+                feed_name,
+                response_headers.get("ETag"),
+                response_headers.get("Last-Modified"),
+            )
+            local_packages = {
+                package_id: updated_at
+                for package_id, updated_at in self._connection.execute(
+                    "SELECT package_id, updated_at FROM packages WHERE feed_key = ?", (feed_key,)
+                )
+            }
+            removed = [
+                (feed_key, package_id)
+                for package_id in local_packages
+                if package_id not in remote_packages
+            ]
+            changed = [
+                (feed_key, package_id) + fields
+                for package_id, fields in remote_packages.items()
+                if package_id not in local_packages or local_packages[package_id] != fields[-1]
+            ]
+            self._connection.executemany(
+                "DELETE FROM packages WHERE feed_key = ? AND package_id = ?", removed
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO packages VALUES (?, ?, ?, ?, ?, ?, ?)", changed
+            )
+        return len(removed) + len(changed)
+
+    def list_packages(self, api_url: str, workspace: str, feed_name: str) -> List[FeedPackage]:
+        """Packages of a feed as of the last sync, sorted by name and version."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT p.package_name, p.version, p.architecture, p.file_name "
+                "FROM packages p JOIN feeds f ON p.feed_key = f.feed_key "
+                "WHERE f.server = ? AND f.workspace = ? AND f.feed_name = ?",
+                (api_url.rstrip("/"), workspace, feed_name),
+            ).fetchall()
+
+        packages = [FeedPackage(*row) for row in rows]
+        return sorted(packages, key=lambda item: (item.package_name, _version_key(item.version)))
+
+    def get_published_versions(
+        self, api_url: str, workspace: str, feed_name: str
+    ) -> Set[Tuple[str, str, str]]:
+        """Package name, version and architecture triples of a feed as of the last sync."""
+        return {
+            (package.package_name, package.version, package.architecture or "")
+            for package in self.list_packages(api_url, workspace, feed_name)
+        }
+
+    def get_latest_versions(self, api_url: str, workspace: str, feed_name: str) -> Dict[str, str]:
+        """Latest version of each package of a feed as of the last sync."""
+        latest_versions: Dict[str, str] = {}
+        for package in self.list_packages(api_url, workspace, feed_name):
+            latest_versions[package.package_name] = package.version
+        return latest_versions
+
+    def _save_feed(
+        self,
+        server: str,
+        workspace: str,
+        feed_name: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> int:
+        # Called in a transaction that holds the lock. Returns the key of the feed's packages.
+        self._connection.execute(
+            "INSERT INTO feeds (server, workspace, feed_name, etag, last_modified, synced_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (server, workspace, feed_name) DO UPDATE SET "
+            "etag = excluded.etag, last_modified = excluded.last_modified, "
+            "synced_at = excluded.synced_at",
+            (server, workspace, feed_name, etag, last_modified, time.time()),
+        )
+        (feed_key,) = self._connection.execute(
+            "SELECT feed_key FROM feeds WHERE server = ? AND workspace = ? AND feed_name = ?",
+            (server, workspace, feed_name),
+        ).fetchone()
+        return feed_key
+
+    def _forget_feed(self, server: str, workspace: str, feed_name: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM packages WHERE feed_key IN (SELECT feed_key FROM feeds "
+                "WHERE server = ? AND workspace = ? AND feed_name = ?)",
+                (server, workspace, feed_name),
+            )
+            self._connection.execute(
+                "DELETE FROM feeds WHERE server = ? AND workspace = ? AND feed_name = ?",
+                (server, workspace, feed_name),
+            )
+
+
+def _request_json(
+    url: str, api_key: str, headers: Optional[Dict[str, str]] = None
+) -> Tuple[Dict[str, Any], Message]:
+    request = urllib.request.Request(url, headers={_API_KEY_HEADER: api_key, **(headers or {})})
+    with urllib.request.urlopen(  # nosec: B310
+        request, timeout=_REQUEST_TIMEOUT_IN_SECONDS
+    ) as response:
+        return json.load(response), response.headers
+
+
+def _lookup_workspace_id(server: str, api_key: str, workspace: str) -> str:
+    query = urllib.parse.urlencode({"name": workspace})
+    body, _ = _request_json(f"{server}/niuser/v1/workspaces?{query}", api_key)
+    workspace_ids = [
+        item["id"] for item in body.get("workspaces", []) if item.get("name") == workspace
+    ]
+    if not workspace_ids:
+        raise ValueError(StatusMessages.WORKSPACE_NOT_FOUND.format(workspace=workspace))
+
+    return workspace_ids[0]
+
+
+def _lookup_feed_id(server: str, api_key: str, workspace_id: str, feed_name: str) -> Optional[str]:
+    query = urllib.parse.urlencode({"workspace": workspace_id})
+    body, _ = _request_json(f"{server}/nifeed/v1/feeds?{query}", api_key)
+    feed_ids = [item["id"] for item in body.get("feeds", []) if item.get("name") == feed_name]
+    return feed_ids[0] if feed_ids else None
+
+
+def _resolve_feed_id(
+    server: str,
+    api_key: str,
+    workspace: str,
+    feed_name: str,
+    remote_cache: Optional[RemoteIdCache] = None,
+) -> Tuple[str, bool]:
+    """Resolve the ID of a feed, using the cached workspace and feed IDs where possible.
+
+    Args:
+        server: SystemLink API URL.
+        api_key: SystemLink API key.
+        workspace: SystemLink workspace name.
+        feed_name: Feed name.
+        remote_cache: Cache of workspace and feed IDs.
+
+    Returns:
+        Feed ID, and whether it came from the cache. A cached ID may be stale: when the server
+        reports it as not found, call `_invalidate_feed_id` and resolve it again.
+
+    Raises:
+        ValueError: If the workspace or feed does not exist on the server.
+    """
+    server = server.rstrip("/")
+    workspace_id = remote_cache.get(server, WORKSPACE, workspace) if remote_cache else None
+    if remote_cache and workspace_id:
+        feed_id = remote_cache.get(server, FEED, f"{workspace_id}/{feed_name}")
+        if feed_id:
+            return feed_id, True
+
+    feed_id = None
+    if workspace_id:
+        feed_id = _lookup_feed_id(server, api_key, workspace_id, feed_name)
+        if not feed_id and remote_cache:
+            # The workspace may have been recreated under a new ID.
+            remote_cache.invalidate(server, WORKSPACE, workspace)
+    if not feed_id:
+        workspace_id = _lookup_workspace_id(server, api_key, workspace)
+        feed_id = _lookup_feed_id(server, api_key, workspace_id, feed_name)
+    if not feed_id:
+        raise ValueError(
+            StatusMessages.FEED_NOT_FOUND.format(feed_name=feed_name, workspace=workspace)
+        )
+
+    if remote_cache and workspace_id:
+        remote_cache.set(server, WORKSPACE, workspace, workspace_id)
+        remote_cache.set(server, FEED, f"{workspace_id}/{feed_name}", feed_id)
+    return feed_id, False
+
+
+def _invalidate_feed_id(
+    server: str, workspace: str, feed_name: str, remote_cache: Optional[RemoteIdCache]
+) -> None:
+    """Drop the cached IDs of a feed and its workspace after the server reported them missing.
+
+    Args:
+        server: SystemLink API URL.
+        workspace: SystemLink workspace name.
+        feed_name: Feed name.
+        remote_cache: Cache of workspace and feed IDs.
+    """
+    if remote_cache:
+        # Without the workspace entry the feed ID is looked up again, and its entry replaced.
+        remote_cache.invalidate(server.rstrip("/"), WORKSPACE, workspace)
@@ -0,0 +1,56 @@
+"""Advisory file locks shared by packager processes running on the same host."""
+
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+LOCKS_DIRECTORY = ".locks"
+
+_LOCK_RETRY_INTERVAL_IN_SECONDS = 0.1
+
+
+def _acquire(lock_file: IO[bytes]) -> None:
+    if sys.platform == "win32":
+        lock_file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(_LOCK_RETRY_INTERVAL_IN_SECONDS)
+    else:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+
+def _release(lock_file: IO[bytes]) -> None:
+    if sys.platform == "win32":
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on a file, waiting until it is available.
+
+    The lock excludes other processes and other threads that lock the same path.
+
+    Args:
+        lock_path: Lock file path. It is created if it does not exist.
+    """
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        _acquire(lock_file)
+        try:
+            yield
+        finally:
+            _release(lock_file)
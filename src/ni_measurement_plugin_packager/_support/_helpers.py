@@ -1,9 +1,18 @@
 """Helper functions for Measurement Plug-In Packager."""
 
+import os
+import shutil
 import subprocess  # nosec: B404
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, replace
+from functools import partial
+from http import HTTPStatus
 from logging import FileHandler, Logger
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
 from nisystemlink_feeds_manager.clients.core import ApiException
 from nisystemlink_feeds_manager.clients.feeds.models import UploadPackageResponse
@@ -18,12 +27,70 @@ from ni_measurement_plugin_packager._constants import (
     StatusMessages,
 )
 from ni_measurement_plugin_packager._support import _get_nipath
+from ni_measurement_plugin_packager._support._adaptive_concurrency import (
+    THROTTLE_STATUS_CODES,
+    WorkerLimits,
+    get_http_status_code,
+)
+from ni_measurement_plugin_packager._support._artifact_index import ArtifactIndex
+from ni_measurement_plugin_packager._support._batch_upload import (
+    UploadBatchOptions,
+    upload_in_batches,
+)
+from ni_measurement_plugin_packager._support._change_detection import (
+    get_changed_files,
+    select_changed_plugins,
+)
 from ni_measurement_plugin_packager._support._create_files import (
+    _get_system_type,
+    generate_runtime_template_directory,
     generate_template_directories,
+    get_payload_size,
+    reserve_staging_directory,
 )
+from ni_measurement_plugin_packager._support._file_lock import LOCKS_DIRECTORY, file_lock
+from ni_measurement_plugin_packager._support._local_feed import LocalFeed
+from ni_measurement_plugin_packager._support._metrics import (
+    BUILDS,
+    PAYLOAD_BYTES_SAVED,
+    STAGE_DURATION,
+    STAGED_BYTES,
+    UPLOADED_BYTES,
+    UPLOADS,
+    record_failure,
+)
+from ni_measurement_plugin_packager._support._nipkg_archive import write_architecture_variant
+from ni_measurement_plugin_packager._support._package_info import (
+    BuildOptions,
+    PackageInfo as MeasurementPackageInfo,
+    StagedUploadOptions,
+)
+from ni_measurement_plugin_packager._support._profiler import RunProfiler
 from ni_measurement_plugin_packager._support._pyproject_toml_info import (
+    DEFAULT_AUTHOR,
     get_plugin_package_info,
 )
+from ni_measurement_plugin_packager._support._run_journal import (
+    RunJournal,
+    SourceFingerprint,
+    get_source_fingerprint,
+)
+from ni_measurement_plugin_packager._support._run_report import (
+    BUILT,
+    FAILED,
+    SKIPPED,
+    UPLOADED,
+    PluginReport,
+    RunReport,
+)
+from ni_measurement_plugin_packager._support._runtime_package import (
+    RUNTIME_DESCRIPTION,
+    RuntimeOptions,
+    SharedRuntime,
+    find_shared_runtime,
+)
+from ni_measurement_plugin_packager._support._sharding import select_shard_plugins
+from ni_measurement_plugin_packager._support._validation import validate_plugins
 
 
 def _get_nipkg_exe_directory() -> Path:
@@ -63,10 +130,15 @@ def _validate_selected_plugins(
     selected_plugins: str,
     measurement_plugins: List[Path],
     logger: Logger,
+    plugin_root_directory: Optional[Path] = None,
 ) -> None:
     for measurement_plugin in selected_plugins.split(","):
         plugin_name = measurement_plugin.strip("'\"").strip()
 
+        # The validation pass reports the missing files of a selected directory.
+        if plugin_root_directory and (Path(plugin_root_directory) / plugin_name).is_dir():
+            continue
+
         if plugin_name not in str(measurement_plugins):
             _list_available_plugins_in_root_directory(
                 logger=logger, measurement_plugins=measurement_plugins
@@ -100,45 +172,90 @@ def _get_packager_root_directory(logger: Logger) -> Optional[Path]:
     return None
 
 
-def _find_file_in_directory(directory_path: Path, file_name: str) -> Optional[Path]:
-    file_path = None
-    for name in directory_path.iterdir():
-        if file_name in str(name):
-            file_path = directory_path / name
-            break
-
-    return file_path
+def _find_file_in_directory(
+    directory_path: Path, package_name: str, version: str, architecture: str
+) -> Optional[Path]:
+    # nipkg names packages '<package>_<version>_<architecture>.nipkg' after the control file.
+    # The pack directory belongs to one build, so the exact name is the only candidate.
+    file_path = directory_path / f"{package_name}_{version}_{architecture}.nipkg"
+    return file_path if file_path.is_file() else None
 
 
 def _build_and_upload_packages(
     logger: Logger,
     plugin_root_directory: Path,
     measurement_plugins: List[str],
-    systemlink_client: PublishPackagesToSystemLink,
+    systemlink_client: Optional[PublishPackagesToSystemLink],
     feed_name: Optional[str],
     overwrite_packages: Optional[bool],
+    published_packages: Optional[Set[Tuple[str, str, str]]] = None,
+    profiler: Optional[RunProfiler] = None,
+    build_options: Optional[BuildOptions] = None,
+    run_report: Optional[RunReport] = None,
+    local_feed: Optional[LocalFeed] = None,
+    upload_batch: Optional[UploadBatchOptions] = None,
+    staged_upload: Optional[StagedUploadOptions] = None,
+    run_journal: Optional[RunJournal] = None,
+    build_workers: Optional[WorkerLimits] = None,
 ) -> None:
-    for measurement_plugin in measurement_plugins:
+    # In batch mode the packages are built first and uploaded together after the loop.
+    batch_client = systemlink_client if upload_batch else None
+    pending_uploads: List[Tuple[str, Path, Optional[PluginReport]]] = []
+    source_fingerprints: Dict[str, SourceFingerprint] = {}
+    published = systemlink_client or local_feed
+
+    def process_plugin(measurement_plugin: str) -> Optional[int]:
+        # Returns the HTTP status code of a failed publish, for the build concurrency limiter.
         measurement_plugin_path = Path(plugin_root_directory) / measurement_plugin
+        plugin_name = measurement_plugin_path.name
+        start_time = time.perf_counter()
+        error = None
+        status_code: Optional[int] = None
+        measurement_package_paths: List[Path] = []
+        source: Optional[SourceFingerprint] = None
         try:
-            measurement_package_path = build_package(
+            if is_already_published(
                 logger=logger,
                 plugin_path=measurement_plugin_path,
-            )
-            if systemlink_client and measurement_package_path:
-                upload_response = upload_to_systemlink_feed(
-                    systemlink_client=systemlink_client,
-                    package_path=measurement_package_path,
+                published_packages=published_packages,
+                feed_name=feed_name,
+                architectures=build_options.architectures if build_options else (),
+            ):
+                _add_plugin_report(run_report, measurement_plugin_path, SKIPPED)
+                return None
+
+            if run_journal:
+                source = get_source_fingerprint(
+                    measurement_plugin_path,
+                    logger,
+                    build_options.payload_profile if build_options else None,
+                )
+                source_fingerprints[plugin_name] = source
+                # Packages of a build-only run must still be on disk to count as completed.
+                if run_journal.is_completed(plugin_name, source, verify_packages=not published):
+                    logger.info(StatusMessages.PLUGIN_ALREADY_COMPLETED.format(name=plugin_name))
+                    _add_plugin_report(run_report, measurement_plugin_path, SKIPPED)
+                    return None
+
+            with profiler.profile(measurement_plugin_path.name) if profiler else nullcontext():
+                measurement_package_paths = build_and_upload_package(
+                    logger=logger,
+                    plugin_path=measurement_plugin_path,
+                    systemlink_client=None if batch_client else systemlink_client,
                     feed_name=feed_name,
                     overwrite_packages=overwrite_packages,
+                    build_options=build_options,
+                    local_feed=local_feed,
+                    staged_upload=staged_upload,
+                    run_journal=run_journal,
+                    source=source,
                 )
-                logger.info(
-                    StatusMessages.PACKAGE_UPLOADED.format(
-                        package_name=upload_response.file_name,
-                        feed_name=feed_name,
-                    )
-                )
+            if not measurement_package_paths:
+                error = StatusMessages.INVALID_PLUGIN
         except ApiException as ex:
+            record_failure(ex)
+            error = ex.error.message
+            status_code = get_http_status_code(ex)
             logger.debug(ex, exc_info=True)
             logger.info(
                 StatusMessages.UPLOAD_FAILED.format(
@@ -150,15 +267,362 @@ def _build_and_upload_packages(
             logger.info(StatusMessages.CHECK_LOG_FILE)
 
         except (KeyError, FileNotFoundError) as ex:
+            record_failure(ex)
+            error = str(ex)
             logger.debug(ex, exc_info=True)
             logger.info(ex)
             logger.info(StatusMessages.CHECK_LOG_FILE)
 
         except Exception as ex:
+            record_failure(ex)
+            error = str(ex)
+            status_code = get_http_status_code(ex)
             logger.debug(ex, exc_info=True)
             logger.info(ex)
             logger.info(StatusMessages.CHECK_LOG_FILE)
 
+        plugin_report = _add_plugin_report(
+            run_report,
+            measurement_plugin_path,
+            FAILED if error else UPLOADED if published else BUILT,
+            package_path=measurement_package_paths[0] if measurement_package_paths else None,
+            duration=time.perf_counter() - start_time,
+            error=error,
+        )
+        if batch_client and not error:
+            plugin_uploads = [
+                (measurement_plugin, package_path, plugin_report)
+                for package_path in measurement_package_paths
+                if not (run_journal and run_journal.is_uploaded(plugin_name, package_path.name))
+            ]
+            pending_uploads.extend(plugin_uploads)
+            if run_journal and source and not plugin_uploads:
+                run_journal.record_completion(plugin_name, source)
+        elif run_journal and source and not error:
+            run_journal.record_completion(plugin_name, source)
+
+        return status_code
+
+    build_workers = build_workers or WorkerLimits()
+    # The profiler traces one plug-in at a time.
+    if build_workers.max_workers <= 1 or profiler:
+        for measurement_plugin in measurement_plugins:
+            process_plugin(measurement_plugin)
+    else:
+        _run_concurrent_builds(
+            logger=logger,
+            plugin_root_directory=plugin_root_directory,
+            measurement_plugins=measurement_plugins,
+            process_plugin=process_plugin,
+            build_workers=build_workers,
+            build_options=build_options,
+        )
+
+    if batch_client and upload_batch and pending_uploads:
+        _upload_pending_packages(
+            logger=logger,
+            systemlink_client=batch_client,
+            pending_uploads=pending_uploads,
+            feed_name=feed_name,
+            overwrite_packages=overwrite_packages,
+            upload_batch=upload_batch,
+            run_journal=run_journal,
+            source_fingerprints=source_fingerprints,
+        )
+
+
+def _run_concurrent_builds(
+    logger: Logger,
+    plugin_root_directory: Path,
+    measurement_plugins: List[str],
+    process_plugin: Callable[[str], Optional[int]],
+    build_workers: WorkerLimits,
+    build_options: Optional[BuildOptions] = None,
+) -> None:
+    payload_profile = build_options.payload_profile if build_options else None
+    payload_sizes: Dict[str, int] = {}
+    for measurement_plugin in measurement_plugins:
+        try:
+            payload_sizes[measurement_plugin] = get_payload_size(
+                Path(plugin_root_directory) / measurement_plugin, payload_profile
+            )
+        except OSError:
+            payload_sizes[measurement_plugin] = 0
+    limiter = build_workers.create_limiter("build", logger)
+
+    def run(measurement_plugin: str) -> None:
+        with limiter.slot() if limiter else nullcontext():
+            status_code = process_plugin(measurement_plugin)
+        if limiter:
+            limiter.record(
+                payload_sizes[measurement_plugin],
+                throttled=status_code in THROTTLE_STATUS_CODES,
+            )
+
+    # Largest plug-ins first, so that no long build starts last and stretches the run.
+    ordered_plugins = sorted(measurement_plugins, key=payload_sizes.__getitem__, reverse=True)
+    with ThreadPoolExecutor(
+        max_workers=build_workers.max_workers, thread_name_prefix="packager-build"
+    ) as executor:
+        list(executor.map(run, ordered_plugins))
+
+
+def _upload_pending_packages(
+    logger: Logger,
+    systemlink_client: PublishPackagesToSystemLink,
+    pending_uploads: List[Tuple[str, Path, Optional[PluginReport]]],
+    feed_name: Optional[str],
+    overwrite_packages: Optional[bool],
+    upload_batch: UploadBatchOptions,
+    run_journal: Optional[RunJournal] = None,
+    source_fingerprints: Optional[Dict[str, SourceFingerprint]] = None,
+) -> None:
+    create_client = upload_batch.create_client
+    if not create_client:
+        # The client of the run is not shared between upload workers.
+        upload_batch = replace(upload_batch, max_workers=1, min_workers=None)
+
+    def create_upload_package() -> Callable[[Path], UploadPackageResponse]:
+        return partial(
+            upload_to_systemlink_feed,
+            create_client() if create_client else systemlink_client,
+            feed_name=feed_name,
+            overwrite_packages=overwrite_packages,
+        )
+
+    upload_results = upload_in_batches(
+        logger=logger,
+        create_upload_package=create_upload_package,
+        package_paths=[package_path for _, package_path, _ in pending_uploads],
+        options=upload_batch,
+    )
+    failed_plugins = set()
+    for (measurement_plugin, package_path, plugin_report), result in zip(
+        pending_uploads, upload_results
+    ):
+        plugin_name = Path(measurement_plugin).name
+        if result.error:
+            failed_plugins.add(plugin_name)
+            logger.info(
+                StatusMessages.UPLOAD_FAILED.format(
+                    package=measurement_plugin,
+                    name=feed_name,
+                )
+            )
+            logger.info(result.error)
+        else:
+            logger.info(
+                StatusMessages.PACKAGE_UPLOADED.format(
+                    package_name=result.file_name,
+                    feed_name=feed_name,
+                )
+            )
+            if run_journal:
+                run_journal.record_upload(plugin_name, package_path.name)
+
+        # A plug-in with packages for several architectures fails if any of them fails.
+        if plugin_report:
+            plugin_report.duration += result.duration
+            if result.error:
+                plugin_report.status = FAILED
+                plugin_report.error = result.error
+            elif plugin_report.status != FAILED:
+                plugin_report.status = UPLOADED
+
+    if run_journal and source_fingerprints:
+        for plugin_name in dict.fromkeys(
+            Path(measurement_plugin).name for measurement_plugin, _, _ in pending_uploads
+        ):
+            if plugin_name not in failed_plugins:
+                run_journal.record_completion(plugin_name, source_fingerprints[plugin_name])
+
+
+def _add_plugin_report(
+    run_report: Optional[RunReport],
+    plugin_path: Path,
+    status: str,
+    package_path: Optional[Path] = None,
+    duration: float = 0.0,
+    error: Optional[str] = None,
+) -> Optional[PluginReport]:
+    if run_report is None:
+        return None
+
+    plugin_report = PluginReport(
+        plugin_name=plugin_path.name,
+        status=status,
+        package_file_name=package_path.name if package_path else None,
+        # Packages uploaded from the staging directory and not kept are already deleted.
+        package_size=package_path.stat().st_size if package_path and package_path.is_file() else 0,
+        duration=duration,
+        error=error,
+    )
+    run_report.add(plugin_report)
+    return plugin_report
+
+
+def build_and_upload_package(
+    logger: Logger,
+    plugin_path: Path,
+    systemlink_client: Optional[PublishPackagesToSystemLink],
+    feed_name: Optional[str],
+    overwrite_packages: Optional[bool],
+    build_options: Optional[BuildOptions] = None,
+    local_feed: Optional[LocalFeed] = None,
+    staged_upload: Optional[StagedUploadOptions] = None,
+    run_journal: Optional[RunJournal] = None,
+    source: Optional[SourceFingerprint] = None,
+) -> List[Path]:
+    """Build the packages of a plug-in and publish them to the given SystemLink or local feed.
+
+    Args:
+        logger: Logger object.
+        plugin_path: Measurement plug-in path.
+        systemlink_client: Client for publish packages to SystemLink.
+        feed_name: Name of the feed to upload to.
+        overwrite_packages: Whether to overwrite existing packages.
+        build_options: Output, staging and architecture options.
+        local_feed: Directory feed to add the packages to.
+        staged_upload: Options to upload the packages from the staging directory instead of
+            building them into the output directory first. Used with `systemlink_client`.
+        run_journal: Journal of the run. Packages it recorded as built from the same sources
+            are reused if they are unchanged, and packages it recorded as uploaded are not
+            uploaded again.
+        source: Source fingerprint of the plug-in, recorded with its builds. Required with
+            `run_journal`.
+
+    Returns:
+        Built measurement package file paths, one per architecture. Packages uploaded from the
+        staging directory are only on disk if they are kept.
+    """
+    plugin_name = Path(plugin_path).name
+    build_options = build_options or BuildOptions()
+    resumed_package_paths = (
+        run_journal.get_verified_packages(plugin_name, source) if run_journal and source else None
+    )
+    if resumed_package_paths:
+        logger.info(StatusMessages.PACKAGES_RESUMED.format(name=plugin_name))
+        measurement_package_paths = resumed_package_paths
+    elif staged_upload and systemlink_client:
+        return _upload_from_staging(
+            logger=logger,
+            plugin_path=plugin_path,
+            systemlink_client=systemlink_client,
+            feed_name=feed_name,
+            overwrite_packages=overwrite_packages,
+            staged_upload=staged_upload,
+            build_options=build_options,
+            local_feed=local_feed,
+            run_journal=run_journal,
+            source=source,
+        )
+    else:
+        measurement_package_paths = build_packages(
+            logger=logger,
+            plugin_path=plugin_path,
+            build_options=build_options,
+        )
+        if run_journal and source and measurement_package_paths:
+            run_journal.record_build(plugin_name, measurement_package_paths, source)
+
+    architectures = build_options.architectures or (_get_system_type(),)
+    for architecture, measurement_package_path in zip(architectures, measurement_package_paths):
+        if run_journal and run_journal.is_uploaded(plugin_name, measurement_package_path.name):
+            logger.info(
+                StatusMessages.PACKAGE_ALREADY_UPLOADED.format(
+                    package_name=measurement_package_path.name
+                )
+            )
+        elif systemlink_client:
+            uploaded_file_name = upload_to_systemlink_feed(
+                systemlink_client=systemlink_client,
+                package_path=measurement_package_path,
+                feed_name=feed_name,
+                overwrite_packages=overwrite_packages,
+            ).file_name
+            logger.info(
+                StatusMessages.PACKAGE_UPLOADED.format(
+                    package_name=uploaded_file_name,
+                    feed_name=feed_name,
+                )
+            )
+            if run_journal:
+                run_journal.record_upload(plugin_name, measurement_package_path.name)
+
+        if local_feed:
+            _publish_to_local_feed(
+                logger,
+                local_feed,
+                measurement_package_path,
+                _get_package_info(logger, plugin_path, build_options),
+                architecture,
+            )
+
+    return measurement_package_paths
+
+
+def _publish_to_local_feed(
+    logger: Logger,
+    local_feed: LocalFeed,
+    package_path: Path,
+    package_info: MeasurementPackageInfo,
+    architecture: str,
+) -> None:
+    feed_package_path = local_feed.publish(
+        package_path=package_path,
+        package_info=package_info,
+        architecture=architecture,
+    )
+    logger.info(
+        StatusMessages.PACKAGE_ADDED_TO_LOCAL_FEED.format(
+            package_name=feed_package_path.name,
+            feed_directory=local_feed.feed_directory,
+        )
+    )
+
+
+def is_already_published(
+    logger: Logger,
+    plugin_path: Path,
+    published_packages: Optional[Set[Tuple[str, str, str]]],
+    feed_name: Optional[str],
+    architectures: Sequence[str] = (),
+) -> bool:
+    """Check whether the package version of a plug-in is already in the feed.
+
+    Args:
+        logger: Logger object.
+        plugin_path: Measurement plug-in path.
+        published_packages: Package name, version and architecture triples already in the
+            feed.
+        feed_name: Name of the feed.
+        architectures: Target architectures. The plug-in is skipped only if the package of
+            each of them is in the feed. Defaults to the architecture of this system.
+
+    Returns:
+        True if the plug-in can be skipped, False if it needs to be built.
+    """
+    if not published_packages or not (Path(plugin_path) / PyProjectToml.FILE_NAME).is_file():
+        return False
+
+    package_info = get_plugin_package_info(measurement_plugin_path=plugin_path, logger=logger)
+    if not all(
+        (package_info.package_name.lower(), package_info.version, architecture)
+        in published_packages
+        for architecture in architectures or (_get_system_type(),)
+    ):
+        return False
+
+    logger.info(
+        StatusMessages.PACKAGE_ALREADY_PUBLISHED.format(
+            name=package_info.plugin_name,
+            version=package_info.version,
+            package_name=package_info.package_name.lower(),
+            feed_name=feed_name,
+        )
+    )
+    return True
+
 
 def upload_to_systemlink_feed(
     systemlink_client: PublishPackagesToSystemLink,
@@ -177,14 +641,21 @@ def upload_to_systemlink_feed(
     Returns:
         Uploaded measurement package response from server.
     """
-    upload_response = systemlink_client.upload_package(
-        package_info=PackageInfo(
-            feed_name=feed_name,
-            path=str(package_path),
-            overwrite=overwrite_packages,
-        )
-    )
+    try:
+        with STAGE_DURATION.time(stage="upload"):
+            upload_response = systemlink_client.upload_package(
+                package_info=PackageInfo(
+                    feed_name=feed_name,
+                    path=str(package_path),
+                    overwrite=overwrite_packages,
+                )
+            )
+    except Exception:
+        UPLOADS.inc(result="failure")
+        raise
 
+    UPLOADS.inc(result="success")
+    UPLOADED_BYTES.inc(Path(package_path).stat().st_size)
     return upload_response
 
 
@@ -233,9 +704,24 @@ def process_and_upload_packages(
     logger: Logger,
     plugin_root_directory: Path,
     selected_plugins: str,
-    systemlink_client: PublishPackagesToSystemLink,
+    systemlink_client: Optional[PublishPackagesToSystemLink],
     feed_name: Optional[str],
     overwrite_packages: Optional[bool],
+    published_packages: Optional[Set[Tuple[str, str, str]]] = None,
+    profiler: Optional[RunProfiler] = None,
+    build_options: Optional[BuildOptions] = None,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_costs: Optional[Dict[str, float]] = None,
+    run_report: Optional[RunReport] = None,
+    local_feed: Optional[LocalFeed] = None,
+    upload_batch: Optional[UploadBatchOptions] = None,
+    staged_upload: Optional[StagedUploadOptions] = None,
+    run_journal: Optional[RunJournal] = None,
+    changed_since: Optional[str] = None,
+    shared_paths: Sequence[Path] = (),
+    validate_only: bool = False,
+    build_workers: Optional[WorkerLimits] = None,
+    runtime_options: Optional[RuntimeOptions] = None,
 ) -> None:
     """Build and publish selected measurement packages.
 
@@ -243,12 +729,40 @@ def process_and_upload_packages(
         logger: Logger object.
         plugin_root_directory: Measurement plugins root directory path.
         selected_plugins: Selected measurement plugins.
-        systemlink_client: Client for publish packages to SystemLink.
+        systemlink_client: Client for publish packages to SystemLink, or None to publish
+            without it.
         feed_name: Name of the feed to upload to.
         overwrite_packages: Whether to overwrite existing packages.
+        published_packages: Package name, version and architecture triples already in the
+            feed. Plug-ins with all their packages among them are skipped.
+        profiler: Profiler that records each plug-in, if profiling is enabled.
+        build_options: Output and staging options.
+        shard: Shard index and shard count. Only the plug-ins of the shard are processed.
+        shard_costs: Build duration of each plug-in in an earlier run, to balance the shards
+            by cost instead of by name hash.
+        run_report: Report that the outcome of each plug-in is added to.
+        local_feed: Directory feed to add the packages to.
+        upload_batch: Batch limits. When given, all packages are built first and then
+            uploaded in batches, with the uploads of a batch running concurrently.
+        staged_upload: Options to upload each package from the staging directory as soon as
+            it is packed, instead of building it into the output directory first.
+        run_journal: Journal that completed builds and uploads are recorded in. Plug-ins it
+            recorded as completed are skipped.
+        changed_since: Git ref. When given, only the plug-ins with files or path dependencies
+            changed on HEAD since this ref are processed.
+        shared_paths: Files and directories every plug-in depends on. A change to one of them
+            selects all plug-ins. Used with `changed_since`.
+        validate_only: Whether to only validate the selected plug-ins, without building them.
+        build_workers: Number of plug-ins built at the same time. With more than one, the
+            largest plug-ins are built first. Without a profiler only.
+        runtime_options: Shared runtime options. When given, the dependencies several plug-ins
+            share are built into a runtime package from its wheel directory, which is
+            published first and which those plug-ins depend on.
 
     Raises:
-        FileNotFoundError: If no valid plugins are found in the directory.
+        FileNotFoundError: If no valid plugins are found in the directory, or the runtime
+            package could not be built.
+        ValueError: If a selected plug-in fails validation. Nothing is built then.
     """
     measurement_plugins: list[Path] = _get_valid_plugin_directories(
         directory_path=plugin_root_directory, logger=logger
@@ -267,9 +781,64 @@ def process_and_upload_packages(
             measurement_plugins=measurement_plugins,
             selected_plugins=selected_plugins,
             logger=logger,
+            plugin_root_directory=plugin_root_directory,
         )
         plugins_to_process = [plugin.strip("'\"").strip() for plugin in selected_plugins.split(",")]
 
+    if changed_since:
+        plugin_count = len(plugins_to_process)
+        plugins_to_process = select_changed_plugins(
+            plugin_root_directory=plugin_root_directory,
+            measurement_plugins=plugins_to_process,
+            changed_files=get_changed_files(plugin_root_directory, changed_since),
+            shared_paths=shared_paths,
+        )
+        logger.info(
+            StatusMessages.CHANGED_PLUGINS_SELECTED.format(
+                ref=changed_since,
+                selected=len(plugins_to_process),
+                total=plugin_count,
+            )
+        )
+
+    if shard:
+        shard_index, shard_count = shard
+        plugin_count = len(plugins_to_process)
+        plugins_to_process = select_shard_plugins(
+            measurement_plugins=plugins_to_process,
+            shard_index=shard_index,
+            shard_count=shard_count,
+            historical_costs=shard_costs,
+        )
+        logger.info(
+            StatusMessages.SHARD_SELECTED.format(
+                index=shard_index,
+                count=shard_count,
+                selected=len(plugins_to_process),
+                total=plugin_count,
+            )
+        )
+
+    # Check all selected plug-ins before the first one is staged, packed or uploaded.
+    validate_plugins(
+        logger, [Path(plugin_root_directory) / plugin for plugin in plugins_to_process]
+    )
+    if validate_only:
+        return
+
+    if runtime_options:
+        build_options = prepare_shared_runtime(
+            logger=logger,
+            plugin_paths=[Path(plugin_root_directory) / plugin for plugin in plugins_to_process],
+            runtime_options=runtime_options,
+            systemlink_client=systemlink_client,
+            feed_name=feed_name,
+            overwrite_packages=overwrite_packages,
+            published_packages=published_packages,
+            build_options=build_options,
+            local_feed=local_feed,
+        )
+
     _build_and_upload_packages(
         logger=logger,
         plugin_root_directory=plugin_root_directory,
@@ -277,57 +846,634 @@ def process_and_upload_packages(
         systemlink_client=systemlink_client,
         feed_name=feed_name,
         overwrite_packages=overwrite_packages,
+        published_packages=published_packages,
+        profiler=profiler,
+        build_options=build_options,
+        run_report=run_report,
+        local_feed=local_feed,
+        upload_batch=upload_batch,
+        staged_upload=staged_upload,
+        run_journal=run_journal,
+        build_workers=build_workers,
+    )
+
+
+def prepare_shared_runtime(
+    logger: Logger,
+    plugin_paths: Sequence[Path],
+    runtime_options: RuntimeOptions,
+    systemlink_client: Optional[PublishPackagesToSystemLink],
+    feed_name: Optional[str],
+    overwrite_packages: Optional[bool],
+    published_packages: Optional[Set[Tuple[str, str, str]]] = None,
+    build_options: Optional[BuildOptions] = None,
+    local_feed: Optional[LocalFeed] = None,
+) -> BuildOptions:
+    """Build and publish the runtime package of the dependencies the plug-ins share.
+
+    The runtime package is published before any plug-in, so no plug-in package is in a feed
+    before the runtime it depends on.
+
+    Args:
+        logger: Logger object.
+        plugin_paths: Measurement plug-in paths.
+        runtime_options: Wheel directory, name and base version of the runtime package.
+        systemlink_client: Client for publish packages to SystemLink.
+        feed_name: Name of the feed to upload to.
+        overwrite_packages: Whether to overwrite existing packages.
+        published_packages: Package name, version and architecture triples already in the
+            feed. The runtime package is not built again if all its packages are among them.
+        build_options: Output, staging and architecture options.
+        local_feed: Directory feed to add the runtime package to.
+
+    Returns:
+        Build options whose plug-ins that use a shared dependency depend on the runtime
+        package. Unchanged if the runtime package could not be published.
+
+    Raises:
+        FileNotFoundError: If the runtime package could not be built.
+    """
+    build_options = build_options or BuildOptions()
+    shared_runtime = find_shared_runtime(
+        logger,
+        plugin_paths,
+        runtime_options.wheel_directory,
+        runtime_options.min_plugins,
+    )
+    if not shared_runtime.plugin_dependencies:
+        logger.info(
+            StatusMessages.RUNTIME_NOTHING_SHARED.format(
+                min_plugins=runtime_options.min_plugins,
+                dir=runtime_options.wheel_directory,
+            )
+        )
+        return build_options
+
+    package_name = runtime_options.package_name.lower()
+    logger.info(
+        StatusMessages.RUNTIME_SHARED_DEPENDENCIES.format(
+            package_name=package_name,
+            count=len(shared_runtime.versions),
+            plugins=len(shared_runtime.plugin_dependencies),
+            dependencies=", ".join(shared_runtime.requirements),
+        )
+    )
+    version = shared_runtime.get_version(runtime_options.version)
+    runtime_package_info = MeasurementPackageInfo(
+        plugin_name=package_name,
+        package_name=package_name,
+        version=version,
+        description=RUNTIME_DESCRIPTION,
+        author=DEFAULT_AUTHOR,
+    )
+    architectures = build_options.architectures or (_get_system_type(),)
+    if published_packages and all(
+        (package_name, version, architecture) in published_packages
+        for architecture in architectures
+    ):
+        logger.info(
+            StatusMessages.RUNTIME_ALREADY_PUBLISHED.format(
+                version=version,
+                package_name=package_name,
+                feed_name=feed_name,
+            )
+        )
+    else:
+        package_paths = _build_runtime_packages(
+            logger, runtime_package_info, shared_runtime, build_options
+        )
+        try:
+            _publish_runtime_packages(
+                logger=logger,
+                runtime_package_info=runtime_package_info,
+                package_paths=package_paths,
+                systemlink_client=systemlink_client,
+                feed_name=feed_name,
+                overwrite_packages=overwrite_packages,
+                build_options=build_options,
+                local_feed=local_feed,
+            )
+        except Exception as ex:
+            # No plug-in may depend on a runtime that is not in the feed.
+            record_failure(ex)
+            logger.debug(ex, exc_info=True)
+            logger.info(StatusMessages.UPLOAD_FAILED.format(package=package_name, name=feed_name))
+            logger.info(ex.error.message if isinstance(ex, ApiException) else ex)
+            logger.info(StatusMessages.RUNTIME_NOT_PUBLISHED.format(package_name=package_name))
+            logger.info(StatusMessages.CHECK_LOG_FILE)
+            return build_options
+
+    for plugin_name, dependencies in shared_runtime.plugin_dependencies.items():
+        logger.debug(
+            StatusMessages.RUNTIME_DEPENDS.format(
+                name=plugin_name,
+                depends=_get_runtime_depends(runtime_package_info),
+                dependencies=", ".join(dependencies),
+            )
+        )
+    return replace(
+        build_options,
+        plugin_runtimes={
+            **build_options.plugin_runtimes,
+            **{
+                plugin_name: runtime_package_info
+                for plugin_name in shared_runtime.plugin_dependencies
+            },
+        },
+    )
+
+
+def _build_runtime_packages(
+    logger: Logger,
+    runtime_package_info: MeasurementPackageInfo,
+    shared_runtime: SharedRuntime,
+    build_options: BuildOptions,
+) -> List[Path]:
+    output_directory = build_options.output_directory
+    staging_directory = build_options.staging_directory
+    if not output_directory or not staging_directory:
+        packager_root_directory = _get_packager_root_directory(logger=logger)
+        if not packager_root_directory:
+            raise FileNotFoundError(StatusMessages.INVALID_PACKAGER_PATH)
+        output_directory = output_directory or packager_root_directory / PACKAGES
+        staging_directory = staging_directory or packager_root_directory
+
+    package_name = runtime_package_info.package_name
+    architectures = build_options.architectures or (_get_system_type(),)
+    package_directory_path = Path(output_directory)
+    package_directory_path.mkdir(parents=True, exist_ok=True)
+
+    with file_lock(package_directory_path / LOCKS_DIRECTORY / f"{package_name}.lock"):
+        with STAGE_DURATION.time(stage="stage"):
+            template_directory_path = generate_runtime_template_directory(
+                packager_root_directory=staging_directory,
+                runtime_package_info=runtime_package_info,
+                wheel_paths=shared_runtime.wheel_paths,
+                requirements=shared_runtime.requirements,
+                architecture=architectures[0],
+            )
+        pack_directory_path = Path(tempfile.mkdtemp(prefix=".pack-", dir=package_directory_path))
+        try:
+            packed_file_paths, sha256s = _pack_template_directory(
+                logger=logger,
+                template_directory_path=template_directory_path,
+                pack_directory_path=pack_directory_path,
+                package_info=runtime_package_info,
+                architectures=architectures,
+            )
+            if not packed_file_paths:
+                raise FileNotFoundError(
+                    StatusMessages.RUNTIME_PACKAGE_FAILED.format(package_name=package_name)
+                )
+            package_paths = _move_packages(packed_file_paths, package_directory_path)
+        finally:
+            shutil.rmtree(pack_directory_path, ignore_errors=True)
+
+    logger.info(
+        StatusMessages.RUNTIME_PACKAGE_BUILT.format(
+            package_name=package_name, dir=package_directory_path
+        )
     )
+    _record_artifacts(
+        _PackedPlugin(
+            package_info=runtime_package_info,
+            output_directory=package_directory_path,
+            architectures=architectures,
+            package_paths=package_paths,
+            sha256s=sha256s,
+        ),
+        package_paths,
+        sha256s,
+    )
+    return package_paths
+
+
+def _publish_runtime_packages(
+    logger: Logger,
+    runtime_package_info: MeasurementPackageInfo,
+    package_paths: List[Path],
+    systemlink_client: Optional[PublishPackagesToSystemLink],
+    feed_name: Optional[str],
+    overwrite_packages: Optional[bool],
+    build_options: BuildOptions,
+    local_feed: Optional[LocalFeed] = None,
+) -> None:
+    architectures = build_options.architectures or (_get_system_type(),)
+    for architecture, package_path in zip(architectures, package_paths):
+        try:
+            if systemlink_client:
+                uploaded_file_name = upload_to_systemlink_feed(
+                    systemlink_client=systemlink_client,
+                    package_path=package_path,
+                    feed_name=feed_name,
+                    overwrite_packages=overwrite_packages,
+                ).file_name
+                logger.info(
+                    StatusMessages.PACKAGE_UPLOADED.format(
+                        package_name=uploaded_file_name,
+                        feed_name=feed_name,
+                    )
+                )
+        except Exception as ex:
+            if get_http_status_code(ex) != HTTPStatus.CONFLICT:
+                raise
+            # The version is derived from the contents, so the package in the feed is the same.
+            logger.debug(ex, exc_info=True)
+            logger.info(
+                StatusMessages.RUNTIME_ALREADY_PUBLISHED.format(
+                    version=runtime_package_info.version,
+                    package_name=runtime_package_info.package_name,
+                    feed_name=feed_name,
+                )
+            )
+
+        if local_feed:
+            _publish_to_local_feed(
+                logger, local_feed, package_path, runtime_package_info, architecture
+            )
 
 
-def build_package(logger: Logger, plugin_path: Path) -> Optional[Path]:
+def build_package(
+    logger: Logger,
+    plugin_path: Path,
+    build_options: Optional[BuildOptions] = None,
+) -> Optional[Path]:
     """Build a .nipkg file for the given plug-in.
 
     Args:
         logger: Logger object.
-        measurement_plugin_path: Measurement plug-in path.
+        plugin_path: Measurement plug-in path.
+        build_options: Output and staging options. Directories that are not set default
+            to the packager root.
 
     Returns:
-        Built measurement package file path.
+        Built measurement package file path. With several architectures, the package of the
+        first one.
     """
+    package_paths = build_packages(
+        logger=logger,
+        plugin_path=plugin_path,
+        build_options=build_options,
+    )
+    return package_paths[0] if package_paths else None
+
+
+def build_packages(
+    logger: Logger,
+    plugin_path: Path,
+    build_options: Optional[BuildOptions] = None,
+) -> List[Path]:
+    """Build the .nipkg files of the given plug-in, one per architecture.
+
+    The plug-in is staged and packed once, for the first architecture. The packages of the
+    other architectures are copies with a rewritten control member.
+
+    Args:
+        logger: Logger object.
+        plugin_path: Measurement plug-in path.
+        build_options: Output, staging and architecture options. Directories that are not set
+            default to the packager root.
+
+    Returns:
+        Built measurement package file paths, in the order of the architectures.
+    """
+    package_paths: List[Path] = []
+    with _pack_plugin(logger, plugin_path, build_options) as packed_plugin:
+        if not packed_plugin:
+            return package_paths
+
+        package_paths = _move_packages(packed_plugin.package_paths, packed_plugin.output_directory)
+
+        logger.info(
+            StatusMessages.PACKAGE_BUILT.format(
+                name=packed_plugin.package_info.plugin_name,
+                dir=packed_plugin.output_directory,
+            )
+        )
+        _record_artifacts(packed_plugin, package_paths, packed_plugin.sha256s)
+
+    return package_paths
+
+
+def _upload_from_staging(
+    logger: Logger,
+    plugin_path: Path,
+    systemlink_client: PublishPackagesToSystemLink,
+    feed_name: Optional[str],
+    overwrite_packages: Optional[bool],
+    staged_upload: StagedUploadOptions,
+    build_options: Optional[BuildOptions] = None,
+    local_feed: Optional[LocalFeed] = None,
+    run_journal: Optional[RunJournal] = None,
+    source: Optional[SourceFingerprint] = None,
+) -> List[Path]:
+    # Packages are packed next to the staged files and uploaded from there. Kept packages are
+    # moved into the output directory afterwards, the others are deleted with the staged files.
+    plugin_name = Path(plugin_path).name
+    package_paths: List[Path] = []
+    with _pack_plugin(
+        logger, plugin_path, build_options, pack_in_staging_directory=True
+    ) as packed_plugin:
+        if not packed_plugin:
+            return package_paths
+
+        for architecture, packed_file_path in zip(
+            packed_plugin.architectures, packed_plugin.package_paths
+        ):
+            package_path = packed_plugin.output_directory / packed_file_path.name
+            if run_journal and run_journal.is_uploaded(plugin_name, packed_file_path.name):
+                logger.info(
+                    StatusMessages.PACKAGE_ALREADY_UPLOADED.format(
+                        package_name=packed_file_path.name
+                    )
+                )
+            else:
+                upload_response = upload_to_systemlink_feed(
+                    systemlink_client=systemlink_client,
+                    package_path=packed_file_path,
+                    feed_name=feed_name,
+                    overwrite_packages=overwrite_packages,
+                )
+                logger.info(
+                    StatusMessages.PACKAGE_UPLOADED.format(
+                        package_name=upload_response.file_name,
+                        feed_name=feed_name,
+                    )
+                )
+                if run_journal:
+                    run_journal.record_upload(plugin_name, packed_file_path.name)
+
+            if local_feed:
+                _publish_to_local_feed(
+                    logger, local_feed, packed_file_path, packed_plugin.package_info, architecture
+                )
+            if staged_upload.keep_packages:
+                _move_package(packed_file_path, package_path)
+            package_paths.append(package_path)
+
+        if staged_upload.keep_packages:
+            _record_artifacts(packed_plugin, package_paths, packed_plugin.sha256s)
+            if run_journal and source:
+                run_journal.record_build(plugin_name, package_paths, source)
+
+    return package_paths
+
+
+def _move_package(source_path: Path, destination_path: Path) -> None:
+    try:
+        os.replace(source_path, destination_path)
+    except OSError:
+        # The staging directory is on another volume than the output directory.
+        _copy_package(source_path, destination_path)
+
+
+def _copy_package(source_path: Path, destination_path: Path) -> None:
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=destination_path.parent, prefix=f".{destination_path.name}.", suffix=".tmp"
+    )
+    os.close(file_descriptor)
+    try:
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, destination_path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+@dataclass
+class _PackedPlugin:
+    package_info: MeasurementPackageInfo
+    output_directory: Path
+    architectures: Tuple[str, ...]
+    package_paths: List[Path]
+    sha256s: List[Optional[str]]
+
+
+@contextmanager
+def _pack_plugin(
+    logger: Logger,
+    plugin_path: Path,
+    build_options: Optional[BuildOptions],
+    pack_in_staging_directory: bool = False,
+) -> Iterator[Optional[_PackedPlugin]]:
+    # Packs into a temporary directory that is removed when the block exits. The package lock
+    # is held for the whole block.
     measurement_plugin = Path(plugin_path).name
     logger.info(StatusMessages.BUILDING_PACKAGE.format(name=measurement_plugin))
 
-    packager_root_directory = _get_packager_root_directory(logger=logger)
-    if not packager_root_directory:
-        logger.info(StatusMessages.INVALID_PACKAGER_PATH)
-        return None
+    build_options = build_options or BuildOptions()
+    output_directory = build_options.output_directory
+    staging_directory = build_options.staging_directory
+    if not output_directory or not staging_directory:
+        packager_root_directory = _get_packager_root_directory(logger=logger)
+        if not packager_root_directory:
+            logger.info(StatusMessages.INVALID_PACKAGER_PATH)
+            yield None
+            return
+        output_directory = output_directory or packager_root_directory / PACKAGES
+        staging_directory = staging_directory or packager_root_directory
 
     if not _is_valid_plugin_directory(plugin_path=plugin_path, logger=logger):
         logger.info(StatusMessages.INVALID_PLUGIN)
-        return None
+        yield None
+        return
 
-    measurement_package_info = get_plugin_package_info(
-        measurement_plugin_path=plugin_path,
-        logger=logger,
-    )
-    template_directory_path = generate_template_directories(
-        packager_root_directory=packager_root_directory,
-        measurement_plugin_path=plugin_path,
-        measurement_package_info=measurement_package_info,
+    measurement_package_info = _get_package_info(logger, plugin_path, build_options)
+    payload_size = get_payload_size(plugin_path, build_options.payload_profile)
+    ram_staging_limit = _get_ram_staging_limit(build_options, pack_in_staging_directory)
+    package_name = measurement_package_info.package_name.lower()
+    architectures = build_options.architectures or (_get_system_type(),)
+    package_directory_path = Path(output_directory)
+    package_directory_path.mkdir(parents=True, exist_ok=True)
+
+    # Other packager processes may build the same plug-in into the same directory.
+    with file_lock(
+        package_directory_path / LOCKS_DIRECTORY / f"{package_name}.lock"
+    ), reserve_staging_directory(
+        default_staging_directory=staging_directory,
+        ram_staging_directory=build_options.ram_staging_directory,
+        payload_size=payload_size,
+        ram_staging_limit=ram_staging_limit,
+    ) as staging_directory:
+        logger.debug(StatusMessages.STAGING_DIRECTORY.format(dir=staging_directory))
+        saved_bytes: Dict[str, int] = {}
+        with STAGE_DURATION.time(stage="stage"):
+            template_directory_path = generate_template_directories(
+                packager_root_directory=staging_directory,
+                measurement_plugin_path=plugin_path,
+                measurement_package_info=measurement_package_info,
+                architecture=architectures[0],
+                payload_profile=build_options.payload_profile,
+                saved_bytes=saved_bytes,
+                runtime_package_info=build_options.plugin_runtimes.get(Path(plugin_path).name),
+            )
+        STAGED_BYTES.inc(payload_size)
+        logger.info(StatusMessages.TEMPLATE_FILES_GENERATED)
+        _report_saved_bytes(logger, measurement_plugin, build_options.payload_profile, saved_bytes)
+
+        pack_directory_path = Path(
+            tempfile.mkdtemp(
+                prefix=".pack-",
+                dir=staging_directory if pack_in_staging_directory else package_directory_path,
+            )
+        )
+        try:
+            try:
+                package_paths, sha256s = _pack_template_directory(
+                    logger=logger,
+                    template_directory_path=template_directory_path,
+                    pack_directory_path=pack_directory_path,
+                    package_info=measurement_package_info,
+                    architectures=architectures,
+                )
+            except Exception:
+                BUILDS.inc(result="failure")
+                raise
+
+            BUILDS.inc(result="success" if package_paths else "failure")
+            yield _PackedPlugin(
+                package_info=measurement_package_info,
+                output_directory=package_directory_path,
+                architectures=architectures,
+                package_paths=package_paths,
+                sha256s=sha256s,
+            )
+        finally:
+            shutil.rmtree(pack_directory_path, ignore_errors=True)
+
+
+def _pack_template_directory(
+    logger: Logger,
+    template_directory_path: Path,
+    pack_directory_path: Path,
+    package_info: MeasurementPackageInfo,
+    architectures: Sequence[str],
+) -> Tuple[List[Path], List[Optional[str]]]:
+    # Packs the template directory, which is removed afterwards, for the first architecture
+    # and derives the packages of the other architectures from it. Returns the package paths
+    # and the checksums of the packages that were hashed while they were written, or no
+    # packages if nipkg wrote none.
+    try:
+        command = (
+            f"{_get_nipkg_exe_directory()} pack {template_directory_path} {pack_directory_path}"
+        )
+        with STAGE_DURATION.time(stage="pack"):
+            subprocess.run(command, shell=False, check=True)  # nosec: B603
+    finally:
+        shutil.rmtree(template_directory_path, ignore_errors=True)
+
+    packed_file_path = _find_file_in_directory(
+        pack_directory_path,
+        package_info.package_name.lower(),
+        package_info.version,
+        architectures[0],
     )
+    if not packed_file_path:
+        return [], []
 
-    package_directory_path = Path(packager_root_directory) / PACKAGES
-    package_directory_path.mkdir(parents=True, exist_ok=True)
+    package_paths = [packed_file_path]
+    sha256s: List[Optional[str]] = [None]
+    for architecture in architectures[1:]:
+        architecture_package_path, sha256 = _write_architecture_package(
+            logger=logger,
+            package_path=packed_file_path,
+            package_info=package_info,
+            architecture=architecture,
+        )
+        package_paths.append(architecture_package_path)
+        sha256s.append(sha256)
+    return package_paths, sha256s
 
-    logger.info(StatusMessages.TEMPLATE_FILES_GENERATED)
-    path_to_nipkg_exe = _get_nipkg_exe_directory()
-    command = f"{path_to_nipkg_exe} pack {template_directory_path} {package_directory_path}"
-    subprocess.run(command, shell=False, check=True)  # nosec: B603
+
+def _move_packages(packed_file_paths: List[Path], output_directory: Path) -> List[Path]:
+    # Move the finished packages in with a rename, so readers never see a partial file.
+    package_paths = []
+    for packed_file_path in packed_file_paths:
+        package_paths.append(output_directory / packed_file_path.name)
+        os.replace(packed_file_path, package_paths[-1])
+    return package_paths
+
+
+def _get_package_info(
+    logger: Logger, plugin_path: Path, build_options: BuildOptions
+) -> MeasurementPackageInfo:
+    package_info = get_plugin_package_info(measurement_plugin_path=plugin_path, logger=logger)
+    runtime_package_info = build_options.plugin_runtimes.get(Path(plugin_path).name)
+    if not runtime_package_info:
+        return package_info
+    return replace(package_info, depends=_get_runtime_depends(runtime_package_info))
+
+
+def _get_runtime_depends(runtime_package_info: MeasurementPackageInfo) -> str:
+    # The start script installs exactly the wheels of this runtime version.
+    return f"{runtime_package_info.package_name} (= {runtime_package_info.version})"
+
+
+def _get_ram_staging_limit(build_options: BuildOptions, pack_in_staging_directory: bool) -> int:
+    # Packages packed next to the staged files count against the limit as well.
+    staged_copies = 2 if pack_in_staging_directory else 1
+    return build_options.ram_staging_limit // staged_copies
+
+
+def _report_saved_bytes(
+    logger: Logger, plugin_name: str, payload_profile: str, saved_bytes: Dict[str, int]
+) -> None:
+    if not saved_bytes:
+        return
+
+    for rule_name, rule_saved_bytes in saved_bytes.items():
+        PAYLOAD_BYTES_SAVED.inc(rule_saved_bytes, rule=rule_name)
     logger.info(
-        StatusMessages.PACKAGE_BUILT.format(
-            name=measurement_package_info.plugin_name,
-            dir=package_directory_path,
+        StatusMessages.PAYLOAD_TRIMMED.format(
+            profile=payload_profile,
+            size=sum(saved_bytes.values()),
+            name=plugin_name,
+            rules=", ".join(
+                f"{rule_name} {rule_saved_bytes}"
+                for rule_name, rule_saved_bytes in sorted(saved_bytes.items())
+            ),
         )
     )
 
-    measurement_package_path = _find_file_in_directory(
-        package_directory_path,
-        measurement_package_info.package_name,
+
+def _record_artifacts(
+    packed_plugin: _PackedPlugin,
+    package_paths: List[Path],
+    sha256s: Optional[List[Optional[str]]] = None,
+) -> None:
+    package_info = packed_plugin.package_info
+    package_name = package_info.package_name.lower()
+    artifact_index = ArtifactIndex(packed_plugin.output_directory)
+    for index, (architecture, package_path) in enumerate(
+        zip(packed_plugin.architectures, package_paths)
+    ):
+        artifact_index.record(
+            package_name=package_name,
+            version=package_info.version,
+            architecture=architecture,
+            plugin_name=package_info.plugin_name,
+            package_path=package_path,
+            sha256=sha256s[index] if sha256s else None,
+        )
+
+
+def _write_architecture_package(
+    logger: Logger,
+    package_path: Path,
+    package_info: MeasurementPackageInfo,
+    architecture: str,
+) -> Tuple[Path, str]:
+    package_name = package_info.package_name.lower()
+    architecture_package_path = (
+        package_path.parent / f"{package_name}_{package_info.version}_{architecture}.nipkg"
+    )
+    with STAGE_DURATION.time(stage="architecture"):
+        sha256 = write_architecture_variant(package_path, architecture, architecture_package_path)
+    logger.info(
+        StatusMessages.ARCHITECTURE_PACKAGE_BUILT.format(
+            name=package_info.plugin_name,
+            architecture=architecture,
+            source=package_path.name,
+        )
     )
-    return measurement_package_path
+    return architecture_package_path, sha256
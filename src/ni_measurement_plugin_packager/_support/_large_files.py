@@ -0,0 +1,84 @@
+"""Copying large plug-in files in bounded memory, keeping the holes of sparse files."""
+
+import errno
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+_STAT_BLOCK_SIZE = 512
+
+
+def is_sparse_file(file_path: Path) -> bool:
+    """Check whether a file has holes, that is fewer bytes allocated on disk than its size.
+
+    Args:
+        file_path: File path.
+
+    Returns:
+        True if the file is sparse. Always False where the platform does not report the
+        allocated size.
+    """
+    stat_result = os.stat(file_path)
+    allocated_blocks = getattr(stat_result, "st_blocks", None)
+    if allocated_blocks is None:
+        return False
+    return allocated_blocks * _STAT_BLOCK_SIZE < stat_result.st_size
+
+
+def _copy_data_extents(source: BinaryIO, destination: BinaryIO) -> None:
+    file_size = os.fstat(source.fileno()).st_size
+    offset = 0
+    while offset < file_size:
+        try:
+            data_start = os.lseek(source.fileno(), offset, os.SEEK_DATA)
+        except OSError as ex:
+            if ex.errno == errno.ENXIO:
+                # Only a hole is left up to the end of the file.
+                break
+            raise
+        data_end = os.lseek(source.fileno(), data_start, os.SEEK_HOLE)
+
+        source.seek(data_start)
+        destination.seek(data_start)
+        remaining_size = data_end - data_start
+        while remaining_size > 0:
+            chunk = source.read(min(_COPY_CHUNK_SIZE, remaining_size))
+            if not chunk:
+                break
+            destination.write(chunk)
+            remaining_size -= len(chunk)
+        offset = data_end
+
+    destination.truncate(file_size)
+
+
+def copy_file(source_path: Path, destination_path: Path) -> None:
+    """Copy a file with its metadata, in bounded memory.
+
+    Dense files are copied with `shutil.copy2`, which lets the kernel copy the data where the
+    platform supports it. Sparse files are copied one data extent at a time in fixed-size
+    chunks, so their holes are neither read as zeros nor written out in full.
+
+    Args:
+        source_path: File to copy.
+        destination_path: Path of the copy.
+    """
+    if not hasattr(os, "SEEK_DATA") or not is_sparse_file(source_path):
+        shutil.copy2(source_path, destination_path)
+        return
+
+    try:
+        with open(source_path, "rb", buffering=0) as source, open(
+            destination_path, "wb"
+        ) as destination:
+            _copy_data_extents(source, destination)
+    except OSError as ex:
+        # The file system of the source does not report data extents.
+        if ex.errno != errno.EINVAL:
+            raise
+        shutil.copy2(source_path, destination_path)
+        return
+
+    shutil.copystat(source_path, destination_path)
@@ -0,0 +1,141 @@
+"""Directory feed that NI Package Manager can install packages from."""
+
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ni_measurement_plugin_packager._constants import ControlFile
+from ni_measurement_plugin_packager._support._create_files import get_control_file_content
+from ni_measurement_plugin_packager._support._file_lock import LOCKS_DIRECTORY, file_lock
+from ni_measurement_plugin_packager._support._package_info import PackageInfo
+
+PACKAGES_INDEX_FILE_NAME = "Packages"
+COMPRESSED_PACKAGES_INDEX_FILE_NAME = "Packages.gz"
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+_feed_locks: Dict[Path, threading.Lock] = {}
+_feed_locks_guard = threading.Lock()
+
+
+def _copy_with_digests(source_path: Path, destination_path: Path) -> Tuple[str, str]:
+    # Hash while copying, so the package is read only once.
+    md5 = hashlib.md5(usedforsecurity=False)
+    sha256 = hashlib.sha256()
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        for chunk in iter(lambda: source.read(_COPY_CHUNK_SIZE), b""):
+            md5.update(chunk)
+            sha256.update(chunk)
+            destination.write(chunk)
+    return md5.hexdigest(), sha256.hexdigest()
+
+
+def _get_entry_key(stanza: str) -> Tuple[str, str, str]:
+    fields = dict(
+        line.split(": ", 1) for line in stanza.splitlines() if ": " in line and line[0] != " "
+    )
+    return (
+        fields.get(ControlFile.PACKAGE, ""),
+        fields.get(ControlFile.VERSION, ""),
+        fields.get(ControlFile.ARCHITECTURE, ""),
+    )
+
+
+class LocalFeed:
+    """Directory feed with a `Packages` index, updated one entry at a time.
+
+    Publishing a package copies it into the feed directory and hashes it in the same pass. Only
+    the package's own index entry is built, and the other entries are copied from the current
+    index without reading their packages. Both index files are then rewritten atomically while
+    holding a file lock, so installs and other packager processes never see a partially
+    written index.
+    """
+
+    def __init__(self, feed_directory: Path) -> None:
+        """Open a directory feed, creating the directory if needed.
+
+        Args:
+            feed_directory: Feed directory path.
+        """
+        self.feed_directory = Path(feed_directory)
+        self.index_path = self.feed_directory / PACKAGES_INDEX_FILE_NAME
+        self.compressed_index_path = self.feed_directory / COMPRESSED_PACKAGES_INDEX_FILE_NAME
+        self.lock_path = self.feed_directory / LOCKS_DIRECTORY / "feed.lock"
+        self.feed_directory.mkdir(parents=True, exist_ok=True)
+        with _feed_locks_guard:
+            self._lock = _feed_locks.setdefault(self.feed_directory.resolve(), threading.Lock())
+
+    def publish(
+        self, package_path: Path, package_info: PackageInfo, architecture: Optional[str] = None
+    ) -> Path:
+        """Copy a package into the feed and add or replace its index entry.
+
+        Args:
+            package_path: Built package file path.
+            package_info: Package information the package was built with.
+            architecture: Architecture the package was built for. Defaults to the architecture
+                of this system.
+
+        Returns:
+            Path of the package in the feed.
+        """
+        package_path = Path(package_path)
+        feed_package_path = self.feed_directory / package_path.name
+
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=self.feed_directory, prefix=f".{package_path.name}.", suffix=".tmp"
+        )
+        os.close(file_descriptor)
+        try:
+            md5sum, sha256 = _copy_with_digests(package_path, Path(temp_path))
+            stanza = "\n".join(
+                [
+                    get_control_file_content(package_info, architecture),
+                    f"Filename: {feed_package_path.name}",
+                    f"Size: {package_path.stat().st_size}",
+                    f"MD5sum: {md5sum}",
+                    f"SHA256: {sha256}",
+                ]
+            )
+
+            with self._lock, file_lock(self.lock_path):
+                os.replace(temp_path, feed_package_path)
+                entries = self._load()
+                entries[_get_entry_key(stanza)] = stanza
+                self._save(entries)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        return feed_package_path
+
+    def _load(self) -> Dict[Tuple[str, str, str], str]:
+        try:
+            index_content = self.index_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return {}
+
+        stanzas = [stanza.strip("\n") for stanza in index_content.split("\n\n")]
+        return {_get_entry_key(stanza): stanza for stanza in stanzas if stanza}
+
+    def _save(self, entries: Dict[Tuple[str, str, str], str]) -> None:
+        index_content = "\n\n".join(entries[key] for key in sorted(entries)) + "\n"
+        self._replace_file(self.index_path, index_content.encode("utf-8"))
+        self._replace_file(
+            self.compressed_index_path, gzip.compress(index_content.encode("utf-8"), mtime=0)
+        )
+
+    def _replace_file(self, file_path: Path, content: bytes) -> None:
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=self.feed_directory, prefix=f".{file_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as fp:
+                fp.write(content)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
@@ -3,6 +3,8 @@
 from pathlib import Path
 from typing import Tuple
 
+from ni_measurement_plugin_packager._constants import PACKAGER_DIRECTORY
+
 
 def _get_public_documents_path() -> Path:
     public_documents_path = Path("~Public") / "Documents"
@@ -40,6 +42,6 @@ def get_log_directory_path(fallback_path: Path) -> Tuple[Path, bool, bool]:
             user_path_status = False
             log_directory_path = fallback_path
 
-    log_directory_path = Path(log_directory_path) / "NI-Measurement-Plugin-Packager" / "Logs"
+    log_directory_path = Path(log_directory_path) / PACKAGER_DIRECTORY / "Logs"
 
     return log_directory_path, public_path_status, user_path_status
@@ -0,0 +1,210 @@
+"""Process-wide packaging metrics in the Prometheus text exposition format."""
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_METRIC_PREFIX = "ni_measurement_plugin_packager_"
+_DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: Sequence[str], label_values: Tuple[str, ...]) -> str:
+    if not label_names:
+        return ""
+    labels = ",".join(
+        f'{name}="{_escape_label_value(value)}"' for name, value in zip(label_names, label_values)
+    )
+    return f"{{{labels}}}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = ()) -> None:
+        """Create a counter.
+
+        Args:
+            name: Metric name without the packager prefix. Ends with '_total'.
+            description: Help text of the metric.
+            label_names: Names of the labels the counter is split by.
+        """
+        self.name = _METRIC_PREFIX + name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        # Counters without labels are exposed from the start, so their rate is never missing.
+        self._values: Dict[Tuple[str, ...], float] = {} if self.label_names else {(): 0}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Add to the counter."""
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        """Exposition lines of the counter."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down, optionally split by labels."""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge."""
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, optionally split by labels."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = _DEFAULT_BUCKETS,
+    ) -> None:
+        """Create a histogram.
+
+        Args:
+            name: Metric name without the packager prefix.
+            description: Help text of the metric.
+            label_names: Names of the labels the histogram is split by.
+            buckets: Upper bounds of the buckets, in increasing order.
+        """
+        self.name = _METRIC_PREFIX + name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observed value."""
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            bucket_counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    bucket_counts[index] += 1
+            self._values[key] = (bucket_counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the block in seconds, also when it raises."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def render(self) -> List[str]:
+        """Exposition lines of the histogram."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (bucket_counts, total, count) in sorted(self._values.items()):
+                for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                    labels = _format_labels(
+                        self.label_names + ("le",), key + (_format_value(upper_bound),)
+                    )
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = _format_labels(self.label_names + ("le",), key + ("+Inf",))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+BUILDS = Counter("builds_total", "Package builds by result.", ["result"])
+UPLOADS = Counter("uploads_total", "Package uploads to SystemLink feeds by result.", ["result"])
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by cache and result.", ["cache", "result"]
+)
+FAILURES = Counter("failures_total", "Failures by exception type.", ["exception"])
+STAGED_BYTES = Counter("staged_bytes_total", "Bytes of plug-in files staged for packing.")
+UPLOADED_BYTES = Counter("uploaded_bytes_total", "Bytes of packages uploaded to SystemLink feeds.")
+PAYLOAD_BYTES_SAVED = Counter(
+    "payload_bytes_saved_total", "Bytes left out of packages by payload profile rule.", ["rule"]
+)
+CONCURRENCY_LIMIT = Gauge(
+    "concurrency_limit", "Current limit of concurrent tasks of adaptive stages.", ["stage"]
+)
+STAGE_DURATION = Histogram("stage_duration_seconds", "Duration of packaging stages.", ["stage"])
+
+_METRICS = (
+    BUILDS,
+    UPLOADS,
+    CACHE_LOOKUPS,
+    FAILURES,
+    STAGED_BYTES,
+    UPLOADED_BYTES,
+    PAYLOAD_BYTES_SAVED,
+    CONCURRENCY_LIMIT,
+    STAGE_DURATION,
+)
+
+
+def record_failure(exception: BaseException) -> None:
+    """Count a handled failure by its exception type."""
+    FAILURES.inc(exception=type(exception).__name__)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a lookup of one of the packager caches."""
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render_metrics() -> str:
+    """All packager metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in _METRICS for line in metric.render()) + "\n"
+
+
+def write_metrics_file(metrics_path: Path) -> None:
+    """Write all packager metrics to a file, for example for the node exporter textfile collector.
+
+    The file is replaced atomically, so collectors never read a partially written file.
+
+    Args:
+        metrics_path: Metrics file path.
+    """
+    metrics_path = Path(metrics_path)
+    metrics_path.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=metrics_path.parent, prefix=f".{metrics_path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as fp:
+            fp.write(render_metrics())
+        os.replace(temp_path, metrics_path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,167 @@
+"""Rewriting the control member of built .nipkg files without repacking their payload."""
+
+import hashlib
+import io
+import tarfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Literal, cast
+
+from ni_measurement_plugin_packager._constants import (
+    ControlFile,
+    FileNames,
+    StatusMessages,
+)
+
+_AR_MAGIC = b"!<arch>\n"
+_AR_HEADER_SIZE = 60
+_COPY_CHUNK_SIZE = 1024 * 1024
+_CONTROL_MEMBER_PREFIX = "control.tar"
+_TAR_WRITE_MODES: Dict[str, Literal["w:gz", "w:xz", "w:bz2", "w"]] = {
+    ".gz": "w:gz",
+    ".xz": "w:xz",
+    ".bz2": "w:bz2",
+    ".tar": "w",
+}
+
+
+@dataclass
+class _ArMember:
+    header: bytes
+    name: str
+    offset: int
+    size: int
+
+
+class _HashingWriter:
+    # Hashes the bytes written to a file, so the file does not have to be read back.
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self._fp = fp
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        return self._fp.write(data)
+
+
+def _read_ar_members(fp: BinaryIO) -> List[_ArMember]:
+    if fp.read(len(_AR_MAGIC)) != _AR_MAGIC:
+        raise ValueError("Not an ar archive.")
+
+    members: List[_ArMember] = []
+    while True:
+        header = fp.read(_AR_HEADER_SIZE)
+        if len(header) < _AR_HEADER_SIZE:
+            return members
+        size = int(header[48:58].decode("ascii").strip())
+        members.append(
+            _ArMember(
+                header=header,
+                name=header[:16].decode("ascii").strip().rstrip("/"),
+                offset=fp.tell(),
+                size=size,
+            )
+        )
+        fp.seek(size + size % 2, io.SEEK_CUR)
+
+
+def _write_ar_member_header(fp: BinaryIO, header: bytes, size: int) -> None:
+    fp.write(header[:48] + str(size).encode("ascii").ljust(10) + header[58:])
+
+
+def _write_ar_member_padding(fp: BinaryIO, size: int) -> None:
+    if size % 2:
+        fp.write(b"\n")
+
+
+def _copy_bytes(source: BinaryIO, destination: BinaryIO, size: int) -> None:
+    while size > 0:
+        chunk = source.read(min(_COPY_CHUNK_SIZE, size))
+        if not chunk:
+            raise ValueError("Truncated ar archive.")
+        destination.write(chunk)
+        size -= len(chunk)
+
+
+def _set_control_field(control: str, field: str, value: str) -> str:
+    return "\n".join(
+        f"{field}: {value}" if line.split(":", 1)[0] == field else line
+        for line in control.split("\n")
+    )
+
+
+def _rewrite_control_member(control_member: bytes, member_name: str, architecture: str) -> bytes:
+    write_mode = _TAR_WRITE_MODES[Path(member_name).suffix]
+    output = io.BytesIO()
+    with tarfile.open(fileobj=io.BytesIO(control_member), mode="r:*") as source, tarfile.open(
+        fileobj=output, mode=write_mode
+    ) as destination:
+        for tar_info in source.getmembers():
+            content = source.extractfile(tar_info) if tar_info.isfile() else None
+            if content and Path(tar_info.name).name == FileNames.CONTROL:
+                control = _set_control_field(
+                    content.read().decode("utf-8"), ControlFile.ARCHITECTURE, architecture
+                ).encode("utf-8")
+                tar_info.size = len(control)
+                content = io.BytesIO(control)
+            destination.addfile(tar_info, content)
+
+    return output.getvalue()
+
+
+def write_architecture_variant(
+    package_path: Path, architecture: str, destination_path: Path
+) -> str:
+    """Write a copy of a package for another architecture.
+
+    Only the control member is rewritten. The payload member is copied byte for byte in
+    chunks, so it is neither staged nor compressed again, and the copy is hashed as it is
+    written.
+
+    Args:
+        package_path: Built .nipkg file path.
+        architecture: Architecture to set in the control file.
+        destination_path: Path of the package to write.
+
+    Returns:
+        SHA-256 of the written package.
+
+    Raises:
+        ValueError: If the package is not an ar archive with a control member.
+    """
+    invalid_archive_message = StatusMessages.INVALID_PACKAGE_ARCHIVE.format(path=package_path)
+    with open(package_path, "rb") as source:
+        try:
+            members = _read_ar_members(source)
+        except ValueError as ex:
+            raise ValueError(invalid_archive_message) from ex
+        control_members = [
+            member for member in members if member.name.startswith(_CONTROL_MEMBER_PREFIX)
+        ]
+        # Control members compressed in a format tarfile cannot write, such as zstd, are
+        # rejected before the destination is created.
+        if not control_members or any(
+            Path(member.name).suffix not in _TAR_WRITE_MODES for member in control_members
+        ):
+            raise ValueError(invalid_archive_message)
+
+        with open(destination_path, "wb") as destination_file:
+            hashing_writer = _HashingWriter(destination_file)
+            destination = cast(BinaryIO, hashing_writer)
+            destination.write(_AR_MAGIC)
+            for member in members:
+                source.seek(member.offset)
+                if member.name.startswith(_CONTROL_MEMBER_PREFIX):
+                    control_member = _rewrite_control_member(
+                        source.read(member.size), member.name, architecture
+                    )
+                    _write_ar_member_header(destination, member.header, len(control_member))
+                    destination.write(control_member)
+                    _write_ar_member_padding(destination, len(control_member))
+                else:
+                    _write_ar_member_header(destination, member.header, member.size)
+                    _copy_bytes(source, destination, member.size)
+                    _write_ar_member_padding(destination, member.size)
+
+    return hashing_writer.sha256.hexdigest()
@@ -1,6 +1,11 @@
-"""Models for package information."""
+"""Models for package information and build options."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from ni_measurement_plugin_packager._constants import RAM_STAGING_LIMIT_IN_BYTES
+from ni_measurement_plugin_packager._support._payload_profiles import FULL_PROFILE
 
 
 @dataclass
@@ -12,3 +17,24 @@ class PackageInfo:
     version: str
     description: str
     author: str
+    depends: Optional[str] = None
+
+
+@dataclass
+class BuildOptions:
+    """Options for building measurement packages."""
+
+    output_directory: Optional[Path] = None
+    staging_directory: Optional[Path] = None
+    ram_staging_directory: Optional[Path] = None
+    ram_staging_limit: int = RAM_STAGING_LIMIT_IN_BYTES
+    architectures: Tuple[str, ...] = ()
+    payload_profile: str = FULL_PROFILE
+    plugin_runtimes: Dict[str, PackageInfo] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class StagedUploadOptions:
+    """Options for uploading packages from the staging directory as soon as they are packed."""
+
+    keep_packages: bool = False
@@ -0,0 +1,87 @@
+"""Payload profiles: named sets of rules that leave non-runtime content out of packages."""
+
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+FULL_PROFILE = "full"
+RUNTIME_PROFILE = "runtime"
+
+
+@dataclass(frozen=True)
+class PayloadRule:
+    """Files and directories of a kind that a profile leaves out of the payload.
+
+    Directory names match only directories in the plug-in root, so that Python packages of the
+    plug-in with the same name, such as a `samples` package, stay in the payload. Nested
+    directory names and file patterns match at any depth.
+    """
+
+    name: str
+    directory_names: Tuple[str, ...] = ()
+    nested_directory_names: Tuple[str, ...] = ()
+    file_patterns: Tuple[str, ...] = ()
+
+    def matches(self, path: Path, plugin_root: Path) -> bool:
+        """Check whether a plug-in file or directory is covered by the rule."""
+        name = path.name.lower()
+        if path.is_dir():
+            return name in self.nested_directory_names or (
+                name in self.directory_names and path.parent == plugin_root
+            )
+        return any(fnmatchcase(name, pattern) for pattern in self.file_patterns)
+
+
+_RUNTIME_RULES = (
+    PayloadRule(
+        name="tests",
+        directory_names=("tests",),
+        file_patterns=("conftest.py", "pytest.ini", "tox.ini", ".coveragerc"),
+    ),
+    PayloadRule(
+        name="docs",
+        directory_names=("docs", "doc"),
+        file_patterns=("*.md", "*.rst"),
+    ),
+    PayloadRule(
+        name="notebooks",
+        nested_directory_names=(".ipynb_checkpoints",),
+        file_patterns=("*.ipynb",),
+    ),
+    PayloadRule(name="type_stubs", file_patterns=("*.pyi", "py.typed")),
+    PayloadRule(name="sample_data", directory_names=("sample_data", "samples")),
+    PayloadRule(
+        name="design_files",
+        file_patterns=("*.psd", "*.ai", "*.sketch", "*.fig", "*.xcf", "*.vsdx", "*.drawio"),
+    ),
+    PayloadRule(
+        name="repository_files",
+        directory_names=(".git", ".github"),
+        file_patterns=(".gitignore", ".gitattributes", ".pre-commit-config.yaml", ".flake8"),
+    ),
+)
+
+PAYLOAD_PROFILES: Dict[str, Tuple[PayloadRule, ...]] = {
+    FULL_PROFILE: (),
+    RUNTIME_PROFILE: _RUNTIME_RULES,
+}
+
+
+def get_excluding_rule(
+    path: Path, payload_profile: Optional[str], plugin_root: Path
+) -> Optional[PayloadRule]:
+    """Rule of a payload profile that leaves a plug-in file or directory out of the payload.
+
+    Args:
+        path: Plug-in file or directory path.
+        payload_profile: Payload profile name. None keeps everything.
+        plugin_root: Measurement plug-in directory that `path` is in.
+
+    Returns:
+        First matching rule, or None if the path is part of the payload.
+    """
+    for rule in PAYLOAD_PROFILES[payload_profile or FULL_PROFILE]:
+        if rule.matches(path, plugin_root):
+            return rule
+    return None
@@ -0,0 +1,130 @@
+"""CPU and memory profiling of packaging runs."""
+
+import cProfile
+import io
+import pstats
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+PROFILES_DIRECTORY = "Profiles"
+
+_TOP_ALLOCATIONS_COUNT = 15
+_TOP_FUNCTIONS_COUNT = 30
+
+# Functions, by module file and name, whose cumulative time is reported as a packaging stage.
+_STAGE_FUNCTIONS = {
+    "Read pyproject.toml": ("_pyproject_toml_info.py", "_parse_pyproject_toml"),
+    "Copy plug-in files": ("_create_files.py", "_copy_directory_with_filters"),
+    "Run nipkg": ("subprocess.py", "run"),
+    "Upload package": ("_helpers.py", "upload_to_systemlink_feed"),
+}
+
+
+@dataclass
+class _ProfileEntry:
+    name: str
+    stats_path: Path
+    duration: float
+    peak_memory: int
+
+
+class RunProfiler:
+    """Profile each plug-in of a run with cProfile and tracemalloc."""
+
+    def __init__(self, log_directory_path: Path) -> None:
+        """Create a profiler that writes its results next to the log file.
+
+        Args:
+            log_directory_path: Log directory path.
+        """
+        run_name = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.output_directory = Path(log_directory_path) / PROFILES_DIRECTORY / run_name
+        self._entries: List[_ProfileEntry] = []
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        """Profile the enclosed block and write its pstats file and memory summary.
+
+        Args:
+            name: Name of the profiled plug-in.
+        """
+        self.output_directory.mkdir(parents=True, exist_ok=True)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        start_time = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            duration = time.perf_counter() - start_time
+            _, peak_memory = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+
+            file_stem = re.sub(r"[^\w.-]", "_", name)
+            stats_path = self.output_directory / f"{file_stem}.pstats"
+            profiler.dump_stats(str(stats_path))
+            self._write_memory_summary(
+                self.output_directory / f"{file_stem}-memory.txt", snapshot, peak_memory
+            )
+            self._entries.append(_ProfileEntry(name, stats_path, duration, peak_memory))
+
+    def write_summary(self) -> Optional[Path]:
+        """Merge the profiles of the run into one summary.
+
+        Returns:
+            Summary file path, or None if nothing was profiled.
+        """
+        if not self._entries:
+            return None
+
+        summary = io.StringIO()
+        first_entry, *other_entries = self._entries
+        stats = pstats.Stats(str(first_entry.stats_path), stream=summary)
+        for entry in other_entries:
+            stats.add(str(entry.stats_path))
+        stats.dump_stats(str(self.output_directory / "merged.pstats"))
+
+        # The stats profile keys functions by name only, so the module file is checked as well.
+        function_profiles = stats.get_stats_profile().func_profiles
+        stage_durations: Dict[str, float] = {}
+        for stage, (stage_file_name, stage_function_name) in _STAGE_FUNCTIONS.items():
+            function_profile = function_profiles.get(stage_function_name)
+            if function_profile and function_profile.file_name.endswith(stage_file_name):
+                stage_durations[stage] = function_profile.cumtime
+
+        summary.write("Plug-in profiles\n")
+        for entry in self._entries:
+            summary.write(
+                f"  {entry.name}: {entry.duration:.3f} s, "
+                f"peak traced memory {entry.peak_memory / 1024 / 1024:.1f} MiB\n"
+            )
+        summary.write("\nStages (cumulative)\n")
+        for stage, duration in stage_durations.items():
+            summary.write(f"  {stage}: {duration:.3f} s\n")
+        summary.write("\n")
+        stats.sort_stats("cumulative").print_stats(_TOP_FUNCTIONS_COUNT)
+
+        summary_path = self.output_directory / "summary.txt"
+        summary_path.write_text(summary.getvalue(), encoding="utf-8")
+        return summary_path
+
+    @staticmethod
+    def _write_memory_summary(
+        memory_path: Path, snapshot: tracemalloc.Snapshot, peak_memory: int
+    ) -> None:
+        lines = [f"Peak traced memory: {peak_memory / 1024 / 1024:.1f} MiB", "Top allocations:"]
+        for statistic in snapshot.statistics("lineno")[:_TOP_ALLOCATIONS_COUNT]:
+            lines.append(f"  {statistic}")
+        memory_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
@@ -3,7 +3,7 @@
 import re
 from logging import Logger
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 import tomli
 
@@ -11,6 +11,7 @@ from ni_measurement_plugin_packager._constants import (
     PyProjectToml,
     StatusMessages,
 )
+from ni_measurement_plugin_packager._support._metrics import record_cache_lookup
 from ni_measurement_plugin_packager._support._package_info import PackageInfo
 
 UNDERSCORE_SPACE_REGEX = r"[_ ]"
@@ -18,6 +19,9 @@ DEFAULT_DESCRIPTION = "Python Measurement Plug-In"
 DEFAULT_VERSION = "1.0.0"
 DEFAULT_AUTHOR = "National Instruments"
 
+# Parsed package information, keyed by pyproject.toml path and invalidated when the file changes.
+_package_info_cache: Dict[Path, Tuple[int, int, PackageInfo]] = {}
+
 
 def _parse_pyproject_toml(toml_file_path: Path) -> Dict[str, Any]:
     with open(toml_file_path, "rb") as file:
@@ -82,6 +86,13 @@ def get_plugin_package_info(measurement_plugin_path: Path, logger: Logger) -> Pa
     pyproject_toml_path = Path(measurement_plugin_path) / PyProjectToml.FILE_NAME
     plugin_name = Path(measurement_plugin_path).name
 
+    stat = pyproject_toml_path.stat()
+    cached = _package_info_cache.get(pyproject_toml_path)
+    cache_hit = bool(cached and cached[:2] == (stat.st_size, stat.st_mtime_ns))
+    record_cache_lookup("package_info", hit=cache_hit)
+    if cached and cache_hit:
+        return cached[2]
+
     pyproject_toml_data = _parse_pyproject_toml(toml_file_path=pyproject_toml_path)
 
     measurement_package_info = _extract_package_metadata(
@@ -89,5 +100,39 @@ def get_plugin_package_info(measurement_plugin_path: Path, logger: Logger) -> Pa
         toml_content=pyproject_toml_data,
         plugin_name=plugin_name,
     )
+    _package_info_cache[pyproject_toml_path] = (
+        stat.st_size,
+        stat.st_mtime_ns,
+        measurement_package_info,
+    )
 
     return measurement_package_info
+
+
+def get_path_dependencies(measurement_plugin_path: Path) -> List[Path]:
+    """Local directories the measurement plug-in depends on through Poetry path dependencies.
+
+    Args:
+        measurement_plugin_path: Measurement Plug-in path.
+
+    Returns:
+        Resolved dependency paths.
+    """
+    pyproject_toml_data = _parse_pyproject_toml(
+        toml_file_path=Path(measurement_plugin_path) / PyProjectToml.FILE_NAME
+    )
+    dependencies = (
+        pyproject_toml_data.get(PyProjectToml.TOOL, {})
+        .get(PyProjectToml.POETRY, {})
+        .get(PyProjectToml.DEPENDENCIES, {})
+    )
+
+    dependency_paths = []
+    for constraint in dependencies.values():
+        # A dependency is a single constraint or a list of constraints for different markers.
+        for dependency in constraint if isinstance(constraint, list) else [constraint]:
+            if isinstance(dependency, dict) and PyProjectToml.PATH in dependency:
+                dependency_path = Path(measurement_plugin_path) / dependency[PyProjectToml.PATH]
+                dependency_paths.append(dependency_path.resolve())
+
+    return dependency_paths
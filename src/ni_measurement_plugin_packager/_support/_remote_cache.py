@@ -0,0 +1,97 @@
+"""Persistent cache of SystemLink workspace and feed IDs, shared by packager runs."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ni_measurement_plugin_packager._support._file_lock import LOCKS_DIRECTORY, file_lock
+from ni_measurement_plugin_packager._support._metrics import record_cache_lookup
+
+REMOTE_CACHE_FILE_NAME = "remote-cache.json"
+REMOTE_CACHE_TTL_IN_SECONDS = 24 * 60 * 60
+
+WORKSPACE = "workspace"
+FEED = "feed"
+
+
+class RemoteIdCache:
+    """Name to ID mappings of SystemLink workspaces and feeds, per server URL.
+
+    Entries expire after a time to live, and callers invalidate an entry as soon as the server
+    reports its ID as not found. The cache file is rewritten atomically under a file lock, so
+    concurrent packager runs can share it.
+    """
+
+    def __init__(self, cache_path: Path, ttl: float = REMOTE_CACHE_TTL_IN_SECONDS) -> None:
+        """Open the cache stored in a file.
+
+        Args:
+            cache_path: Cache file path.
+            ttl: Time to live of an entry in seconds.
+        """
+        self.cache_path = Path(cache_path)
+        self.lock_path = self.cache_path.parent / LOCKS_DIRECTORY / f"{self.cache_path.name}.lock"
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def get(self, server: str, kind: str, name: str) -> Optional[str]:
+        """ID cached for a name, if it has not expired.
+
+        Args:
+            server: SystemLink API URL.
+            kind: `WORKSPACE` or `FEED`.
+            name: Workspace name, or '<workspace ID>/<feed name>' for feeds.
+
+        Returns:
+            Cached ID.
+        """
+        entry = self._load().get(server.rstrip("/"), {}).get(f"{kind}:{name}")
+        cache_hit = bool(entry and entry["expires_at"] >= time.time())
+        record_cache_lookup("remote_ids", hit=cache_hit)
+        return entry["id"] if entry and cache_hit else None
+
+    def set(self, server: str, kind: str, name: str, remote_id: str) -> None:
+        """Cache the ID of a name."""
+        with self._lock, file_lock(self.lock_path):
+            entries = self._load()
+            entries.setdefault(server.rstrip("/"), {})[f"{kind}:{name}"] = {
+                "id": remote_id,
+                "expires_at": time.time() + self.ttl,
+            }
+            self._save(entries)
+
+    def invalidate(self, server: str, kind: str, name: str) -> None:
+        """Drop the cached ID of a name."""
+        with self._lock, file_lock(self.lock_path):
+            entries = self._load()
+            if entries.get(server.rstrip("/"), {}).pop(f"{kind}:{name}", None):
+                self._save(entries)
+
+    def clear(self) -> None:
+        """Drop all cached IDs."""
+        with self._lock, file_lock(self.lock_path):
+            self.cache_path.unlink(missing_ok=True)
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as fp:
+                return json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save(self, entries: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(
+            dir=self.cache_path.parent, prefix=f".{self.cache_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as fp:
+                json.dump(entries, fp, indent=2)
+            os.replace(temp_path, self.cache_path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
@@ -0,0 +1,268 @@
+"""Append-only journal of the work completed by a batch run, used to resume interrupted runs."""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from logging import Logger
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Set, Type
+
+from ni_measurement_plugin_packager._support._artifact_index import (
+    ArtifactIndex,
+    get_file_sha256,
+)
+from ni_measurement_plugin_packager._support._create_files import iter_payload_files
+from ni_measurement_plugin_packager._support._file_lock import LOCKS_DIRECTORY, file_lock
+from ni_measurement_plugin_packager._support._pyproject_toml_info import get_plugin_package_info
+
+RUN_JOURNALS_DIRECTORY = "journals"
+
+_BUILT_EVENT = "built"
+_UPLOADED_EVENT = "uploaded"
+_COMPLETED_EVENT = "completed"
+
+
+def get_run_journal_path(journals_directory: Path, run_inputs: Dict[str, Any]) -> Path:
+    """Journal file of a run, derived from the inputs that select its work.
+
+    Args:
+        journals_directory: Directory of the run journals.
+        run_inputs: Plug-in selection, publish targets and build options of the run.
+
+    Returns:
+        Journal file path, the same for every run with the same inputs.
+    """
+    run_key = json.dumps(run_inputs, sort_keys=True, default=str)
+    return Path(journals_directory) / f"{hashlib.sha256(run_key.encode()).hexdigest()[:16]}.jsonl"
+
+
+@dataclass(frozen=True)
+class SourceFingerprint:
+    """Package name, version and payload files of a plug-in, as of one build."""
+
+    package_name: str
+    version: str
+    payload_digest: str
+
+
+def get_source_fingerprint(
+    plugin_path: Path, logger: Logger, payload_profile: Optional[str] = None
+) -> SourceFingerprint:
+    """Fingerprint of the plug-in sources that a build packs.
+
+    The payload digest covers the relative path, size and modification time of each payload
+    file, so an edited file changes it without any file being read.
+
+    Args:
+        plugin_path: Measurement plug-in path.
+        logger: Logger object.
+        payload_profile: Payload profile whose rules leave files out of the package.
+
+    Returns:
+        Source fingerprint of the plug-in.
+    """
+    package_info = get_plugin_package_info(plugin_path, logger)
+    payload_digest = hashlib.sha256()
+    for file_path in sorted(iter_payload_files(plugin_path, payload_profile)):
+        stat = file_path.stat()
+        relative_path = file_path.relative_to(plugin_path).as_posix()
+        payload_digest.update(f"{relative_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return SourceFingerprint(
+        package_name=package_info.package_name.lower(),
+        version=package_info.version,
+        payload_digest=payload_digest.hexdigest(),
+    )
+
+
+def _get_package_sha256(package_path: Path) -> str:
+    # The artifact index already hashed packages built into the packages directory.
+    entry = ArtifactIndex(package_path.parent).find_entry(package_path.name)
+    return entry.sha256 if entry else get_file_sha256(package_path)
+
+
+class RunJournal:
+    """Journal of built packages, uploaded packages and completed plug-ins, one JSON line each.
+
+    Every record is flushed and synced to disk before the run moves on, so a run that is
+    killed at any point leaves a journal of the work it finished. A record cut short by the
+    crash is dropped when the journal is resumed. The journal is locked while it is open, so a
+    concurrent run with the same inputs waits for it instead of truncating it.
+    """
+
+    def __init__(self, journal_path: Path, resume: bool = False) -> None:
+        """Start a journal, or continue the journal of an interrupted run.
+
+        Args:
+            journal_path: Journal file path.
+            resume: Whether to load and extend the existing journal instead of starting over.
+        """
+        self.journal_path = Path(journal_path)
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._builds: Dict[str, Dict[str, Any]] = {}
+        self._uploaded_packages: Dict[str, Set[str]] = {}
+        self._completed_sources: Dict[str, Dict[str, str]] = {}
+        with ExitStack() as exit_stack:
+            exit_stack.enter_context(
+                file_lock(
+                    self.journal_path.parent / LOCKS_DIRECTORY / f"{self.journal_path.stem}.lock"
+                )
+            )
+            if resume:
+                self._replay()
+            self._file = open(self.journal_path, "a" if resume else "w", encoding="utf-8")
+            self._exit_stack = exit_stack.pop_all()
+
+    def __enter__(self) -> "RunJournal":
+        """Return the journal, which is closed when the block exits."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the journal."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the journal file and release its lock."""
+        try:
+            self._file.close()
+        finally:
+            self._exit_stack.close()
+
+    @property
+    def completed_count(self) -> int:
+        """Number of plug-ins completed by the journaled runs."""
+        return len(self._completed_sources)
+
+    def record_build(
+        self, plugin_name: str, package_paths: List[Path], source: SourceFingerprint
+    ) -> None:
+        """Record the packages built for a plug-in, with their checksums and sources."""
+        packages = []
+        for package_path in map(Path, package_paths):
+            stat = package_path.stat()
+            packages.append(
+                {
+                    "path": str(package_path),
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": _get_package_sha256(package_path),
+                }
+            )
+        self._append(
+            {
+                "event": _BUILT_EVENT,
+                "plugin": plugin_name,
+                "source": asdict(source),
+                "packages": packages,
+            }
+        )
+
+    def record_upload(self, plugin_name: str, file_name: str) -> None:
+        """Record a package uploaded to the SystemLink feed."""
+        self._append({"event": _UPLOADED_EVENT, "plugin": plugin_name, "file_name": file_name})
+
+    def record_completion(self, plugin_name: str, source: SourceFingerprint) -> None:
+        """Record that a plug-in was built from the given sources and published to all targets."""
+        self._append({"event": _COMPLETED_EVENT, "plugin": plugin_name, "source": asdict(source)})
+
+    def is_completed(
+        self, plugin_name: str, source: SourceFingerprint, verify_packages: bool = False
+    ) -> bool:
+        """Check whether a plug-in was completed from the same sources by the journaled runs.
+
+        Args:
+            plugin_name: Measurement plug-in directory name.
+            source: Current source fingerprint of the plug-in.
+            verify_packages: Whether the built packages must still be on disk unchanged.
+
+        Returns:
+            True if the plug-in needs no more work.
+        """
+        if self._completed_sources.get(plugin_name) != asdict(source):
+            return False
+        return not verify_packages or self.get_verified_packages(plugin_name, source) is not None
+
+    def is_uploaded(self, plugin_name: str, file_name: str) -> bool:
+        """Check whether a package was uploaded by the journaled runs."""
+        return file_name in self._uploaded_packages.get(plugin_name, set())
+
+    def get_verified_packages(
+        self, plugin_name: str, source: SourceFingerprint
+    ) -> Optional[List[Path]]:
+        """Packages built for a plug-in from the same sources, if all are still on disk.
+
+        A package whose size and modification time match the build is taken as unchanged.
+        Any other package is hashed and compared with the checksum recorded when it was built.
+
+        Args:
+            plugin_name: Measurement plug-in directory name.
+            source: Current source fingerprint of the plug-in.
+
+        Returns:
+            Package file paths, or None if the plug-in has to be built again.
+        """
+        build = self._builds.get(plugin_name)
+        if not build or build.get("source") != asdict(source) or not build["packages"]:
+            return None
+
+        for package in build["packages"]:
+            package_path = Path(package["path"])
+            if not package_path.is_file():
+                return None
+            stat = package_path.stat()
+            if stat.st_size != package["size"]:
+                return None
+            if stat.st_mtime_ns != package.get("mtime_ns") and (
+                get_file_sha256(package_path) != package["sha256"]
+            ):
+                return None
+        return [Path(package["path"]) for package in build["packages"]]
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._apply(record)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        plugin_name = record["plugin"]
+        if record["event"] == _BUILT_EVENT:
+            previous_build = self._builds.get(plugin_name)
+            if previous_build and previous_build.get("source") != record.get("source"):
+                # Uploads of packages built from other sources do not count for this build.
+                self._uploaded_packages.pop(plugin_name, None)
+            self._builds[plugin_name] = record
+            self._completed_sources.pop(plugin_name, None)
+        elif record["event"] == _UPLOADED_EVENT:
+            self._uploaded_packages.setdefault(plugin_name, set()).add(record["file_name"])
+        elif record["event"] == _COMPLETED_EVENT:
+            # Completions journaled without their sources never match.
+            self._completed_sources[plugin_name] = record.get("source", {})
+
+    def _replay(self) -> None:
+        try:
+            with open(self.journal_path, "rb") as fp:
+                content = fp.read()
+        except FileNotFoundError:
+            return
+
+        # Drop a last record that the crash cut short, so new records start on a new line.
+        complete_length = content.rfind(b"\n") + 1
+        if complete_length < len(content):
+            os.truncate(self.journal_path, complete_length)
+
+        for line in content[:complete_length].decode("utf-8").splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError):
+                continue
@@ -0,0 +1,89 @@
+"""Machine-readable report of the plug-ins processed by a run."""
+
+import json
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BUILT = "built"
+UPLOADED = "uploaded"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+@dataclass
+class PluginReport:
+    """Outcome of a single plug-in."""
+
+    plugin_name: str
+    status: str
+    package_file_name: Optional[str] = None
+    package_size: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class RunReport:
+    """Outcome of every plug-in of a run, or of several merged runs."""
+
+    shard: Optional[str] = None
+    plugins: List[PluginReport] = field(default_factory=list)
+
+    def add(self, plugin_report: PluginReport) -> None:
+        """Record the outcome of a plug-in."""
+        self.plugins.append(plugin_report)
+
+    def get_status_counts(self) -> Dict[str, int]:
+        """Number of plug-ins per status."""
+        return dict(Counter(plugin.status for plugin in self.plugins))
+
+    def get_durations(self) -> Dict[str, float]:
+        """Duration of each plug-in that finished, usable as the build cost of later runs."""
+        return {
+            plugin.plugin_name: plugin.duration
+            for plugin in self.plugins
+            if plugin.status in (BUILT, UPLOADED)
+        }
+
+    def save(self, report_path: Path) -> None:
+        """Write the report as JSON.
+
+        Args:
+            report_path: Report file path.
+        """
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as fp:
+            json.dump(asdict(self), fp, indent=2)
+
+    @classmethod
+    def load(cls, report_path: Path) -> "RunReport":
+        """Read a report written by `save`.
+
+        Args:
+            report_path: Report file path.
+
+        Returns:
+            Run report.
+        """
+        with open(report_path, "r", encoding="utf-8") as fp:
+            data = json.load(fp)
+
+        return cls(
+            shard=data.get("shard"),
+            plugins=[PluginReport(**plugin) for plugin in data.get("plugins", [])],
+        )
+
+    @classmethod
+    def merge(cls, reports: List["RunReport"]) -> "RunReport":
+        """Combine the reports of several shards into one.
+
+        Args:
+            reports: Run reports.
+
+        Returns:
+            Run report with the plug-ins of all reports, sorted by plug-in name.
+        """
+        plugins = [plugin for report in reports for plugin in report.plugins]
+        return cls(plugins=sorted(plugins, key=lambda plugin: plugin.plugin_name))
@@ -0,0 +1,328 @@
+"""Factoring the dependencies many plug-ins share into one runtime package of wheels."""
+
+import hashlib
+import re
+import zipfile
+from dataclasses import dataclass, field
+from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import tomli
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.version import InvalidVersion, Version
+
+from ni_measurement_plugin_packager._constants import PyProjectToml, StatusMessages
+
+DEFAULT_RUNTIME_PACKAGE_NAME = "ni-measurement-plugin-runtime"
+DEFAULT_RUNTIME_VERSION = "1.0.0"
+DEFAULT_MIN_PLUGINS = 2
+# Hex digits of the requirements hash in the runtime package version.
+_VERSION_HASH_LENGTH = 12
+RUNTIME_DESCRIPTION = "Python packages shared by measurement plug-ins"
+
+# '<name>-<version>(-<build>)?-<python>-<abi>-<platform>.whl', see PEP 427.
+_WHEEL_FILE_REGEX = re.compile(
+    r"(?P<name>[^-]+)-(?P<version>[^-]+)(-\d[^-]*)?-[^-]+-[^-]+-[^-]+\.whl", re.IGNORECASE
+)
+_CONSTRAINT_REGEX = re.compile(r"(\^|~=|~|===|==|!=|>=|<=|>|<)?\s*([0-9][0-9A-Za-z.*+!_-]*)")
+# Environment markers of the plug-ins' Windows stations that differ from the build system. The
+# Python version markers are evaluated for the Python version of the packager.
+_TARGET_ENVIRONMENT = {
+    "os_name": "nt",
+    "platform_system": "Windows",
+    "sys_platform": "win32",
+    "extra": "",
+}
+
+
+@dataclass(frozen=True)
+class RuntimeOptions:
+    """Options for building the shared runtime package."""
+
+    wheel_directory: Path
+    package_name: str = DEFAULT_RUNTIME_PACKAGE_NAME
+    version: str = DEFAULT_RUNTIME_VERSION
+    min_plugins: int = DEFAULT_MIN_PLUGINS
+
+
+@dataclass
+class SharedRuntime:
+    """Dependencies shared by several plug-ins and the wheels that provide them."""
+
+    # Pinned version of each shared dependency and of the dependencies they require.
+    versions: Dict[str, str] = field(default_factory=dict)
+    wheel_paths: List[Path] = field(default_factory=list)
+    # Shared dependencies of each plug-in, by plug-in directory name.
+    plugin_dependencies: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def requirements(self) -> List[str]:
+        """Pinned requirements of the runtime, sorted by name."""
+        return [f"{name}=={version}" for name, version in sorted(self.versions.items())]
+
+    def get_version(self, base_version: str) -> str:
+        """Version of the runtime package, from a base version and the pinned requirements.
+
+        A hash of the requirements is appended, so runtimes with different contents never
+        share a version.
+
+        Args:
+            base_version: Version to append the hash to, e.g. '1.0.0'.
+
+        Returns:
+            Runtime package version, e.g. '1.0.0+3f2a9c41b0de'.
+        """
+        requirements_hash = hashlib.sha256("\n".join(self.requirements).encode("utf-8"))
+        return f"{base_version}+{requirements_hash.hexdigest()[:_VERSION_HASH_LENGTH]}"
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a Python distribution name, as pip compares them (PEP 503)."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _parse_version(version: str) -> Optional[Version]:
+    # Version of a final or post-release, or None for pre-releases and unparsable versions.
+    try:
+        parsed_version = Version(version)
+    except InvalidVersion:
+        return None
+    return None if parsed_version.is_prerelease else parsed_version
+
+
+def _get_upper_bound(release: Tuple[int, ...], kept_parts: int) -> str:
+    # Next release after `release` that changes one of its first `kept_parts` parts.
+    kept_parts = max(1, min(kept_parts, len(release)))
+    upper_bound = release[: kept_parts - 1] + (release[kept_parts - 1] + 1,)
+    return ".".join(str(part) for part in upper_bound)
+
+
+def _to_specifiers(operator: str, constraint_version: str) -> List[str]:
+    # PEP 440 specifiers of a Poetry constraint clause, translating `^` and `~`.
+    if operator not in ("^", "~"):
+        return [f"{operator or '=='}{constraint_version}"]
+
+    release = Version(constraint_version).release
+    if operator == "^":
+        # ^1.2.3 allows updates that keep the first non-zero part.
+        kept_parts = 1 + next(
+            (index for index, part in enumerate(release) if part), len(release) - 1
+        )
+    else:
+        kept_parts = 2
+    return [f">={constraint_version}", f"<{_get_upper_bound(release, kept_parts)}"]
+
+
+def satisfies(version: str, constraint: str) -> bool:
+    """Check whether a version satisfies a Poetry or PEP 440 version constraint.
+
+    Supports `*`, exact versions, comparisons, `^`, `~`, `~=` and `.*` wildcards, with `,` or
+    spaces joining clauses that must all match and `||` joining alternatives. Pre-releases
+    never match.
+
+    Args:
+        version: Version to check.
+        constraint: Version constraint, e.g. '^1.2' or '>=1.49,<2'.
+
+    Returns:
+        True if the version satisfies the constraint.
+    """
+    parsed_version = _parse_version(version)
+    if parsed_version is None:
+        return False
+
+    for alternative in re.split(r"\|\|?", constraint):
+        alternative = alternative.strip()
+        if alternative in ("", "*"):
+            return True
+        clauses = _CONSTRAINT_REGEX.findall(alternative)
+        try:
+            specifier_set = SpecifierSet(
+                ",".join(
+                    specifier
+                    for operator, clause_version in clauses
+                    for specifier in _to_specifiers(operator, clause_version)
+                )
+            )
+        except (InvalidSpecifier, InvalidVersion):
+            continue
+        if clauses and specifier_set.contains(parsed_version):
+            return True
+    return False
+
+
+def get_version_constraints(plugin_path: Path) -> Dict[str, str]:
+    """Version constraints of the Poetry dependencies of a plug-in that can come from wheels.
+
+    Python, path, git and URL dependencies, and dependencies with several constraints for
+    different markers, are left out.
+
+    Args:
+        plugin_path: Measurement plug-in path.
+
+    Returns:
+        Version constraint by normalized distribution name.
+    """
+    with open(Path(plugin_path) / PyProjectToml.FILE_NAME, "rb") as fp:
+        pyproject_data = tomli.load(fp)
+    dependencies: Dict[str, Any] = (
+        pyproject_data.get(PyProjectToml.TOOL, {})
+        .get(PyProjectToml.POETRY, {})
+        .get(PyProjectToml.DEPENDENCIES, {})
+    )
+
+    constraints = {}
+    for name, dependency in dependencies.items():
+        if name.lower() == "python":
+            continue
+        if isinstance(dependency, dict):
+            dependency = dependency.get(PyProjectToml.VERSION)
+        if isinstance(dependency, str):
+            constraints[normalize_name(name)] = dependency
+    return constraints
+
+
+def _find_wheels(wheel_directory: Path) -> Dict[str, Dict[str, List[Path]]]:
+    # Wheel paths by normalized name and version. A version has one wheel per platform.
+    wheels: Dict[str, Dict[str, List[Path]]] = {}
+    for wheel_path in sorted(Path(wheel_directory).glob("*.whl")):
+        match = _WHEEL_FILE_REGEX.fullmatch(wheel_path.name)
+        if match and _parse_version(match.group("version")):
+            wheels.setdefault(normalize_name(match.group("name")), {}).setdefault(
+                match.group("version"), []
+            ).append(wheel_path)
+    return wheels
+
+
+def _get_newest_version(versions: Sequence[str]) -> Optional[str]:
+    return max(versions, key=lambda version: _parse_version(version) or Version("0"), default=None)
+
+
+def _get_requirements(wheel_path: Path) -> List[Tuple[str, str]]:
+    # Required distributions and version constraints from the wheel METADATA, leaving out the
+    # requirements of extras and those whose markers do not hold on the target stations.
+    with zipfile.ZipFile(wheel_path) as wheel:
+        metadata_name = next(
+            (
+                name
+                for name in wheel.namelist()
+                if name.endswith(".dist-info/METADATA") and name.count("/") == 1
+            ),
+            None,
+        )
+        if not metadata_name:
+            return []
+        metadata = wheel.read(metadata_name).decode("utf-8", errors="replace")
+
+    requirements = []
+    for line in metadata.split("\n\n", 1)[0].splitlines():
+        if not line.startswith("Requires-Dist:"):
+            continue
+        try:
+            requirement = Requirement(line[len("Requires-Dist:") :].strip())
+        except InvalidRequirement:
+            continue
+        if requirement.marker and not requirement.marker.evaluate(_TARGET_ENVIRONMENT):
+            continue
+        requirements.append((normalize_name(requirement.name), str(requirement.specifier)))
+    return requirements
+
+
+def _add_required_wheels(
+    logger: Logger,
+    shared_runtime: SharedRuntime,
+    wheels: Dict[str, Dict[str, List[Path]]],
+) -> None:
+    # Pin the dependencies the shared wheels require, breadth first.
+    pending = list(shared_runtime.versions.items())
+    missing: Set[str] = set()
+    while pending:
+        name, version = pending.pop(0)
+        for wheel_path in wheels[name][version]:
+            for required_name, constraint in _get_requirements(wheel_path):
+                if required_name in shared_runtime.versions:
+                    continue
+                required_version = _get_newest_version(
+                    [
+                        wheel_version
+                        for wheel_version in wheels.get(required_name, {})
+                        if satisfies(wheel_version, constraint or "*")
+                    ]
+                )
+                if required_version is None:
+                    missing.add(f"{required_name} {constraint}".strip())
+                    continue
+                shared_runtime.versions[required_name] = required_version
+                pending.append((required_name, required_version))
+
+    if missing:
+        logger.warning(
+            StatusMessages.RUNTIME_WHEELS_MISSING.format(requirements=", ".join(sorted(missing)))
+        )
+
+
+def find_shared_runtime(
+    logger: Logger,
+    plugin_paths: Sequence[Path],
+    wheel_directory: Path,
+    min_plugins: int = DEFAULT_MIN_PLUGINS,
+) -> SharedRuntime:
+    """Find the dependencies to factor out of the plug-ins into a shared runtime package.
+
+    A dependency is shared when at least `min_plugins` plug-ins declare it and one wheel
+    version in the wheel directory satisfies all of their constraints. The version that
+    satisfies the most plug-ins is chosen, and the newest of those on a tie. Plug-ins whose
+    constraint it does not satisfy keep their own copy. The dependencies the chosen wheels
+    require are added from the wheel directory as well.
+
+    Args:
+        logger: Logger object.
+        plugin_paths: Measurement plug-in paths.
+        wheel_directory: Directory with the wheels to build the runtime from.
+        min_plugins: Lowest number of plug-ins a dependency must be shared by.
+
+    Returns:
+        Shared dependencies, their wheels and the plug-ins that use them.
+    """
+    wheels = _find_wheels(wheel_directory)
+    constraints_by_name: Dict[str, Dict[str, str]] = {}
+    for plugin_path in plugin_paths:
+        for name, constraint in get_version_constraints(plugin_path).items():
+            constraints_by_name.setdefault(name, {})[Path(plugin_path).name] = constraint
+
+    shared_runtime = SharedRuntime()
+    for name, plugin_constraints in sorted(constraints_by_name.items()):
+        if len(plugin_constraints) < min_plugins or name not in wheels:
+            continue
+
+        best: Optional[Tuple[int, Version, str, List[str]]] = None
+        for version in wheels[name]:
+            plugin_names = [
+                plugin_name
+                for plugin_name, constraint in plugin_constraints.items()
+                if satisfies(version, constraint)
+            ]
+            candidate = (
+                len(plugin_names),
+                _parse_version(version) or Version("0"),
+                version,
+                plugin_names,
+            )
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+        if best is None or best[0] < min_plugins:
+            continue
+
+        shared_runtime.versions[name] = best[2]
+        for plugin_name in best[3]:
+            shared_runtime.plugin_dependencies.setdefault(plugin_name, []).append(name)
+
+    _add_required_wheels(logger, shared_runtime, wheels)
+    shared_runtime.wheel_paths = [
+        wheel_path
+        for name, version in sorted(shared_runtime.versions.items())
+        for wheel_path in wheels[name][version]
+    ]
+    return shared_runtime
@@ -0,0 +1,414 @@
+"""Reusable session for building and publishing measurement plug-in packages from Python."""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from logging import Logger
+from pathlib import Path
+from types import TracebackType
+from typing import Dict, List, Optional, Tuple, Type
+
+from nisystemlink_feeds_manager.clients.feeds.models import UploadPackageResponse
+from nisystemlink_feeds_manager.main import PublishPackagesToSystemLink
+
+from ni_measurement_plugin_packager._constants import (
+    RAM_STAGING_LIMIT_IN_BYTES,
+    StatusMessages,
+)
+from ni_measurement_plugin_packager._support._adaptive_concurrency import (
+    AdaptiveLimiter,
+    WorkerLimits,
+)
+from ni_measurement_plugin_packager._support._artifact_index import (
+    ArtifactIndex,
+    get_file_sha256,
+)
+from ni_measurement_plugin_packager._support._create_files import (
+    _get_system_type,
+    get_payload_size,
+)
+from ni_measurement_plugin_packager._support._helpers import (
+    _get_valid_plugin_directories,
+    _validate_selected_plugins,
+    build_package,
+    initialize_systemlink_client,
+    upload_to_systemlink_feed,
+)
+from ni_measurement_plugin_packager._support._local_feed import LocalFeed
+from ni_measurement_plugin_packager._support._metrics import (
+    record_cache_lookup,
+    record_failure,
+)
+from ni_measurement_plugin_packager._support._package_info import (
+    BuildOptions,
+    PackageInfo,
+)
+from ni_measurement_plugin_packager._support._payload_profiles import FULL_PROFILE
+from ni_measurement_plugin_packager._support._pyproject_toml_info import (
+    get_plugin_package_info,
+)
+
+
+@dataclass
+class BuildResult:
+    """Outcome of building a measurement plug-in package."""
+
+    plugin_path: Path
+    package_path: Optional[Path] = None
+    package_info: Optional[PackageInfo] = None
+    size: int = 0
+    sha256: Optional[str] = None
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class UploadResult:
+    """Outcome of publishing a package to a SystemLink feed."""
+
+    package_path: Path
+    feed_name: str
+    file_name: str
+    response: UploadPackageResponse
+    duration: float = 0.0
+
+
+class PackagingSession:
+    """Build and publish measurement plug-in packages, keeping clients and caches alive.
+
+    Example:
+        with PackagingSession(output_directory=Path("out")) as session:
+            result = session.build(Path("sample_measurement"))
+            session.upload(result.package_path, api_url, api_key, workspace, feed_name)
+    """
+
+    def __init__(
+        self,
+        output_directory: Path,
+        staging_directory: Optional[Path] = None,
+        logger: Optional[Logger] = None,
+        max_workers: int = 1,
+        ram_staging_limit: int = RAM_STAGING_LIMIT_IN_BYTES,
+        payload_profile: str = FULL_PROFILE,
+        min_workers: Optional[int] = None,
+        ram_staging_directory: Optional[Path] = None,
+    ) -> None:
+        """Create a packaging session.
+
+        Args:
+            output_directory: Directory the built packages are written to.
+            staging_directory: Directory the template files are staged in. Defaults to
+                `output_directory`.
+            logger: Logger object. Defaults to the `ni_measurement_plugin_packager` logger.
+            max_workers: Number of plug-ins `build_many` builds at the same time.
+            ram_staging_limit: Largest size in bytes that one build stages in
+                `ram_staging_directory`. 0 disables RAM staging.
+            payload_profile: Payload profile whose rules leave non-runtime files out of the
+                packages.
+            min_workers: Lowest number of concurrent builds. When set, `build_many` tunes the
+                number of concurrent builds between it and `max_workers`.
+            ram_staging_directory: Directory on a RAM disk to stage small plug-ins in. None
+                stages every plug-in in `staging_directory`.
+        """
+        self.output_directory = Path(output_directory)
+        self.staging_directory = Path(staging_directory or output_directory)
+        self.build_options = BuildOptions(
+            output_directory=self.output_directory,
+            staging_directory=self.staging_directory,
+            ram_staging_directory=ram_staging_directory,
+            ram_staging_limit=ram_staging_limit,
+            payload_profile=payload_profile,
+        )
+        self.logger = logger or logging.getLogger("ni_measurement_plugin_packager")
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._build_limiter: Optional[AdaptiveLimiter] = WorkerLimits(
+            max_workers, min_workers
+        ).create_limiter("build", self.logger)
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str, str], PublishPackagesToSystemLink] = {}
+        self._client_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._discovery_cache: Dict[Path, Tuple[Tuple[Tuple[str, int], ...], List[Path]]] = {}
+        self._hash_cache: Dict[Path, Tuple[int, int, str]] = {}
+
+    def __enter__(self) -> "PackagingSession":
+        """Return the session, which is closed when the block exits."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the session."""
+        self.close()
+
+    def close(self) -> None:
+        """Release the worker pool and the SystemLink clients."""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            self._clients.clear()
+
+    def discover(self, base_input_dir: Path, selected_plugins: str = ".") -> List[Path]:
+        """Resolve the plug-ins selected from a base directory, reusing earlier discovery.
+
+        Args:
+            base_input_dir: Base directory with measurement plug-ins.
+            selected_plugins: Comma-separated plug-in directory names, or '.' for all.
+
+        Returns:
+            Measurement plug-in paths.
+
+        Raises:
+            FileNotFoundError: If no valid plugins are found in the directory.
+        """
+        base_input_dir = Path(base_input_dir).resolve()
+        snapshot = tuple(
+            sorted((item.name, item.stat().st_mtime_ns) for item in base_input_dir.iterdir())
+        )
+        with self._lock:
+            cached = self._discovery_cache.get(base_input_dir)
+        record_cache_lookup("discovery", hit=bool(cached and cached[0] == snapshot))
+        if cached and cached[0] == snapshot:
+            measurement_plugins = cached[1]
+        else:
+            measurement_plugins = _get_valid_plugin_directories(base_input_dir, self.logger)
+            with self._lock:
+                self._discovery_cache[base_input_dir] = (snapshot, measurement_plugins)
+
+        if not measurement_plugins:
+            raise FileNotFoundError(
+                StatusMessages.INVALID_ROOT_DIRECTORY.format(dir=base_input_dir)
+            )
+
+        if selected_plugins == ".":
+            return list(measurement_plugins)
+
+        _validate_selected_plugins(
+            selected_plugins=selected_plugins,
+            measurement_plugins=measurement_plugins,
+            logger=self.logger,
+        )
+        return [
+            base_input_dir / plugin.strip("'\"").strip() for plugin in selected_plugins.split(",")
+        ]
+
+    def build(self, plugin_path: Path) -> BuildResult:
+        """Build the package of a measurement plug-in.
+
+        Args:
+            plugin_path: Measurement plug-in path.
+
+        Returns:
+            Built package details.
+
+        Raises:
+            ValueError: If the plug-in directory is not a valid measurement plug-in.
+        """
+        plugin_path = Path(plugin_path).resolve()
+        start_time = time.perf_counter()
+
+        package_path = build_package(
+            logger=self.logger,
+            plugin_path=plugin_path,
+            build_options=self.build_options,
+        )
+        if not package_path:
+            raise ValueError(StatusMessages.INVALID_PLUGIN)
+
+        package_info = get_plugin_package_info(plugin_path, self.logger)
+        artifact = ArtifactIndex(self.output_directory).get_entry(
+            package_info.package_name.lower(),
+            package_info.version,
+            (self.build_options.architectures or (_get_system_type(),))[0],
+        )
+        return BuildResult(
+            plugin_path=plugin_path,
+            package_path=package_path,
+            package_info=package_info,
+            size=artifact.size if artifact else package_path.stat().st_size,
+            sha256=artifact.sha256 if artifact else self.hash_package(package_path),
+            duration=time.perf_counter() - start_time,
+        )
+
+    def build_many(self, plugin_paths: List[Path]) -> List[BuildResult]:
+        """Build the packages of several plug-ins on the session's worker pool.
+
+        The largest plug-ins are started first, so that no long build starts last.
+
+        Args:
+            plugin_paths: Measurement plug-in paths.
+
+        Returns:
+            Built package details in the order of `plugin_paths`. Failed builds have `error` set.
+        """
+        with self._lock:
+            if not self._executor:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="packager-session"
+                )
+            executor = self._executor
+
+        futures = {
+            index: executor.submit(self._try_limited_build, plugin_paths[index])
+            for index in sorted(
+                range(len(plugin_paths)),
+                key=lambda index: self._get_payload_size(plugin_paths[index]),
+                reverse=True,
+            )
+        }
+        return [futures[index].result() for index in range(len(plugin_paths))]
+
+    def upload(
+        self,
+        package_path: Path,
+        api_url: str,
+        api_key: str,
+        workspace: str,
+        feed_name: str,
+        overwrite: bool = False,
+    ) -> UploadResult:
+        """Publish a package to a SystemLink feed, reusing the client for the server.
+
+        Args:
+            package_path: Measurement package path.
+            api_url: SystemLink API URL.
+            api_key: SystemLink API key.
+            workspace: SystemLink workspace name.
+            feed_name: Name of the feed to upload to.
+            overwrite: Whether to overwrite existing packages.
+
+        Returns:
+            Uploaded package details.
+        """
+        start_time = time.perf_counter()
+        systemlink_client, client_lock = self.get_client(api_url, api_key, workspace)
+        with client_lock:
+            upload_response = upload_to_systemlink_feed(
+                systemlink_client=systemlink_client,
+                package_path=package_path,
+                feed_name=feed_name,
+                overwrite_packages=overwrite,
+            )
+        self.logger.info(
+            StatusMessages.PACKAGE_UPLOADED.format(
+                package_name=upload_response.file_name,
+                feed_name=feed_name,
+            )
+        )
+
+        return UploadResult(
+            package_path=Path(package_path),
+            feed_name=feed_name,
+            file_name=upload_response.file_name,
+            response=upload_response,
+            duration=time.perf_counter() - start_time,
+        )
+
+    def publish_to_local_feed(self, build_result: BuildResult, feed_directory: Path) -> Path:
+        """Copy a built package into a directory feed and update the feed index.
+
+        Args:
+            build_result: Result of `build`.
+            feed_directory: Feed directory path.
+
+        Returns:
+            Path of the package in the feed.
+
+        Raises:
+            ValueError: If the build failed.
+        """
+        if not build_result.package_path or not build_result.package_info:
+            raise ValueError(build_result.error or StatusMessages.INVALID_PLUGIN)
+
+        feed_package_path = LocalFeed(feed_directory).publish(
+            package_path=build_result.package_path,
+            package_info=build_result.package_info,
+        )
+        self.logger.info(
+            StatusMessages.PACKAGE_ADDED_TO_LOCAL_FEED.format(
+                package_name=feed_package_path.name,
+                feed_directory=feed_directory,
+            )
+        )
+        return feed_package_path
+
+    def get_client(
+        self, api_url: str, api_key: str, workspace: str
+    ) -> Tuple[PublishPackagesToSystemLink, threading.Lock]:
+        """Get the SystemLink client for a server and workspace, creating it on first use.
+
+        Args:
+            api_url: SystemLink API URL.
+            api_key: SystemLink API key.
+            workspace: SystemLink workspace name.
+
+        Returns:
+            Client for publishing packages and the lock that serializes its requests.
+
+        Raises:
+            RuntimeError: If the client could not be created.
+        """
+        key = (api_url, api_key, workspace)
+        with self._lock:
+            systemlink_client = self._clients.get(key)
+            if systemlink_client:
+                return systemlink_client, self._client_locks.setdefault(key, threading.Lock())
+
+        # Creating a client talks to the server, so the session lock is not held meanwhile.
+        new_client = initialize_systemlink_client(
+            api_key=api_key,
+            api_url=api_url,
+            workspace=workspace,
+            logger=self.logger,
+        )
+        if not new_client:
+            raise RuntimeError(StatusMessages.CLIENT_CREATION_FAILED)
+
+        # If another thread created a client for the same key first, use that one.
+        with self._lock:
+            systemlink_client = self._clients.setdefault(key, new_client)
+            return systemlink_client, self._client_locks.setdefault(key, threading.Lock())
+
+    def hash_package(self, package_path: Path) -> str:
+        """SHA-256 of a package, cached until the file changes."""
+        stat = package_path.stat()
+        with self._lock:
+            cached = self._hash_cache.get(package_path)
+        cache_hit = bool(cached and cached[:2] == (stat.st_size, stat.st_mtime_ns))
+        record_cache_lookup("package_hash", hit=cache_hit)
+        if cached and cache_hit:
+            return cached[2]
+
+        digest = get_file_sha256(package_path)
+        with self._lock:
+            self._hash_cache[package_path] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+    def _try_build(self, plugin_path: Path) -> BuildResult:
+        try:
+            return self.build(plugin_path)
+        except Exception as ex:
+            record_failure(ex)
+            self.logger.debug(ex, exc_info=True)
+            return BuildResult(plugin_path=Path(plugin_path), error=str(ex))
+
+    def _try_limited_build(self, plugin_path: Path) -> BuildResult:
+        if not self._build_limiter:
+            return self._try_build(plugin_path)
+
+        with self._build_limiter.slot():
+            build_result = self._try_build(plugin_path)
+        self._build_limiter.record(build_result.size)
+        return build_result
+
+    def _get_payload_size(self, plugin_path: Path) -> int:
+        try:
+            return get_payload_size(Path(plugin_path), self.build_options.payload_profile)
+        except OSError:
+            return 0
@@ -0,0 +1,88 @@
+"""Deterministic partitioning of the plug-ins of a batch run across CI nodes."""
+
+import hashlib
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_DEFAULT_COST = 1.0
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard specification of the form 'INDEX/COUNT'.
+
+    Args:
+        value: Shard specification, with INDEX between 1 and COUNT.
+
+    Returns:
+        Shard index and shard count.
+
+    Raises:
+        ValueError: If the value is not a valid shard specification.
+    """
+    index_text, separator, count_text = value.partition("/")
+    if not separator or not index_text.strip().isdigit() or not count_text.strip().isdigit():
+        raise ValueError(value)
+
+    shard_index, shard_count = int(index_text), int(count_text)
+    if not 1 <= shard_index <= shard_count:
+        raise ValueError(value)
+
+    return shard_index, shard_count
+
+
+def _get_name_shard(plugin_name: str, shard_count: int) -> int:
+    digest = hashlib.sha256(plugin_name.encode("utf-8")).hexdigest()
+    return int(digest, 16) % shard_count + 1
+
+
+def _get_cost_shards(plugin_costs: Dict[str, float], shard_count: int) -> Dict[str, int]:
+    # Longest processing time first: the most expensive plug-in goes to the least loaded shard.
+    shard_loads = [0.0] * shard_count
+    shards = {}
+    for plugin_name, cost in sorted(plugin_costs.items(), key=lambda item: (-item[1], item[0])):
+        shard = min(range(shard_count), key=lambda index: (shard_loads[index], index))
+        shard_loads[shard] += cost
+        shards[plugin_name] = shard + 1
+
+    return shards
+
+
+def select_shard_plugins(
+    measurement_plugins: List[str],
+    shard_index: int,
+    shard_count: int,
+    historical_costs: Optional[Dict[str, float]] = None,
+) -> List[str]:
+    """Select the plug-ins that belong to a shard.
+
+    Every node that passes the same plug-ins, shard count and costs gets the same partition,
+    whatever order the plug-ins were discovered in.
+
+    Args:
+        measurement_plugins: Plug-in directory names or paths.
+        shard_index: Shard of this node, from 1 to `shard_count`.
+        shard_count: Number of shards.
+        historical_costs: Build duration of each plug-in in an earlier run. When given, shards
+            are balanced by cost instead of assigned by name hash. Plug-ins without a cost
+            are assumed to take the median cost.
+
+    Returns:
+        Plug-ins of the shard, in their original order.
+    """
+    plugin_names = [Path(plugin).name for plugin in measurement_plugins]
+    if historical_costs is None:
+        shards = {name: _get_name_shard(name, shard_count) for name in plugin_names}
+    else:
+        known_costs = [historical_costs[name] for name in plugin_names if name in historical_costs]
+        default_cost = statistics.median(known_costs) if known_costs else _DEFAULT_COST
+        shards = _get_cost_shards(
+            {name: historical_costs.get(name, default_cost) for name in plugin_names},
+            shard_count,
+        )
+
+    return [
+        plugin
+        for plugin, name in zip(measurement_plugins, plugin_names)
+        if shards[name] == shard_index
+    ]
@@ -0,0 +1,170 @@
+"""Checking measurement plug-ins before a run stages, packs or uploads any of them."""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import tomli
+
+from ni_measurement_plugin_packager._constants import (
+    FileNames,
+    PyProjectToml,
+    StatusMessages,
+)
+from ni_measurement_plugin_packager._support._pyproject_toml_info import (
+    UNDERSCORE_SPACE_REGEX,
+)
+
+# nipkg versions start with a digit and use letters, digits and '.+~-' only.
+_VERSION_REGEX = r"[0-9][0-9A-Za-z.+~-]*"
+_MAX_VALIDATION_WORKERS = 8
+_REQUIRED_FILES = (PyProjectToml.FILE_NAME, FileNames.MEASUREMENT_FILE, FileNames.BATCH_FILE)
+_REQUIRED_KEYS = (
+    PyProjectToml.NAME,
+    PyProjectToml.VERSION,
+    PyProjectToml.DESCRIPTION,
+    PyProjectToml.AUTHOR,
+)
+
+
+@dataclass
+class PluginValidation:
+    """Problems found in a measurement plug-in."""
+
+    plugin_path: Path
+    package_name: Optional[str] = None
+    problems: List[str] = field(default_factory=list)
+
+
+def _check_poetry_section(validation: PluginValidation, poetry_section: Dict[str, Any]) -> None:
+    for key in _REQUIRED_KEYS:
+        if key not in poetry_section:
+            validation.problems.append(StatusMessages.VALIDATION_MISSING_KEY.format(key=key))
+
+    version = poetry_section.get(PyProjectToml.VERSION)
+    if version and not (isinstance(version, str) and re.fullmatch(_VERSION_REGEX, version)):
+        validation.problems.append(
+            StatusMessages.VALIDATION_INVALID_VERSION.format(version=version)
+        )
+
+    authors = poetry_section.get(PyProjectToml.AUTHOR)
+    if authors and not (
+        isinstance(authors, list) and all(isinstance(author, str) for author in authors)
+    ):
+        validation.problems.append(StatusMessages.VALIDATION_INVALID_AUTHORS)
+
+    package_name = poetry_section.get(PyProjectToml.NAME)
+    if isinstance(package_name, str):
+        # The package name is derived the same way when the package is built.
+        validation.package_name = re.sub(
+            UNDERSCORE_SPACE_REGEX, "-", package_name.lower() or validation.plugin_path.name
+        ).lower()
+    elif package_name is not None:
+        validation.problems.append(StatusMessages.VALIDATION_INVALID_NAME)
+
+
+def _validate_plugin(plugin_path: Path) -> PluginValidation:
+    validation = PluginValidation(plugin_path=plugin_path)
+    for file_name in _REQUIRED_FILES:
+        if not (plugin_path / file_name).is_file():
+            validation.problems.append(
+                StatusMessages.VALIDATION_MISSING_FILE.format(file=file_name)
+            )
+
+    pyproject_path = plugin_path / PyProjectToml.FILE_NAME
+    if not pyproject_path.is_file():
+        return validation
+
+    try:
+        with open(pyproject_path, "rb") as fp:
+            pyproject_data = tomli.load(fp)
+    except (OSError, tomli.TOMLDecodeError) as ex:
+        validation.problems.append(
+            StatusMessages.VALIDATION_INVALID_TOML.format(file=PyProjectToml.FILE_NAME, error=ex)
+        )
+        return validation
+
+    tool_section = pyproject_data.get(PyProjectToml.TOOL)
+    poetry_section = (
+        tool_section.get(PyProjectToml.POETRY) if isinstance(tool_section, dict) else None
+    )
+    if not isinstance(poetry_section, dict):
+        validation.problems.append(StatusMessages.VALIDATION_MISSING_POETRY_SECTION)
+        return validation
+
+    _check_poetry_section(validation, poetry_section)
+    return validation
+
+
+def _check_package_name_collisions(validations: List[PluginValidation]) -> None:
+    plugins_by_package_name: Dict[str, List[PluginValidation]] = {}
+    for validation in validations:
+        if validation.package_name:
+            plugins_by_package_name.setdefault(validation.package_name, []).append(validation)
+
+    for package_name, colliding_validations in plugins_by_package_name.items():
+        if len(colliding_validations) < 2:
+            continue
+        for validation in colliding_validations:
+            other_plugins = ", ".join(
+                f"'{other.plugin_path.name}'"
+                for other in colliding_validations
+                if other is not validation
+            )
+            validation.problems.append(
+                StatusMessages.VALIDATION_DUPLICATE_PACKAGE.format(
+                    package_name=package_name, plugins=other_plugins
+                )
+            )
+
+
+def validate_plugins(logger: Logger, plugin_paths: Sequence[Path]) -> List[PluginValidation]:
+    """Check measurement plug-ins in parallel and report all problems at once.
+
+    Each plug-in is checked for its required files, a `pyproject.toml` that parses and has
+    the keys the package is built from, and a valid version. Package names are compared
+    after the same normalization the build uses, so two plug-ins cannot build the same
+    package.
+
+    Args:
+        logger: Logger object.
+        plugin_paths: Measurement plug-in paths.
+
+    Returns:
+        Validation of each plug-in, in the order of `plugin_paths`.
+
+    Raises:
+        ValueError: If any plug-in has a problem. All problems are logged first.
+    """
+    plugin_paths = [Path(plugin_path) for plugin_path in plugin_paths]
+    if not plugin_paths:
+        return []
+
+    with ThreadPoolExecutor(
+        max_workers=min(_MAX_VALIDATION_WORKERS, len(plugin_paths)),
+        thread_name_prefix="packager-validation",
+    ) as executor:
+        validations = list(executor.map(_validate_plugin, plugin_paths))
+    _check_package_name_collisions(validations)
+
+    invalid_validations = [validation for validation in validations if validation.problems]
+    for validation in invalid_validations:
+        for problem in validation.problems:
+            logger.error(
+                StatusMessages.VALIDATION_PROBLEM.format(
+                    name=validation.plugin_path.name, problem=problem
+                )
+            )
+    if invalid_validations:
+        raise ValueError(
+            StatusMessages.VALIDATION_FAILED.format(
+                count=sum(len(validation.problems) for validation in invalid_validations),
+                plugins=len(invalid_validations),
+            )
+        )
+
+    logger.info(StatusMessages.VALIDATION_PASSED.format(count=len(validations)))
+    return validations
@@ -0,0 +1,62 @@
+"""Tests for tuning the concurrency limit of a stage by its throughput."""
+
+import logging
+from typing import Iterator, List
+from unittest import mock
+
+import pytest
+
+from ni_measurement_plugin_packager._support import _adaptive_concurrency
+from ni_measurement_plugin_packager._support._adaptive_concurrency import AdaptiveLimiter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def perf_counter(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Iterator[_Clock]:
+    clock = _Clock()
+    with mock.patch.object(_adaptive_concurrency, "time", clock), mock.patch.object(
+        _adaptive_concurrency, "_is_cpu_saturated", return_value=False
+    ):
+        yield clock
+
+
+def _run_windows(limiter: AdaptiveLimiter, clock: _Clock, window_count: int) -> List[int]:
+    limits = []
+    for _ in range(window_count):
+        for _ in range(limiter.limit):
+            # Each task takes a second whatever the limit, so raising it never gains throughput.
+            clock.now += 1
+            limiter.record(1)
+        limits.append(limiter.limit)
+    return limits
+
+
+def test___raises_without_gain___record___holds_limit_for_doubling_windows(
+    clock: _Clock,
+) -> None:
+    limiter = AdaptiveLimiter("pack", 1, 4, logging.getLogger(__name__))
+
+    limits = _run_windows(limiter, clock, 12)
+
+    assert limits == [2, 1, 1, 2, 1, 1, 1, 2, 1, 1, 1, 1]
+
+
+def test___raise_with_gain___record___keeps_probing(clock: _Clock) -> None:
+    limiter = AdaptiveLimiter("pack", 1, 4, logging.getLogger(__name__))
+    limits = []
+
+    for _ in range(4):
+        # Tasks run in parallel, so a window takes a second whatever the limit.
+        clock.now += 1
+        for _ in range(limiter.limit):
+            limiter.record(1)
+        limits.append(limiter.limit)
+
+    assert limits == [2, 3, 4, 4]
@@ -0,0 +1,88 @@
+"""Tests for the artifact index of the packages directory and its retention policy."""
+
+import json
+from pathlib import Path
+from typing import List
+
+from ni_measurement_plugin_packager._support._artifact_index import (
+    ARTIFACT_INDEX_FILE_NAME,
+    ArtifactIndex,
+)
+
+
+def _build(
+    artifact_index: ArtifactIndex, version: str, architectures: List[str], built_at: float
+) -> None:
+    for architecture in architectures:
+        package_path = artifact_index.package_directory / f"plugin_{version}_{architecture}.nipkg"
+        package_path.write_bytes(version.encode())
+        artifact_index.record("plugin", version, architecture, "plugin", package_path)
+        # Record the build time the retention policy orders versions by.
+        index_data = json.loads(artifact_index.index_path.read_text(encoding="utf-8"))
+        index_data["packages"]["plugin"][version][architecture]["built_at"] = built_at
+        artifact_index.index_path.write_text(json.dumps(index_data), encoding="utf-8")
+
+
+def test___architectures_in_any_order___record___indexes_each_architecture(
+    tmp_path: Path,
+) -> None:
+    artifact_index = ArtifactIndex(tmp_path)
+
+    _build(artifact_index, "1.0.0", ["windows_x64", "windows_x86"], built_at=1)
+    _build(artifact_index, "1.0.0", ["windows_x86", "windows_x64"], built_at=2)
+
+    for architecture in ["windows_x64", "windows_x86"]:
+        entry = artifact_index.get_entry("plugin", "1.0.0", architecture)
+        assert entry and entry.file_name == f"plugin_1.0.0_{architecture}.nipkg"
+
+
+def test___several_versions___apply_retention___keeps_versions_per_architecture(
+    tmp_path: Path,
+) -> None:
+    artifact_index = ArtifactIndex(tmp_path)
+    _build(artifact_index, "1.0.0", ["windows_x64", "windows_x86"], built_at=1)
+    _build(artifact_index, "1.1.0", ["windows_x86", "windows_x64"], built_at=2)
+    _build(artifact_index, "1.2.0", ["windows_x64"], built_at=3)
+
+    removed_paths = artifact_index.apply_retention(keep_versions=1)
+
+    assert sorted(path.name for path in removed_paths) == [
+        "plugin_1.0.0_windows_x64.nipkg",
+        "plugin_1.0.0_windows_x86.nipkg",
+        "plugin_1.1.0_windows_x64.nipkg",
+    ]
+    assert sorted(path.name for path in tmp_path.glob("*.nipkg")) == [
+        "plugin_1.1.0_windows_x86.nipkg",
+        "plugin_1.2.0_windows_x64.nipkg",
+    ]
+
+
+def test___index_without_architectures___apply_retention___removes_old_packages(
+    tmp_path: Path,
+) -> None:
+    for version, architecture in [("1.0.0", "windows_x64"), ("1.0.0", "windows_x86")]:
+        (tmp_path / f"plugin_{version}_{architecture}.nipkg").write_bytes(b"old")
+    (tmp_path / ARTIFACT_INDEX_FILE_NAME).write_text(
+        json.dumps(
+            {
+                "packages": {
+                    "plugin": {"1.0.0": _old_entry("plugin_1.0.0_windows_x64.nipkg")},
+                    "plugin_windows_x86": {"1.0.0": _old_entry("plugin_1.0.0_windows_x86.nipkg")},
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    artifact_index = ArtifactIndex(tmp_path)
+    _build(artifact_index, "1.1.0", ["windows_x64", "windows_x86"], built_at=2)
+
+    artifact_index.apply_retention(keep_versions=1)
+
+    assert sorted(path.name for path in tmp_path.glob("*.nipkg")) == [
+        "plugin_1.1.0_windows_x64.nipkg",
+        "plugin_1.1.0_windows_x86.nipkg",
+    ]
+
+
+def _old_entry(file_name: str) -> dict:
+    return {"plugin_name": "plugin", "file_name": file_name, "size": 3, "sha256": "", "built_at": 1}
@@ -0,0 +1,139 @@
+"""Tests for uploading packages in batches to a feed server on the loopback interface."""
+
+import http.server
+import threading
+import urllib.request
+from logging import getLogger
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List
+
+import pytest
+
+from ni_measurement_plugin_packager._support._batch_upload import (
+    UploadBatchOptions,
+    upload_in_batches,
+)
+
+_FAILING_PACKAGE = "failing_1.0.0_windows_x64.nipkg"
+
+
+class _FeedServer(http.server.ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _FeedRequestHandler)
+        self.lock = threading.Lock()
+        self.uploads: Dict[str, bytes] = {}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _FeedRequestHandler(http.server.BaseHTTPRequestHandler):
+    server: _FeedServer
+
+    def do_POST(self) -> None:
+        file_name = self.path.rsplit("/", 1)[-1]
+        content = self.rfile.read(int(self.headers["Content-Length"]))
+        if file_name == _FAILING_PACKAGE:
+            self.send_error(500)
+            return
+        with self.server.lock:
+            self.server.uploads[file_name] = content
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def feed_server() -> Iterator[_FeedServer]:
+    server = _FeedServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def _create_packages(directory: Path, names: List[str]) -> List[Path]:
+    package_paths = []
+    for index, name in enumerate(names):
+        package_path = directory / name
+        package_path.write_bytes(bytes([index]) * (1024 + index))
+        package_paths.append(package_path)
+    return package_paths
+
+
+def _create_upload_package_factory(
+    server: _FeedServer, created_by_thread: Dict[int, int]
+) -> Callable[[], Callable[[Path], SimpleNamespace]]:
+    lock = threading.Lock()
+
+    def create_upload_package() -> Callable[[Path], SimpleNamespace]:
+        with lock:
+            thread_id = threading.get_ident()
+            created_by_thread[thread_id] = created_by_thread.get(thread_id, 0) + 1
+
+        def upload_package(package_path: Path) -> SimpleNamespace:
+            request = urllib.request.Request(
+                f"{server.url}/feeds/packages/{package_path.name}",
+                data=package_path.read_bytes(),
+                method="POST",
+            )
+            with urllib.request.urlopen(request, timeout=10):  # nosec: B310
+                return SimpleNamespace(file_name=package_path.name)
+
+        return upload_package
+
+    return create_upload_package
+
+
+def test___packages_in_batches___upload_in_batches___uploads_every_package(
+    tmp_path: Path, feed_server: _FeedServer
+) -> None:
+    names = [f"plugin-{index}_1.0.0_windows_x64.nipkg" for index in range(10)]
+    package_paths = _create_packages(tmp_path, names)
+    created_by_thread: Dict[int, int] = {}
+
+    results = upload_in_batches(
+        logger=getLogger(__name__),
+        create_upload_package=_create_upload_package_factory(feed_server, created_by_thread),
+        package_paths=package_paths,
+        options=UploadBatchOptions(max_packages=4, max_bytes=1024 * 1024, max_workers=3),
+    )
+
+    assert [result.package_path for result in results] == package_paths
+    assert all(result.error is None for result in results)
+    assert [result.file_name for result in results] == names
+    assert feed_server.uploads == {path.name: path.read_bytes() for path in package_paths}
+    # Each upload worker thread creates one uploader and keeps it for all of its uploads.
+    assert 1 <= len(created_by_thread) <= 3
+    assert set(created_by_thread.values()) == {1}
+
+
+def test___failing_upload___upload_in_batches___uploads_the_other_packages(
+    tmp_path: Path, feed_server: _FeedServer
+) -> None:
+    names = [
+        "plugin-0_1.0.0_windows_x64.nipkg",
+        _FAILING_PACKAGE,
+        "plugin-2_1.0.0_windows_x64.nipkg",
+        "plugin-3_1.0.0_windows_x64.nipkg",
+    ]
+    package_paths = _create_packages(tmp_path, names)
+
+    results = upload_in_batches(
+        logger=getLogger(__name__),
+        create_upload_package=_create_upload_package_factory(feed_server, {}),
+        package_paths=package_paths,
+        options=UploadBatchOptions(max_packages=2, max_bytes=1024 * 1024, max_workers=2),
+    )
+
+    assert [result.error is not None for result in results] == [False, True, False, False]
+    assert sorted(feed_server.uploads) == sorted(set(names) - {_FAILING_PACKAGE})
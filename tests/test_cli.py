@@ -0,0 +1,54 @@
+"""Tests for the commands of the command line interface."""
+
+from pathlib import Path
+from typing import List
+
+from click.testing import CliRunner
+
+from ni_measurement_plugin_packager import create_and_upload_package
+from ni_measurement_plugin_packager._support._run_report import (
+    BUILT,
+    FAILED,
+    PluginReport,
+    RunReport,
+)
+
+
+def _write_report(report_path: Path, plugin_names: List[str], status: str) -> None:
+    RunReport(plugins=[PluginReport(name, status) for name in plugin_names]).save(report_path)
+
+
+def test___no_command___invoke___runs_build() -> None:
+    result = CliRunner().invoke(create_and_upload_package, ["--arch", "windows_x64", "--help"])
+
+    assert result.exit_code == 0
+    assert "build [OPTIONS]" in result.output
+
+
+def test___shard_reports___merge_reports___writes_merged_report(tmp_path: Path) -> None:
+    _write_report(tmp_path / "shard-1.json", ["beta", "alpha"], BUILT)
+    _write_report(tmp_path / "shard-2.json", ["gamma"], FAILED)
+    merged_path = tmp_path / "merged.json"
+
+    result = CliRunner().invoke(
+        create_and_upload_package,
+        [
+            "merge-reports",
+            str(tmp_path / "shard-1.json"),
+            str(tmp_path / "shard-2.json"),
+            "--report",
+            str(merged_path),
+        ],
+    )
+
+    assert result.exit_code == 0
+    merged_report = RunReport.load(merged_path)
+    assert [plugin.plugin_name for plugin in merged_report.plugins] == ["alpha", "beta", "gamma"]
+    assert merged_report.get_status_counts() == {BUILT: 2, FAILED: 1}
+
+
+def test___missing_feed_options___list_feed___reports_usage_error() -> None:
+    result = CliRunner().invoke(create_and_upload_package, ["list-feed", "--api-url", "x"])
+
+    assert result.exit_code == 2
+    assert "Missing option" in result.output
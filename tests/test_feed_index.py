@@ -0,0 +1,231 @@
+"""Tests for syncing the local feed index from a feed server on the loopback interface."""
+
+import http.server
+import json
+import sqlite3
+import threading
+import urllib.parse
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import pytest
+
+from ni_measurement_plugin_packager._support._feed_index import FeedIndex
+from ni_measurement_plugin_packager._support._remote_cache import RemoteIdCache
+
+_API_KEY = "test-api-key"
+_WORKSPACE = "workspace"
+_FEED_NAME = "feed"
+
+
+class _FeedServer(http.server.ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _FeedRequestHandler)
+        self.lock = threading.Lock()
+        self.feed_id = "feed-1"
+        self.etag = '"1"'
+        self.packages: List[Dict[str, Any]] = []
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def set_packages(self, etag: str, packages: List[Tuple[str, str, str]]) -> None:
+        with self.lock:
+            self.etag = etag
+            self.packages = [
+                {
+                    "id": f"{name}-{version}",
+                    "fileName": f"{name}_{version}_windows_x64.nipkg",
+                    "metadata": {
+                        "packageName": name,
+                        "version": version,
+                        "architecture": "windows_x64",
+                    },
+                    "updatedAt": updated_at,
+                }
+                for name, version, updated_at in packages
+            ]
+
+    def get_paths(self) -> List[str]:
+        with self.lock:
+            return [path for path, _ in self.requests]
+
+
+class _FeedRequestHandler(http.server.BaseHTTPRequestHandler):
+    server: _FeedServer
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        with self.server.lock:
+            self.server.requests.append((url.path, dict(self.headers)))
+            feed_id, etag, packages = self.server.feed_id, self.server.etag, self.server.packages
+        if self.headers.get("x-ni-api-key") != _API_KEY:
+            self._send_json(401, {})
+        elif url.path == "/niuser/v1/workspaces":
+            self._send_json(200, {"workspaces": [{"id": "workspace-1", "name": query["name"][0]}]})
+        elif url.path == "/nifeed/v1/feeds":
+            self._send_json(200, {"feeds": [{"id": feed_id, "name": _FEED_NAME}]})
+        elif url.path != f"/nifeed/v1/feeds/{feed_id}/packages":
+            self._send_json(404, {})
+        elif self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self._send_json(200, {"packages": packages}, etag)
+
+    def _send_json(self, status: int, body: Dict[str, Any], etag: str = "") -> None:
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def feed_server() -> Iterator[_FeedServer]:
+    server = _FeedServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@pytest.fixture
+def feed_index(tmp_path: Path) -> Iterator[FeedIndex]:
+    remote_cache = RemoteIdCache(tmp_path / "remote-cache.json")
+    with FeedIndex(tmp_path / "feed-index.sqlite3", remote_cache) as index:
+        yield index
+
+
+def _sync(feed_index: FeedIndex, feed_server: _FeedServer) -> int:
+    return feed_index.sync(feed_server.url, _API_KEY, _WORKSPACE, _FEED_NAME)
+
+
+def test___new_feed___sync___indexes_packages(
+    feed_server: _FeedServer, feed_index: FeedIndex
+) -> None:
+    feed_server.set_packages('"1"', [("beta", "1.0.0", "t1"), ("alpha", "1.0.0", "t1")])
+
+    changed_entries = _sync(feed_index, feed_server)
+
+    assert changed_entries == 2
+    assert [
+        (package.package_name, package.version)
+        for package in feed_index.list_packages(feed_server.url, _WORKSPACE, _FEED_NAME)
+    ] == [("alpha", "1.0.0"), ("beta", "1.0.0")]
+    assert feed_index.get_published_versions(feed_server.url, _WORKSPACE, _FEED_NAME) == {
+        ("alpha", "1.0.0", "windows_x64"),
+        ("beta", "1.0.0", "windows_x64"),
+    }
+
+
+def test___unchanged_feed___sync___sends_validator_and_keeps_packages(
+    feed_server: _FeedServer, feed_index: FeedIndex
+) -> None:
+    feed_server.set_packages('"1"', [("alpha", "1.0.0", "t1")])
+    _sync(feed_index, feed_server)
+
+    changed_entries = _sync(feed_index, feed_server)
+
+    path, headers = feed_server.requests[-1]
+    assert changed_entries == 0
+    assert path == "/nifeed/v1/feeds/feed-1/packages"
+    assert headers["If-None-Match"] == '"1"'
+    assert len(feed_index.list_packages(feed_server.url, _WORKSPACE, _FEED_NAME)) == 1
+
+
+def test___changed_feed___sync___writes_only_changed_entries(
+    feed_server: _FeedServer, feed_index: FeedIndex
+) -> None:
+    feed_server.set_packages('"1"', [("alpha", "1.0.0", "t1"), ("beta", "1.0.0", "t1")])
+    _sync(feed_index, feed_server)
+    feed_server.set_packages('"2"', [("alpha", "1.0.0", "t1"), ("alpha", "1.1.0", "t2")])
+
+    changed_entries = _sync(feed_index, feed_server)
+
+    # One package was added and one removed; the unchanged one is not written again.
+    assert changed_entries == 2
+    assert feed_index.get_published_versions(feed_server.url, _WORKSPACE, _FEED_NAME) == {
+        ("alpha", "1.0.0", "windows_x64"),
+        ("alpha", "1.1.0", "windows_x64"),
+    }
+
+
+def test___recreated_feed___sync___resolves_new_feed_id(
+    feed_server: _FeedServer, feed_index: FeedIndex
+) -> None:
+    feed_server.set_packages('"1"', [("alpha", "1.0.0", "t1")])
+    _sync(feed_index, feed_server)
+    feed_server.feed_id = "feed-2"
+    feed_server.set_packages('"1"', [("beta", "1.0.0", "t1")])
+
+    changed_entries = _sync(feed_index, feed_server)
+
+    paths = feed_server.get_paths()
+    assert changed_entries == 1
+    assert "/nifeed/v1/feeds/feed-1/packages" in paths
+    assert paths[-1] == "/nifeed/v1/feeds/feed-2/packages"
+    assert [
+        package.package_name
+        for package in feed_index.list_packages(feed_server.url, _WORKSPACE, _FEED_NAME)
+    ] == ["beta"]
+
+
+def test___cached_feed_id___sync_with_new_index___skips_id_lookups(
+    tmp_path: Path, feed_server: _FeedServer
+) -> None:
+    remote_cache = RemoteIdCache(tmp_path / "remote-cache.json")
+    feed_server.set_packages('"1"', [("alpha", "1.0.0", "t1")])
+    with FeedIndex(tmp_path / "first.sqlite3", remote_cache) as first_index:
+        _sync(first_index, feed_server)
+    request_count = len(feed_server.requests)
+
+    with FeedIndex(tmp_path / "second.sqlite3", remote_cache) as second_index:
+        _sync(second_index, feed_server)
+
+    assert feed_server.get_paths()[request_count:] == ["/nifeed/v1/feeds/feed-1/packages"]
+
+
+def test___index_with_feed_ids___sync___rebuilds_index(
+    tmp_path: Path, feed_server: _FeedServer
+) -> None:
+    database_path = tmp_path / "feed-index.sqlite3"
+    with sqlite3.connect(str(database_path)) as connection:
+        connection.execute("CREATE TABLE feeds (server TEXT, feed_id TEXT NOT NULL)")
+    feed_server.set_packages('"1"', [("alpha", "1.0.0", "t1")])
+
+    with FeedIndex(database_path, RemoteIdCache(tmp_path / "remote-cache.json")) as feed_index:
+        changed_entries = _sync(feed_index, feed_server)
+
+    assert changed_entries == 1
+
+
+def test___several_versions___get_latest_versions___returns_highest_version(
+    feed_server: _FeedServer, feed_index: FeedIndex
+) -> None:
+    feed_server.set_packages(
+        '"1"',
+        [
+            ("alpha", "1.10.0", "t1"),
+            ("alpha", "1.9.0", "t1"),
+            ("beta", "0.5.0", "t1"),
+        ],
+    )
+    _sync(feed_index, feed_server)
+
+    latest_versions = feed_index.get_latest_versions(feed_server.url, _WORKSPACE, _FEED_NAME)
+
+    assert latest_versions == {"alpha": "1.10.0", "beta": "0.5.0"}
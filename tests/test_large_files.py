@@ -0,0 +1,236 @@
+"""Tests for staging, packing and publishing multi-gigabyte plug-in files in bounded memory."""
+
+import io
+import json
+import os
+import subprocess  # nosec: B404
+import sys
+import tarfile
+import textwrap
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+from ni_measurement_plugin_packager._support._artifact_index import get_file_sha256
+
+_LARGE_FILES_MODULE_PATH = (
+    Path(__file__).parents[1]
+    / "src"
+    / "ni_measurement_plugin_packager"
+    / "_support"
+    / "_large_files.py"
+)
+_FILE_SIZE = 4 * 1024 * 1024 * 1024
+_DATA_SIZE = 1024 * 1024
+_PAYLOAD_SIZE = 2 * 1024 * 1024 * 1024
+_MAX_RSS_IN_BYTES = 128 * 1024 * 1024
+
+# Loads the module by path, as the package imports Windows-only modules.
+_COPY_SCRIPT = textwrap.dedent("""
+    import importlib.util
+    import resource
+    import sys
+    from pathlib import Path
+
+    spec = importlib.util.spec_from_file_location("_large_files", sys.argv[1])
+    large_files = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(large_files)
+    large_files.copy_file(Path(sys.argv[2]), Path(sys.argv[3]))
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(max_rss if sys.platform == "darwin" else max_rss * 1024)
+    """)
+
+
+# Runs the staging copy, a package for a second architecture, the package hashes and a publish
+# to a directory feed on one payload, then prints the peak resident set size of the process.
+_PIPELINE_SCRIPT = textwrap.dedent("""
+    import json
+    import sys
+    from pathlib import Path
+
+    from ni_measurement_plugin_packager._support._artifact_index import get_file_sha256
+    from ni_measurement_plugin_packager._support._large_files import copy_file
+    from ni_measurement_plugin_packager._support._local_feed import LocalFeed
+    from ni_measurement_plugin_packager._support._nipkg_archive import (
+        write_architecture_variant,
+    )
+    from ni_measurement_plugin_packager._support._package_info import PackageInfo
+
+    def get_peak_rss():
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                ] + [
+                    (name, ctypes.c_size_t)
+                    for name in (
+                        "PeakWorkingSetSize",
+                        "WorkingSetSize",
+                        "QuotaPeakPagedPoolUsage",
+                        "QuotaPagedPoolUsage",
+                        "QuotaPeakNonPagedPoolUsage",
+                        "QuotaNonPagedPoolUsage",
+                        "PagefileUsage",
+                        "PeakPagefileUsage",
+                    )
+                ]
+
+            counters = ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            ctypes.windll.psapi.GetProcessMemoryInfo(
+                ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+            )
+            return counters.PeakWorkingSetSize
+
+        import resource
+
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    def write_package(package_path, payload_path):
+        # An ar archive with a control member and the payload as its data member, as nipkg
+        # would write it.
+        control_member = Path(sys.argv[3]).read_bytes()
+        with open(package_path, "wb") as package, open(payload_path, "rb") as payload:
+            package.write(b"!<arch>\\n")
+            for name, size in [
+                ("control.tar.gz", len(control_member)),
+                ("data.tar", payload_path.stat().st_size),
+            ]:
+                header = f"{name:<16}{0:<12}{0:<6}{0:<6}{100644:<8}{size:<10}`\\n"
+                package.write(header.encode("ascii"))
+                if name.startswith("control"):
+                    package.write(control_member)
+                else:
+                    for chunk in iter(lambda: payload.read(1024 * 1024), b""):
+                        package.write(chunk)
+                if size % 2:
+                    package.write(b"\\n")
+
+    plugin_path, work_directory = Path(sys.argv[1]), Path(sys.argv[2])
+    package_info = PackageInfo("alpha", "alpha", "1.0.0", "Measurement plug-in.", "NI")
+    staged_payload_path = work_directory / "staged-payload.bin"
+    copy_file(plugin_path / "payload.bin", staged_payload_path)
+    package_path = work_directory / "alpha_1.0.0_windows_x64.nipkg"
+    write_package(package_path, staged_payload_path)
+    staged_payload_path.unlink()
+    variant_path = work_directory / "alpha_1.0.0_windows_x86.nipkg"
+    variant_sha256 = write_architecture_variant(package_path, "windows_x86", variant_path)
+    package_sha256 = get_file_sha256(package_path)
+    package_path.unlink()
+    feed_package_path = LocalFeed(work_directory / "feed").publish(
+        variant_path, package_info, "windows_x86"
+    )
+    print(
+        json.dumps(
+            {
+                "peak_rss": get_peak_rss(),
+                "package_sha256": package_sha256,
+                "variant_sha256": variant_sha256,
+                "feed_package_size": feed_package_path.stat().st_size,
+            }
+        )
+    )
+    """)
+
+
+def _create_sparse_file(file_path: Path) -> Dict[int, bytes]:
+    data_by_offset = {
+        0: b"\x01" * _DATA_SIZE,
+        _FILE_SIZE // 2: b"\x02" * _DATA_SIZE,
+        _FILE_SIZE - _DATA_SIZE: b"\x03" * _DATA_SIZE,
+    }
+    with open(file_path, "wb") as fp:
+        fp.truncate(_FILE_SIZE)
+        for offset, data in data_by_offset.items():
+            fp.seek(offset)
+            fp.write(data)
+    return data_by_offset
+
+
+@pytest.mark.skipif(not hasattr(os, "SEEK_DATA"), reason="Data extents are not reported.")
+def test___sparse_multi_gigabyte_file___copy_file___copies_in_bounded_memory(
+    tmp_path: Path,
+) -> None:
+    source_path = tmp_path / "calibration.bin"
+    destination_path = tmp_path / "copy.bin"
+    data_by_offset = _create_sparse_file(source_path)
+    if os.stat(source_path).st_blocks * 512 >= _FILE_SIZE:
+        pytest.skip("The file system does not support sparse files.")
+
+    completed_process = subprocess.run(  # nosec: B603
+        [
+            sys.executable,
+            "-c",
+            _COPY_SCRIPT,
+            str(_LARGE_FILES_MODULE_PATH),
+            str(source_path),
+            str(destination_path),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    assert int(completed_process.stdout) < _MAX_RSS_IN_BYTES
+    assert destination_path.stat().st_size == _FILE_SIZE
+    assert destination_path.stat().st_blocks * 512 < _FILE_SIZE // 2
+    with open(destination_path, "rb") as fp:
+        for offset, data in data_by_offset.items():
+            fp.seek(offset)
+            assert fp.read(len(data)) == data
+        fp.seek(_DATA_SIZE)
+        assert fp.read(_DATA_SIZE) == bytes(_DATA_SIZE)
+
+
+def _create_control_member() -> bytes:
+    control = b"Package: alpha\nVersion: 1.0.0\nArchitecture: windows_x64\n"
+    control_member = io.BytesIO()
+    with tarfile.open(fileobj=control_member, mode="w:gz") as control_tar:
+        tar_info = tarfile.TarInfo("control")
+        tar_info.size = len(control)
+        control_tar.addfile(tar_info, io.BytesIO(control))
+    return control_member.getvalue()
+
+
+def test___multi_gigabyte_payload___build_and_publish___runs_in_bounded_memory(
+    tmp_path: Path,
+) -> None:
+    plugin_path = tmp_path / "alpha"
+    plugin_path.mkdir()
+    # Dense data, so every stage reads and writes the whole payload.
+    block = os.urandom(_DATA_SIZE)
+    with open(plugin_path / "payload.bin", "wb") as fp:
+        for _ in range(_PAYLOAD_SIZE // _DATA_SIZE):
+            fp.write(block)
+    control_member_path = tmp_path / "control.tar.gz"
+    control_member_path.write_bytes(_create_control_member())
+
+    completed_process = subprocess.run(  # nosec: B603
+        [
+            sys.executable,
+            "-c",
+            _PIPELINE_SCRIPT,
+            str(plugin_path),
+            str(tmp_path),
+            str(control_member_path),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    result = json.loads(completed_process.stdout)
+    assert result["peak_rss"] < _MAX_RSS_IN_BYTES
+    assert result["variant_sha256"] == get_file_sha256(
+        tmp_path / "feed" / "alpha_1.0.0_windows_x86.nipkg"
+    )
+    assert result["variant_sha256"] != result["package_sha256"]
+    assert result["feed_package_size"] > _PAYLOAD_SIZE
@@ -0,0 +1,111 @@
+"""Tests for publishing packages to a directory feed."""
+
+import gzip
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from ni_measurement_plugin_packager._support._local_feed import (
+    COMPRESSED_PACKAGES_INDEX_FILE_NAME,
+    PACKAGES_INDEX_FILE_NAME,
+    LocalFeed,
+)
+from ni_measurement_plugin_packager._support._package_info import PackageInfo
+
+_ARCHITECTURE = "windows_x64"
+
+
+def _write_package(directory: Path, package_name: str, version: str, content: bytes) -> Path:
+    package_path = directory / f"{package_name}_{version}_{_ARCHITECTURE}.nipkg"
+    package_path.write_bytes(content)
+    return package_path
+
+
+def _get_package_info(package_name: str, version: str) -> PackageInfo:
+    return PackageInfo(package_name, package_name, version, "Measurement plug-in.", "NI")
+
+
+def _read_entries(feed_directory: Path) -> List[Dict[str, str]]:
+    index_content = (feed_directory / PACKAGES_INDEX_FILE_NAME).read_text(encoding="utf-8")
+    compressed_index_content = gzip.decompress(
+        (feed_directory / COMPRESSED_PACKAGES_INDEX_FILE_NAME).read_bytes()
+    ).decode("utf-8")
+    assert compressed_index_content == index_content
+    return [
+        dict(line.split(": ", 1) for line in stanza.splitlines())
+        for stanza in index_content.split("\n\n")
+        if stanza.strip()
+    ]
+
+
+def test___package___publish___copies_package_and_adds_entry(tmp_path: Path) -> None:
+    feed_directory = tmp_path / "feed"
+    package_path = _write_package(tmp_path, "alpha", "1.0.0", b"alpha package")
+
+    feed_package_path = LocalFeed(feed_directory).publish(
+        package_path, _get_package_info("alpha", "1.0.0"), _ARCHITECTURE
+    )
+
+    assert feed_package_path.read_bytes() == b"alpha package"
+    [entry] = _read_entries(feed_directory)
+    assert entry["Package"] == "alpha"
+    assert entry["Version"] == "1.0.0"
+    assert entry["Architecture"] == _ARCHITECTURE
+    assert entry["Filename"] == package_path.name
+    assert entry["Size"] == str(len(b"alpha package"))
+    assert entry["SHA256"] == hashlib.sha256(b"alpha package").hexdigest()
+
+
+def test___published_package___publish_again___replaces_its_entry(tmp_path: Path) -> None:
+    feed_directory = tmp_path / "feed"
+    local_feed = LocalFeed(feed_directory)
+    local_feed.publish(
+        _write_package(tmp_path, "beta", "1.0.0", b"beta"),
+        _get_package_info("beta", "1.0.0"),
+        _ARCHITECTURE,
+    )
+    local_feed.publish(
+        _write_package(tmp_path, "alpha", "1.0.0", b"old"),
+        _get_package_info("alpha", "1.0.0"),
+        _ARCHITECTURE,
+    )
+
+    local_feed.publish(
+        _write_package(tmp_path, "alpha", "1.0.0", b"rebuilt"),
+        _get_package_info("alpha", "1.0.0"),
+        _ARCHITECTURE,
+    )
+
+    entries = _read_entries(feed_directory)
+    assert [(entry["Package"], entry["Size"]) for entry in entries] == [
+        ("alpha", str(len(b"rebuilt"))),
+        ("beta", str(len(b"beta"))),
+    ]
+    assert (feed_directory / "alpha_1.0.0_windows_x64.nipkg").read_bytes() == b"rebuilt"
+
+
+def test___several_packages___publish_concurrently___indexes_every_package(
+    tmp_path: Path,
+) -> None:
+    feed_directory = tmp_path / "feed"
+    package_names = [f"plugin{index:02}" for index in range(16)]
+    package_paths = [
+        _write_package(tmp_path, package_name, "1.0.0", package_name.encode())
+        for package_name in package_names
+    ]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # One feed per publish, as separate packager runs would open it.
+        list(
+            executor.map(
+                lambda package_name, package_path: LocalFeed(feed_directory).publish(
+                    package_path, _get_package_info(package_name, "1.0.0"), _ARCHITECTURE
+                ),
+                package_names,
+                package_paths,
+            )
+        )
+
+    assert [entry["Package"] for entry in _read_entries(feed_directory)] == package_names
+    assert not list(feed_directory.glob("*.tmp"))
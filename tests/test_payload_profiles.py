@@ -0,0 +1,44 @@
+"""Tests for the payload profiles that leave content out of packages."""
+
+from pathlib import Path
+from typing import List
+
+from ni_measurement_plugin_packager._support._create_files import iter_payload_files
+from ni_measurement_plugin_packager._support._payload_profiles import RUNTIME_PROFILE
+
+
+def _write_files(plugin_path: Path, relative_paths: List[str]) -> None:
+    for relative_path in relative_paths:
+        file_path = plugin_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("content", encoding="utf-8")
+
+
+def test___runtime_profile___iter_payload_files___leaves_out_root_directories_only(
+    tmp_path: Path,
+) -> None:
+    _write_files(
+        tmp_path,
+        [
+            "measurement.py",
+            "docs/index.html",
+            "tests/test_measurement.py",
+            "samples/data.csv",
+            "mymeasurement/__init__.py",
+            "mymeasurement/samples/__init__.py",
+            "mymeasurement/samples/waveform.py",
+            "mymeasurement/tests/fixtures.py",
+            "mymeasurement/README.md",
+            "mymeasurement/.ipynb_checkpoints/analysis.py",
+        ],
+    )
+
+    payload_files = iter_payload_files(tmp_path, RUNTIME_PROFILE)
+
+    assert sorted(path.relative_to(tmp_path).as_posix() for path in payload_files) == [
+        "measurement.py",
+        "mymeasurement/__init__.py",
+        "mymeasurement/samples/__init__.py",
+        "mymeasurement/samples/waveform.py",
+        "mymeasurement/tests/fixtures.py",
+    ]
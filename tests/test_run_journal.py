@@ -0,0 +1,97 @@
+"""Tests for resuming interrupted runs from their run journal."""
+
+import logging
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from ni_measurement_plugin_packager._support import _run_journal
+from ni_measurement_plugin_packager._support._run_journal import (
+    RunJournal,
+    SourceFingerprint,
+    get_source_fingerprint,
+)
+
+_SOURCE = SourceFingerprint("alpha", "1.0.0", "digest")
+
+
+def _write_plugin(plugin_path: Path, version: str) -> None:
+    plugin_path.mkdir(exist_ok=True)
+    (plugin_path / "pyproject.toml").write_text(
+        "[tool.poetry]\n"
+        'name = "alpha"\n'
+        f'version = "{version}"\n'
+        'description = "Measurement plug-in."\n'
+        'authors = ["NI <ni@example.com>"]\n',
+        encoding="utf-8",
+    )
+    (plugin_path / "measurement.py").write_text("print('alpha')\n", encoding="utf-8")
+
+
+@pytest.fixture
+def package_path(tmp_path: Path) -> Path:
+    package_path = tmp_path / "alpha_1.0.0_windows_x64.nipkg"
+    package_path.write_bytes(b"package")
+    return package_path
+
+
+def test___completed_plugin___resume_with_same_sources___is_completed(tmp_path: Path) -> None:
+    journal_path = tmp_path / "journal.jsonl"
+    with RunJournal(journal_path) as run_journal:
+        run_journal.record_completion("alpha", _SOURCE)
+
+    with RunJournal(journal_path, resume=True) as run_journal:
+        assert run_journal.is_completed("alpha", _SOURCE)
+
+
+def test___completed_plugin___resume_with_new_version___is_not_completed(
+    tmp_path: Path,
+) -> None:
+    journal_path = tmp_path / "journal.jsonl"
+    with RunJournal(journal_path) as run_journal:
+        run_journal.record_completion("alpha", _SOURCE)
+
+    with RunJournal(journal_path, resume=True) as run_journal:
+        assert not run_journal.is_completed("alpha", SourceFingerprint("alpha", "1.1.0", "digest"))
+
+
+def test___edited_plugin___get_source_fingerprint___changes(tmp_path: Path) -> None:
+    plugin_path = tmp_path / "alpha"
+    _write_plugin(plugin_path, "1.0.0")
+    logger = logging.getLogger(__name__)
+    source = get_source_fingerprint(plugin_path, logger)
+
+    (plugin_path / "measurement.py").write_text("print('edited alpha')\n", encoding="utf-8")
+
+    edited_source = get_source_fingerprint(plugin_path, logger)
+    assert (edited_source.package_name, edited_source.version) == ("alpha", "1.0.0")
+    assert edited_source.payload_digest != source.payload_digest
+
+
+def test___unchanged_package___get_verified_packages___skips_hashing(
+    tmp_path: Path, package_path: Path
+) -> None:
+    with RunJournal(tmp_path / "journal.jsonl") as run_journal:
+        run_journal.record_build("alpha", [package_path], _SOURCE)
+
+        with mock.patch.object(_run_journal, "get_file_sha256") as get_file_sha256:
+            verified_packages = run_journal.get_verified_packages("alpha", _SOURCE)
+
+    assert verified_packages == [package_path]
+    get_file_sha256.assert_not_called()
+
+
+def test___touched_package___get_verified_packages___hashes_package(
+    tmp_path: Path, package_path: Path
+) -> None:
+    with RunJournal(tmp_path / "journal.jsonl") as run_journal:
+        run_journal.record_build("alpha", [package_path], _SOURCE)
+        stat = package_path.stat()
+        package_path.write_bytes(b"PACKAGE")
+        os.utime(package_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        verified_packages = run_journal.get_verified_packages("alpha", _SOURCE)
+
+    assert verified_packages is None
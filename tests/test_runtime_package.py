@@ -0,0 +1,91 @@
+"""Tests for choosing the dependencies of the shared runtime package."""
+
+import logging
+import zipfile
+from pathlib import Path
+from typing import Sequence
+
+import pytest
+
+from ni_measurement_plugin_packager._support._runtime_package import find_shared_runtime, satisfies
+
+
+def _write_plugin(plugin_path: Path, dependencies: str) -> Path:
+    plugin_path.mkdir(parents=True)
+    (plugin_path / "pyproject.toml").write_text(
+        f'[tool.poetry.dependencies]\npython = "^3.9"\n{dependencies}\n', encoding="utf-8"
+    )
+    return plugin_path
+
+
+def _write_wheel(
+    wheel_directory: Path, name: str, version: str, requirements: Sequence[str] = ()
+) -> None:
+    wheel_directory.mkdir(exist_ok=True)
+    metadata = f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n" + "".join(
+        f"Requires-Dist: {requirement}\n" for requirement in requirements
+    )
+    wheel_path = wheel_directory / f"{name}-{version}-py3-none-any.whl"
+    with zipfile.ZipFile(wheel_path, "w") as wheel:
+        wheel.writestr(f"{name}-{version}.dist-info/METADATA", metadata)
+
+
+@pytest.mark.parametrize(
+    "version, constraint, expected",
+    [
+        ("1.9.0", "^1.2", True),
+        ("2.0.0", "^1.2", False),
+        ("0.2.9", "^0.2.3", True),
+        ("0.3.0", "^0.2.3", False),
+        ("1.2.9", "~1.2.3", True),
+        ("1.3.0", "~1.2.3", False),
+        ("1.2.3.post1", "==1.2.3", False),
+        ("1.2.3.post1", ">=1.2.3,<1.3", True),
+        ("1.2.7", "1.2.*", True),
+        ("3.0.0", "<2 || >=3", True),
+        ("2.0.0rc1", "*", False),
+    ],
+)
+def test___constraint___satisfies___follows_pep_440_and_poetry_operators(
+    version: str, constraint: str, expected: bool
+) -> None:
+    assert satisfies(version, constraint) == expected
+
+
+def test___post_release_wheel___find_shared_runtime___pins_post_release(tmp_path: Path) -> None:
+    plugin_paths = [_write_plugin(tmp_path / name, 'numpy = "^1.26"') for name in ("alpha", "beta")]
+    _write_wheel(tmp_path / "wheels", "numpy", "1.26.4")
+    _write_wheel(tmp_path / "wheels", "numpy", "1.26.4.post1")
+
+    shared_runtime = find_shared_runtime(
+        logging.getLogger(__name__), plugin_paths, tmp_path / "wheels"
+    )
+
+    assert shared_runtime.requirements == ["numpy==1.26.4.post1"]
+    assert shared_runtime.plugin_dependencies == {"alpha": ["numpy"], "beta": ["numpy"]}
+
+
+def test___requirements_with_markers___find_shared_runtime___adds_windows_requirements(
+    tmp_path: Path,
+) -> None:
+    plugin_paths = [
+        _write_plugin(tmp_path / name, 'grpcio = "^1.49"') for name in ("alpha", "beta")
+    ]
+    _write_wheel(
+        tmp_path / "wheels",
+        "grpcio",
+        "1.60.0",
+        [
+            'pywin32>=300; sys_platform == "win32"',
+            'uvloop; sys_platform != "win32"',
+            'protobuf>=4; extra == "protobuf"',
+        ],
+    )
+    for name in ("pywin32", "uvloop", "protobuf"):
+        _write_wheel(tmp_path / "wheels", name, "306")
+
+    shared_runtime = find_shared_runtime(
+        logging.getLogger(__name__), plugin_paths, tmp_path / "wheels"
+    )
+
+    assert shared_runtime.requirements == ["grpcio==1.60.0", "pywin32==306"]
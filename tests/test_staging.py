@@ -0,0 +1,23 @@
+"""Tests for selecting the staging directory of a build."""
+
+from pathlib import Path
+
+from ni_measurement_plugin_packager._constants import PACKAGER_DIRECTORY
+from ni_measurement_plugin_packager._support._create_files import reserve_staging_directory
+
+
+def test___small_payload_and_ram_disk___reserve_staging_directory___stages_on_ram_disk(
+    tmp_path: Path,
+) -> None:
+    with reserve_staging_directory(tmp_path / "disk", tmp_path, 1024, 4096) as staging_directory:
+        assert staging_directory == tmp_path / PACKAGER_DIRECTORY
+
+
+def test___large_payload___reserve_staging_directory___stages_on_disk(tmp_path: Path) -> None:
+    with reserve_staging_directory(tmp_path / "disk", tmp_path, 8192, 4096) as staging_directory:
+        assert staging_directory == tmp_path / "disk"
+
+
+def test___no_ram_disk___reserve_staging_directory___stages_on_disk(tmp_path: Path) -> None:
+    with reserve_staging_directory(tmp_path / "disk", None, 1024, 4096) as staging_directory:
+        assert staging_directory == tmp_path / "disk"